@@ -0,0 +1,380 @@
+""" Path_Async.py - A non-blocking front-end for path methods.
+
+Example:
+
+from Path_Object import path
+stat = path('/Volumes/common/Show/plate.exr').aio.stat()
+listing = path('/Volumes/common/Show').aio.listdir()
+print stat.result().st_size, len(listing.result())
+
+walk = path('/Volumes/common/Show').aio.walkfiles('*.exr')
+while True:
+    batch = walk.next_batch().result()
+    if not batch:
+        break
+    print len(batch)
+
+Every blocking path method called through path.aio (an AsyncPath) is
+queued on a shared, bounded pool of worker threads and returns a
+future at once, so one thread can keep hundreds of file queries in
+flight.  The futures are concurrent.futures.Future objects when the
+'futures' package is installed, which lets a trollius or asyncio event
+loop wait on them with wrap_future(); otherwise they are a small
+compatible Future.
+
+Slow or hung file servers should not starve the others, so at most
+'per_volume' calls run at once against each volume; further calls for
+the same volume wait in the queue while calls for other volumes run.
+A volume is a drive letter or UNC share on Windows and the first two
+components of the absolute path elsewhere ('/Volumes/common').  The
+limit counts executor threads only: methods with a workers= argument
+(walk_parallel(), walkhashes(), duplicates(), disk_usage(),
+fastcopytree()) start that many threads of their own, which run
+against the volume on top of the executor's per_volume calls.
+
+Walks, and the other methods that return generators, are exposed as
+AsyncWalk objects whose next_batch() returns a future of the next list
+of results; an empty list means the walk is finished.  Python 2 has no
+'async for', so this takes its place.
+"""
+import time, threading, atexit
+from collections import deque
+
+import Path_Object
+from Path_Object import path, volume_of
+
+try:
+	from concurrent.futures import Future
+except ImportError:
+	Future = None
+
+__all__ = ['AsyncPath', 'AsyncWalk', 'PathExecutor', 'default_executor', 'volume_of']
+
+# Methods AsyncPath runs on the executor.  Anything not listed here is
+# looked up on the path object itself, i.e. pure string operations
+# such as .name or .parent stay synchronous.
+_BLOCKING = frozenset((
+	'exists', 'isdir', 'isfile', 'islink', 'ismount', 'samefile', 'access',
+	'stat', 'lstat', 'statvfs', 'getatime', 'getmtime', 'getctime', 'getsize',
+	'get_owner', 'realpath', 'readlink', 'readlinkabs',
+	'listdir', 'dirs', 'files', 'glob', 'sequences', 'columns', 'table', 'snapshot',
+	'bytes', 'text', 'lines', 'read_md5', 'hashes',
+	'write_bytes', 'write_text', 'write_lines', 'touch',
+	'copyfile', 'copymode', 'copystat', 'copy', 'copy2', 'copytree', 'move',
+	'fastcopy', 'fastcopytree', 'disk_usage',
+	'rename', 'renames', 'remove', 'unlink', 'rmtree', 'rmdir', 'removedirs',
+	'mkdir', 'makedirs', 'chmod', 'chown', 'utime',
+	'link', 'symlink',
+))
+
+# Methods returning generators; AsyncPath returns an AsyncWalk for these.
+_WALKS = frozenset(('walk', 'walkdirs', 'walkfiles', 'walk_parallel', 'walkhashes',
+                    'duplicates', 'iter_lines', 'iter_chunks'))
+
+########################################################################
+class _Future(object):
+	""" The part of concurrent.futures.Future that PathExecutor uses. """
+	#----------------------------------------------------------------------
+	def __init__(self):
+		self._cond = threading.Condition()
+		self._done = False
+		self._result = None
+		self._exception = None
+		self._callbacks = []
+	#----------------------------------------------------------------------
+	def set_running_or_notify_cancel(self):
+		return True
+	#----------------------------------------------------------------------
+	def _finish(self, result, exception):
+		with self._cond:
+			self._result = result
+			self._exception = exception
+			self._done = True
+			self._cond.notify_all()
+			callbacks, self._callbacks = self._callbacks, []
+		for fn in callbacks:
+			fn(self)
+	#----------------------------------------------------------------------
+	def set_result(self, result):
+		self._finish(result, None)
+	#----------------------------------------------------------------------
+	def set_exception(self, exception):
+		self._finish(None, exception)
+	#----------------------------------------------------------------------
+	def done(self):
+		return self._done
+	#----------------------------------------------------------------------
+	def cancelled(self):
+		return False
+	#----------------------------------------------------------------------
+	def add_done_callback(self, fn):
+		with self._cond:
+			if not self._done:
+				self._callbacks.append(fn)
+				return
+		fn(self)
+	#----------------------------------------------------------------------
+	def exception(self, timeout=None):
+		deadline = None if timeout is None else time.time() + timeout
+		with self._cond:
+			while not self._done:
+				if deadline is None:
+					self._cond.wait()
+				elif time.time() >= deadline:
+					raise RuntimeError("timed out waiting for the result")
+				else:
+					self._cond.wait(deadline - time.time())
+			return self._exception
+	#----------------------------------------------------------------------
+	def result(self, timeout=None):
+		exception = self.exception(timeout)
+		if exception is not None:
+			raise exception
+		return self._result
+
+if Future is None:
+	Future = _Future
+
+########################################################################
+class PathExecutor(object):
+	""" A bounded pool of worker threads that limits the calls running
+	against each volume. """
+	#----------------------------------------------------------------------
+	def __init__(self, workers=16, per_volume=8, max_queued=4096):
+		"""
+		workers    - number of worker threads.
+		per_volume - most calls running at once against one volume.
+		max_queued - most calls waiting to run; submit() blocks while
+		             the queue is full.
+		"""
+		self.workers = workers
+		self.per_volume = per_volume
+		self.max_queued = max_queued
+		self._cond = threading.Condition()
+		# volume -> deque of (future, func, args, kwargs)
+		self._pending = {}
+		# volume -> number of calls running
+		self._running = {}
+		# Volumes with pending calls, in the order they are served.
+		self._volumes = deque()
+		self._queued = 0
+		self._shutdown = False
+		self._threads = []
+		for i in xrange(workers):
+			t = threading.Thread(target=self._work, name='path-aio-%d' % i)
+			t.daemon = True
+			t.start()
+			self._threads.append(t)
+	#----------------------------------------------------------------------
+	def submit(self, volume, func, *args, **kwargs):
+		""" Queue func(*args, **kwargs) to run against 'volume' and return
+		its future. """
+		future = Future()
+		with self._cond:
+			while self._queued >= self.max_queued and not self._shutdown:
+				self._cond.wait()
+			if self._shutdown:
+				raise RuntimeError("the executor has been shut down")
+			queue = self._pending.get(volume)
+			if queue is None:
+				queue = self._pending[volume] = deque()
+				self._volumes.append(volume)
+			queue.append((future, func, args, kwargs))
+			self._queued += 1
+			self._cond.notify_all()
+		return future
+	#----------------------------------------------------------------------
+	def _next_call(self):
+		""" Take the next call of a volume that is below its limit, going
+		round the volumes in turn.  Called with the lock held. """
+		for i in xrange(len(self._volumes)):
+			volume = self._volumes[0]
+			self._volumes.rotate(-1)
+			if self._running.get(volume, 0) >= self.per_volume:
+				continue
+			queue = self._pending[volume]
+			call = queue.popleft()
+			if not queue:
+				del self._pending[volume]
+				self._volumes.remove(volume)
+			self._running[volume] = self._running.get(volume, 0) + 1
+			self._queued -= 1
+			return volume, call
+		return None
+	#----------------------------------------------------------------------
+	def _work(self):
+		while True:
+			with self._cond:
+				while True:
+					item = self._next_call()
+					if item is not None or self._shutdown:
+						break
+					self._cond.wait()
+				if item is None:
+					return
+				# A slot in the queue was freed.
+				self._cond.notify_all()
+			volume, (future, func, args, kwargs) = item
+			try:
+				if future.set_running_or_notify_cancel():
+					try:
+						result = func(*args, **kwargs)
+					except BaseException, exc:
+						future.set_exception(exc)
+					else:
+						future.set_result(result)
+			finally:
+				with self._cond:
+					self._running[volume] -= 1
+					if not self._running[volume]:
+						del self._running[volume]
+					self._cond.notify_all()
+	#----------------------------------------------------------------------
+	def shutdown(self, wait=True):
+		""" Stop the workers once the queued calls have run. """
+		with self._cond:
+			self._shutdown = True
+			self._cond.notify_all()
+		if wait:
+			for t in self._threads:
+				t.join()
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+#----------------------------------------------------------------------
+def default_executor():
+	""" The PathExecutor shared by path.aio, created on first use. """
+	global _default_executor
+	with _default_lock:
+		if _default_executor is None:
+			_default_executor = PathExecutor()
+			atexit.register(_default_executor.shutdown)
+		return _default_executor
+
+########################################################################
+class AsyncWalk(object):
+	""" Pulls the results of a generator, such as path.walkfiles(), in
+	batches on a PathExecutor. """
+	#----------------------------------------------------------------------
+	def __init__(self, executor, volume, iterator, batch_size=1000):
+		self._executor = executor
+		self._volume = volume
+		self._iterator = iterator
+		self.batch_size = batch_size
+		# Futures handed out by next_batch() and not yet filled.
+		self._waiting = deque()
+		# Whether a _fill() is queued or running.
+		self._active = False
+		# The future close() returned, once it has been called.
+		self._closing = None
+		self._lock = threading.Lock()
+	#----------------------------------------------------------------------
+	def next_batch(self):
+		""" A future of the next list of up to batch_size results; the
+		list is empty when the walk is finished. """
+		future = Future()
+		with self._lock:
+			if self._closing is None:
+				self._waiting.append(future)
+				if self._active:
+					return future
+				self._active = True
+		if self._closing is not None:
+			future.set_result([])
+			return future
+		self._executor.submit(self._volume, self._fill)
+		return future
+	#----------------------------------------------------------------------
+	def _fill(self):
+		""" Fill the waiting futures in order, or close the generator
+		once close() was called.  A generator can only be advanced by one
+		thread at a time, so one call does all of them. """
+		while True:
+			with self._lock:
+				closing = self._closing
+				if closing is None:
+					if not self._waiting:
+						self._active = False
+						return
+					future = self._waiting.popleft()
+			if closing is not None:
+				self._close(closing)
+				return
+			try:
+				batch = []
+				for item in self._iterator:
+					batch.append(item)
+					if len(batch) >= self.batch_size:
+						break
+			except BaseException, exc:
+				future.set_exception(exc)
+			else:
+				future.set_result(batch)
+	#----------------------------------------------------------------------
+	def _close(self, closing):
+		""" Close the generator and finish every waiting future with an
+		empty list.  Only called from _fill(). """
+		close = getattr(self._iterator, 'close', None)
+		try:
+			if close is not None:
+				close()
+		except BaseException, exc:
+			closing.set_exception(exc)
+		else:
+			closing.set_result(None)
+		with self._lock:
+			waiting, self._waiting = self._waiting, deque()
+			self._active = False
+		for future in waiting:
+			future.set_result([])
+	#----------------------------------------------------------------------
+	def close(self):
+		""" Stop the walk and return a future that is done once the
+		generator is closed.  Results not yet fetched are dropped, and
+		batches asked for afterwards are empty.  The generator is closed
+		by the same call that advances it, after the batch it is
+		filling, if any. """
+		with self._lock:
+			if self._closing is not None:
+				return self._closing
+			closing = self._closing = Future()
+			if self._active:
+				return closing
+			self._active = True
+		self._executor.submit(self._volume, self._fill)
+		return closing
+
+########################################################################
+class AsyncPath(object):
+	""" The blocking methods of a path, returning futures. """
+	#----------------------------------------------------------------------
+	def __init__(self, p, executor=None):
+		self.path = path(p)
+		self.executor = executor or default_executor()
+		self.volume = volume_of(p)
+	#----------------------------------------------------------------------
+	def __getattr__(self, name):
+		if name in _BLOCKING:
+			method = getattr(self.path, name)
+			def call(*args, **kwargs):
+				return self.executor.submit(self.volume, method, *args, **kwargs)
+			call.__name__ = name
+			call.__doc__ = method.__doc__
+			return call
+		if name in _WALKS:
+			method = getattr(self.path, name)
+			def walk(*args, **kwargs):
+				batch_size = kwargs.pop('batch_size', 1000)
+				return AsyncWalk(self.executor, self.volume, method(*args, **kwargs), batch_size)
+			walk.__name__ = name
+			walk.__doc__ = method.__doc__
+			return walk
+		return getattr(self.path, name)
+	#----------------------------------------------------------------------
+	def __div__(self, rel):
+		return AsyncPath(self.path / rel, self.executor)
+	__truediv__ = __div__
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'AsyncPath(%r)' % Path_Object._base(self.path)
@@ -0,0 +1,194 @@
+""" Path_Columns.py - Column-oriented file metadata for very large trees.
+
+Example:
+
+import time
+from Path_Object import path
+cols = path('/Volumes/common/Show').columns('*.exr')
+old_and_big = cols.where(min_size=1 << 30, mtime_before=time.time() - 30 * 86400)
+print cols.total_size(old_and_big)
+for f in cols.paths(old_and_big):
+    print f
+
+Instead of one path object and one stat_result per file, the metadata is
+kept in flat arrays (one value per file) next to a table of parent
+directories and a list of interned names.  A row is turned back into a
+path object only when it is asked for.  When numpy is installed the
+where() filters run over the arrays as vectors.
+"""
+import os, fnmatch
+from array import array
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+import Path_Object
+from Path_Object import path, PathWalkWarning
+
+__all__ = ['FileColumns', 'collect', 'walk_stats']
+
+########################################################################
+class FileColumns(object):
+	""" Metadata of a set of files, stored column by column.
+
+	sizes   - array('d') of sizes in bytes (exact up to 2**53)
+	mtimes  - array('d') of modification times
+	modes   - array('I') of st_mode values
+	uids    - array('I') of owner ids
+	dir_ids - array('I') of indexes into 'dirs'
+	names   - list of interned file names
+	dirs    - list of parent directories, each stored once
+	"""
+	#----------------------------------------------------------------------
+	def __init__(self):
+		self.sizes = array('d')
+		self.mtimes = array('d')
+		self.modes = array('I')
+		self.uids = array('I')
+		self.dir_ids = array('I')
+		self.names = []
+		self.dirs = []
+	#----------------------------------------------------------------------
+	def append(self, dir_id, name, st):
+		""" Add one row for file 'name' in self.dirs[dir_id] with stat result 'st'. """
+		self.sizes.append(st.st_size)
+		self.mtimes.append(st.st_mtime)
+		self.modes.append(st.st_mode)
+		self.uids.append(st.st_uid)
+		self.dir_ids.append(dir_id)
+		self.names.append(intern(name) if isinstance(name, str) else name)
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return len(self.names)
+	#----------------------------------------------------------------------
+	def path(self, i):
+		""" The path object of row i. """
+		return path(os.path.join(self.dirs[self.dir_ids[i]], self.names[i]))
+	#----------------------------------------------------------------------
+	def paths(self, rows=None):
+		""" Iterate over the path objects of the given rows (default all). """
+		if rows is None:
+			rows = xrange(len(self))
+		for i in rows:
+			yield self.path(i)
+	#----------------------------------------------------------------------
+	def total_size(self, rows=None):
+		""" Sum of the sizes of the given rows (default all). """
+		if rows is None:
+			return sum(self.sizes)
+		sizes = self.sizes
+		return sum(sizes[i] for i in rows)
+	#----------------------------------------------------------------------
+	def where(self, min_size=None, max_size=None, mtime_before=None, mtime_after=None, uid=None, pattern=None):
+		""" Return the rows matching every given condition as an array('I').
+
+		min_size/max_size are inclusive byte counts, mtime_before and
+		mtime_after are timestamps, uid is an owner id and pattern is
+		fnmatched against the file name.
+		"""
+		if numpy is not None:
+			rows = self._where_numpy(min_size, max_size, mtime_before, mtime_after, uid)
+		else:
+			rows = self._where_python(min_size, max_size, mtime_before, mtime_after, uid)
+		if pattern is not None:
+			names = self.names
+			rows = array('I', [i for i in rows if fnmatch.fnmatch(names[i], pattern)])
+		return rows
+	#----------------------------------------------------------------------
+	def _where_numpy(self, min_size, max_size, mtime_before, mtime_after, uid):
+		if len(self) == 0:
+			return array('I')
+		mask = numpy.ones(len(self), dtype=bool)
+		sizes = numpy.frombuffer(self.sizes, dtype=numpy.float64)
+		mtimes = numpy.frombuffer(self.mtimes, dtype=numpy.float64)
+		if min_size is not None:
+			mask &= sizes >= min_size
+		if max_size is not None:
+			mask &= sizes <= max_size
+		if mtime_before is not None:
+			mask &= mtimes < mtime_before
+		if mtime_after is not None:
+			mask &= mtimes > mtime_after
+		if uid is not None:
+			mask &= numpy.frombuffer(self.uids, dtype=numpy.uint32) == uid
+		rows = array('I')
+		rows.fromstring(numpy.flatnonzero(mask).astype(numpy.uint32).tostring())
+		return rows
+	#----------------------------------------------------------------------
+	def _where_python(self, min_size, max_size, mtime_before, mtime_after, uid):
+		sizes, mtimes, uids = self.sizes, self.mtimes, self.uids
+		tests = []
+		if min_size is not None:
+			tests.append(lambda i: sizes[i] >= min_size)
+		if max_size is not None:
+			tests.append(lambda i: sizes[i] <= max_size)
+		if mtime_before is not None:
+			tests.append(lambda i: mtimes[i] < mtime_before)
+		if mtime_after is not None:
+			tests.append(lambda i: mtimes[i] > mtime_after)
+		if uid is not None:
+			tests.append(lambda i: uids[i] == uid)
+		return array('I', [i for i in xrange(len(self)) if all(test(i) for test in tests)])
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'FileColumns(%d files in %d directories)' % (len(self), len(self.dirs))
+
+#----------------------------------------------------------------------
+def walk_stats(root, pattern=None, errors='strict', follow_symlinks=True, same_filesystem=False, dirs=None):
+	""" Iterate over (directory, name, stat result) for the files below
+	'root' that path.walkfiles(pattern) would yield, without building a
+	path object per file.
+
+	errors= and same_filesystem= behave as they do for path.walkfiles().
+	With follow_symlinks=False symbolic links to directories are not
+	entered and links to files are reported with their own lstat() data
+	instead of their target's.  If 'dirs' is a list every directory
+	listed, 'root' included, is appended to it, so a caller that also
+	needs the empty directories does not have to walk the tree again.
+	"""
+	if errors not in ('strict', 'warn', 'ignore'):
+		raise ValueError("invalid errors parameter")
+	guard = Path_Object._WalkGuard(root, follow_symlinks, same_filesystem)
+	stack = [Path_Object._base(root)]
+	while stack:
+		top = stack.pop()
+		try:
+			entries = Path_Object._scandir(top)
+		except Exception, exc:
+			Path_Object._handleException(exc, errors, PathWalkWarning("Unable to list directory '%s': %%(exc)s" % top))
+			continue
+		if dirs is not None:
+			dirs.append(top)
+		subdirs = []
+		for entry in entries:
+			if entry.is_file():
+				if pattern is not None and not fnmatch.fnmatch(entry.name, pattern):
+					continue
+				try:
+					st = entry.stat(follow_symlinks=follow_symlinks)
+				except OSError:
+					continue
+				yield top, entry.name, st
+			elif entry.is_dir() and guard.enter(entry):
+				subdirs.append(entry.path)
+		subdirs.reverse()
+		stack.extend(subdirs)
+
+#----------------------------------------------------------------------
+def collect(root, pattern=None, errors='strict', follow_symlinks=True):
+	""" Walk 'root' like path.walkfiles() and return a FileColumns of the
+	files whose names match 'pattern'.  See walk_stats() for the
+	arguments.
+	"""
+	cols = FileColumns()
+	last_top = None
+	dir_id = None
+	for top, name, st in walk_stats(root, pattern, errors, follow_symlinks):
+		if top is not last_top:
+			last_top = top
+			dir_id = len(cols.dirs)
+			cols.dirs.append(top)
+		cols.append(dir_id, name, st)
+	return cols
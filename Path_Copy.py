@@ -0,0 +1,320 @@
+""" Path_Copy.py - Concurrent, resumable file and tree copies.
+
+Example:
+
+from Path_Object import path
+def report(done, total, rate):
+    print "%d / %d bytes  %.1f MB/s" % (done, total, rate / 1e6)
+path('V:/Show/shot_010').fastcopytree('D:/scratch/shot_010', workers=8, progress=report)
+
+Compared with shutil:
+
+- On Linux the data is moved by the kernel, with copy_file_range() and
+  then sendfile() called from the C library through ctypes, as Python 2
+  has neither in the os module.  Elsewhere, or where the kernel refuses
+  (across filesystems on older kernels, for one), it goes through one
+  large reused buffer.
+- Files are written to '<dst>.partial' and renamed into place when
+  complete.  The size and mtime of the source go to '<dst>.partial.source'
+  next to it; with resume=True an interrupted copy continues from the
+  end of the partial file if the source still has that size and mtime
+  and the tail of the partial file matches it.
+- With skip_same=True a destination whose size and mtime already match
+  the source is left alone, so re-running a tree copy only copies what
+  changed.
+- copy_tree() copies several files at once on a pool of worker threads.
+"""
+import os, io, sys, time, errno, shutil, marshal, threading
+
+import Path_Object
+import Path_Columns
+from Path_Object import PathWalkWarning
+
+__all__ = ['copy_file', 'copy_files', 'copy_tree', 'COPIED', 'SKIPPED', 'RESUMED']
+
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+PARTIAL_SUFFIX = '.partial'
+# Holds the (size, mtime) of the source a partial file was copied from.
+SOURCE_SUFFIX = '.partial.source'
+# Two mtimes closer than this count as equal; FAT and SMB store 2s steps.
+MTIME_WINDOW = 2.0
+
+# Results of copy_file().
+COPIED  = 'copied'
+SKIPPED = 'skipped'
+RESUMED = 'resumed'
+
+_copy_buffers = threading.local()
+
+########################################################################
+class _Progress(object):
+	""" Thread-safe byte counter that reports to a progress callback. """
+	#----------------------------------------------------------------------
+	def __init__(self, callback, total=0, interval=0.5):
+		self.callback = callback
+		self.total = total
+		self.done = 0
+		self.interval = interval
+		self.start = time.time()
+		self._last = 0.0
+		self._lock = threading.Lock()
+	#----------------------------------------------------------------------
+	def add(self, count, force=False):
+		if self.callback is None:
+			return
+		with self._lock:
+			self.done += count
+			now = time.time()
+			if not force and now - self._last < self.interval:
+				return
+			self._last = now
+			done, total = self.done, self.total
+		elapsed = max(now - self.start, 1e-6)
+		self.callback(done, total, done / elapsed)
+
+#----------------------------------------------------------------------
+def _same_file(src_st, dst_st):
+	return src_st.st_size == dst_st.st_size and abs(src_st.st_mtime - dst_st.st_mtime) < MTIME_WINDOW
+
+#----------------------------------------------------------------------
+def _tail_matches(src, partial, length, sample=1024 * 1024):
+	""" Whether the last 'sample' bytes of the first 'length' bytes of
+	src and partial are equal, i.e. whether partial can be resumed. """
+	if length == 0:
+		return True
+	offset = max(0, length - sample)
+	a = io.open(src, 'rb')
+	b = io.open(partial, 'rb')
+	try:
+		a.seek(offset)
+		b.seek(offset)
+		return a.read(length - offset) == b.read(length - offset)
+	finally:
+		a.close()
+		b.close()
+
+#----------------------------------------------------------------------
+def _source_matches(src_st, partial):
+	""" Whether 'partial' was started from a source of the size and
+	mtime in src_st, as recorded by _record_source(). """
+	try:
+		f = open(partial[:-len(PARTIAL_SUFFIX)] + SOURCE_SUFFIX, 'rb')
+		try:
+			recorded = marshal.loads(f.read())
+		finally:
+			f.close()
+	except (IOError, OSError, EOFError, ValueError, TypeError):
+		return False
+	return recorded == (src_st.st_size, src_st.st_mtime)
+
+#----------------------------------------------------------------------
+def _record_source(src_st, partial):
+	f = open(partial[:-len(PARTIAL_SUFFIX)] + SOURCE_SUFFIX, 'wb')
+	try:
+		f.write(marshal.dumps((src_st.st_size, src_st.st_mtime)))
+	finally:
+		f.close()
+
+#----------------------------------------------------------------------
+def _libc_copy_calls():
+	""" [(name, call(in_fd, out_fd, count))] for the kernel copy calls
+	of the C library, copy_file_range() first.  Each call copies between
+	the current file positions and returns the number of bytes copied.
+	Only Linux is supported: the BSD and macOS sendfile() can not write
+	to a file. """
+	if not sys.platform.startswith('linux'):
+		return []
+	try:
+		import ctypes
+		libc = ctypes.CDLL(None, use_errno=True)
+	except (ImportError, OSError):
+		return []
+	calls = []
+	def check(n):
+		if n < 0:
+			code = ctypes.get_errno()
+			raise OSError(code, os.strerror(code))
+		return n
+	func = getattr(libc, 'copy_file_range', None)
+	if func is not None:
+		func.restype = ctypes.c_ssize_t
+		func.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_uint]
+		calls.append(('copy_file_range', lambda in_fd, out_fd, count, func=func: check(func(in_fd, None, out_fd, None, count, 0))))
+	func = getattr(libc, 'sendfile', None)
+	if func is not None:
+		func.restype = ctypes.c_ssize_t
+		func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t]
+		calls.append(('sendfile', lambda in_fd, out_fd, count, func=func: check(func(out_fd, in_fd, None, count))))
+	return calls
+
+_kernel_calls = _libc_copy_calls()
+
+#----------------------------------------------------------------------
+def _kernel_copy(fin, fout, count, progress):
+	""" Copy 'count' bytes between the current positions of the open
+	files with copy_file_range() or sendfile().  Returns the number of
+	bytes copied, which is less than count if neither call is usable. """
+	copied = 0
+	in_fd, out_fd = fin.fileno(), fout.fileno()
+	for name, func in _kernel_calls:
+		try:
+			while copied < count:
+				n = func(in_fd, out_fd, min(count - copied, COPY_BUFFER_SIZE))
+				if not n:
+					break
+				copied += n
+				progress.add(n)
+			return copied
+		except OSError, exc:
+			if exc.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP,
+			                     getattr(errno, 'EOPNOTSUPP', errno.ENOTSUP), errno.EBADF):
+				raise
+	return copied
+
+#----------------------------------------------------------------------
+def _buffered_copy(fin, fout, progress):
+	buf = getattr(_copy_buffers, 'buf', None)
+	if buf is None:
+		buf = _copy_buffers.buf = bytearray(COPY_BUFFER_SIZE)
+	view = memoryview(buf)
+	while True:
+		n = fin.readinto(buf)
+		if not n:
+			break
+		fout.write(view[:n])
+		progress.add(n)
+
+#----------------------------------------------------------------------
+def copy_file(src, dst, skip_same=False, resume=True, preserve=True, progress=None, _counter=None):
+	""" Copy file src to dst, which may be an existing directory.
+
+	skip_same - leave dst alone if its size and mtime match src.
+	resume    - continue from an existing '<dst>.partial' copied from
+	            a source of the same size and mtime, and whose tail
+	            matches src, instead of starting over.
+	preserve  - copy permission bits and times like shutil.copy2().
+	progress  - callback(bytes_done, bytes_total, bytes_per_second).
+
+	Returns COPIED, SKIPPED or RESUMED.
+	"""
+	if os.path.isdir(dst):
+		dst = os.path.join(dst, os.path.basename(src))
+	src_st = os.stat(src)
+	counter = _counter or _Progress(progress, src_st.st_size)
+	if skip_same:
+		try:
+			if _same_file(src_st, os.stat(dst)):
+				counter.add(src_st.st_size)
+				return SKIPPED
+		except OSError:
+			pass
+
+	partial = dst + PARTIAL_SUFFIX
+	offset = 0
+	if resume:
+		try:
+			offset = os.path.getsize(partial)
+		except OSError:
+			offset = 0
+		if offset and (offset > src_st.st_size or not _source_matches(src_st, partial)
+		               or not _tail_matches(src, partial, offset)):
+			offset = 0
+	if not offset:
+		_record_source(src_st, partial)
+
+	fin = io.open(src, 'rb', buffering=0)
+	try:
+		fout = io.open(partial, 'r+b' if offset else 'wb', buffering=0)
+		try:
+			if offset:
+				fin.seek(offset)
+				fout.seek(offset)
+				fout.truncate()
+				counter.add(offset)
+			remaining = src_st.st_size - offset
+			copied = _kernel_copy(fin, fout, remaining, counter)
+			if copied < remaining:
+				# The file may have grown since it was stat'ed, so the
+				# buffered copy always runs on to the end.
+				fin.seek(offset + copied)
+				fout.seek(offset + copied)
+				_buffered_copy(fin, fout, counter)
+		finally:
+			fout.close()
+	finally:
+		fin.close()
+
+	if preserve:
+		shutil.copystat(src, partial)
+	Path_Object._replace(partial, dst)
+	try:
+		os.remove(dst + SOURCE_SUFFIX)
+	except OSError:
+		pass
+	Path_Object._invalidate_stat(dst)
+	if _counter is None:
+		counter.add(0, force=True)
+	if offset:
+		return RESUMED
+	return COPIED
+
+#----------------------------------------------------------------------
+def copy_files(pairs, workers=4, skip_same=False, resume=True, preserve=True,
+               progress=None, total_bytes=0, errors='strict'):
+	""" Copy every (src, dst) in 'pairs' on 'workers' threads.
+
+	Yields (src, dst, result) in the order the copies finish, where
+	result is COPIED, SKIPPED or RESUMED.  progress is called with the
+	bytes copied over all files; pass 'total_bytes' to give it a total.
+	errors= behaves as it does for path.walk().
+	"""
+	if errors not in ('strict', 'warn', 'ignore'):
+		raise ValueError("invalid errors parameter")
+	counter = _Progress(progress, total_bytes)
+	def run(pair):
+		return copy_file(pair[0], pair[1], skip_same, resume, preserve, _counter=counter)
+	try:
+		for pair, result, exc in Path_Object._thread_map(run, pairs, workers):
+			if exc is not None:
+				Path_Object._handleException(exc, errors, PathWalkWarning("Unable to copy '%s': %%(exc)s" % pair[0]))
+				continue
+			yield pair[0], pair[1], result
+	finally:
+		counter.add(0, force=True)
+
+#----------------------------------------------------------------------
+def copy_tree(src, dst, workers=4, pattern=None, skip_same=True, resume=True, preserve=True,
+              progress=None, errors='strict'):
+	""" Copy the files below src that match 'pattern' into dst, creating
+	directories as needed, on 'workers' threads.
+
+	Unlike shutil.copytree() dst may already exist; with the default
+	skip_same=True files already up to date there are not copied again,
+	so an interrupted tree copy can simply be run again.  Symbolic links
+	to files are copied as files.
+
+	Returns {COPIED: n, SKIPPED: n, RESUMED: n}.
+	"""
+	src = Path_Object._base(src)
+	dst = Path_Object._base(dst)
+	pairs = []
+	total = 0
+	# Every directory listed, so those without matching files are
+	# created as well, as shutil.copytree() would.
+	folders = []
+	for top, name, st in Path_Columns.walk_stats(src, pattern, errors, dirs=folders):
+		rel = os.path.relpath(top, src)
+		target_dir = dst if rel == os.curdir else os.path.join(dst, rel)
+		pairs.append((os.path.join(top, name), os.path.join(target_dir, name)))
+		total += st.st_size
+	if not os.path.isdir(dst):
+		os.makedirs(dst)
+	for folder in folders:
+		rel = os.path.relpath(folder, src)
+		folder = dst if rel == os.curdir else os.path.join(dst, rel)
+		if not os.path.isdir(folder):
+			os.makedirs(folder)
+	counts = {COPIED: 0, SKIPPED: 0, RESUMED: 0}
+	for s, d, result in copy_files(pairs, workers, skip_same, resume, preserve, progress, total, errors):
+		counts[result] += 1
+	return counts
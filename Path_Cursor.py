@@ -0,0 +1,288 @@
+""" Path_Cursor.py - A resumable, paged walk of a directory tree.
+
+Example:
+
+from Path_Object import path
+from Path_Cursor import WalkCursor
+cursor = path('/Volumes/common/Show').cursor('*.exr', kind='files', page_size=500)
+while not cursor.done:
+    for f in cursor.next_page():
+        print f
+    open('/tmp/crawl.token', 'w').write(cursor.checkpoint())
+
+# ... after a crash or on the next run:
+cursor = WalkCursor.resume(open('/tmp/crawl.token').read())
+
+A WalkCursor walks a tree like path.walk(), walkdirs() or walkfiles(),
+but hands the results out a page at a time and can describe its
+position as a checkpoint token, a short string that can be stored and
+turned back into a cursor later.  The resumed cursor carries on exactly
+where the checkpoint was taken, without repeating or skipping an
+entry, as long as the tree has not changed in between; entries added
+or removed since are picked up or left out as they would be by a walk
+that reached them late.
+
+Each directory is listed in sorted name order, so a position inside a
+directory is just the name of the last entry taken from it.  The
+cursor only holds the directories still to be walked (the frontier):
+for order='dfs' the chain of directories from the root down to the
+current one, for order='bfs' the queue of directories waiting to be
+listed.  Memory use and the size of the token grow with the frontier,
+not with the size of the tree.
+
+For the same reason there is no record of every directory entered.
+A symbolic link back to one of the directories above it is not
+followed, so loops are safe, but a directory linked from several
+places is walked once for each; pass follow_symlinks=False to keep out
+of links altogether.
+"""
+import os, zlib, marshal, base64, bisect
+from collections import deque
+
+import Path_Object
+from Path_Object import path, PathWalkWarning
+
+__all__ = ['WalkCursor']
+
+_TOKEN_VERSION = 1
+
+#----------------------------------------------------------------------
+def _dir_key(p, st):
+	""" The identity of directory p with stat result st. """
+	if st.st_ino:
+		return (st.st_dev, st.st_ino)
+	# st_ino is 0 on Python 2 on Windows.
+	return os.path.normcase(os.path.realpath(p))
+
+########################################################################
+class _AncestorGuard(object):
+	""" The _WalkGuard of a cursor: it keeps no record of the directories
+	entered, only refuses the ones in 'chain', the keys of the directory
+	being listed and of those above it. """
+	#----------------------------------------------------------------------
+	def __init__(self, root, follow_symlinks=True, same_filesystem=False):
+		self.follow_symlinks = follow_symlinks
+		self.same_filesystem = same_filesystem
+		self.chain = ()
+		# Key of the directory the last enter() agreed to.
+		self.key = None
+		try:
+			st = os.stat(root)
+		except OSError:
+			# The cursor reports the error when it lists the root.
+			self.device = None
+			self.root_key = None
+			return
+		self.device = st.st_dev
+		self.root_key = _dir_key(root, st)
+	#----------------------------------------------------------------------
+	def enter(self, entry):
+		self.key = None
+		if not self.follow_symlinks and entry.is_symlink():
+			return False
+		try:
+			st = entry.stat()
+		except OSError:
+			return True
+		if self.same_filesystem and self.device is not None and st.st_dev != self.device:
+			return False
+		key = _dir_key(entry.path, st)
+		if key in self.chain:
+			return None
+		self.key = key
+		return True
+
+########################################################################
+class _Frame(object):
+	""" A directory on the frontier and how far its listing has been taken. """
+	__slots__ = ('top', 'depth', 'after', 'chain', 'entries', 'pos')
+	#----------------------------------------------------------------------
+	def __init__(self, top, depth, after, chain):
+		self.top = top
+		self.depth = depth
+		# Name of the last entry taken, None before the first.
+		self.after = after
+		self.chain = chain
+		# The sorted listing, read when the frame is reached.
+		self.entries = None
+		self.pos = 0
+
+########################################################################
+class WalkCursor(object):
+	""" A walk of the tree below 'root' that returns its results a page
+	at a time and can be checkpointed and resumed. """
+	#----------------------------------------------------------------------
+	def __init__(self, root, pattern=None, kind='all', order='dfs', max_depth=None,
+	             page_size=1000, errors='strict', regex=None, matcher=None,
+	             follow_symlinks=True, same_filesystem=False):
+		"""
+		kind      - 'all', 'dirs' or 'files', as walk(), walkdirs() and
+		            walkfiles().  pattern, regex, matcher, errors,
+		            follow_symlinks and same_filesystem mean what they
+		            do there.
+		order     - 'dfs' for depth first, each directory just before
+		            its contents, or 'bfs' for breadth first, level by
+		            level.
+		max_depth - how many levels to walk: 1 gives only the entries
+		            directly in root, None every level.
+		page_size - most results next_page() returns.
+		"""
+		if errors not in ('strict', 'warn', 'ignore'):
+			raise ValueError("invalid errors parameter")
+		if kind not in ('all', 'dirs', 'files'):
+			raise ValueError("invalid kind parameter")
+		if order not in ('dfs', 'bfs'):
+			raise ValueError("invalid order parameter")
+		if max_depth is not None and max_depth < 0:
+			raise ValueError("max_depth must not be negative")
+		if page_size < 1:
+			raise ValueError("page_size must be at least 1")
+		self.root = path(root)
+		self.pattern = pattern
+		self.kind = kind
+		self.order = order
+		self.max_depth = max_depth
+		self.page_size = page_size
+		self.errors = errors
+		self.regex = regex
+		self.matcher = matcher
+		self.follow_symlinks = follow_symlinks
+		self.same_filesystem = same_filesystem
+		# Number of results handed out so far, across resumes.
+		self.count = 0
+		self._matches = Path_Object._name_matcher(pattern, regex, matcher)
+		self._excluded = None
+		if matcher is not None:
+			self._excluded = matcher._walk_filters()[1]
+		self._guard = _AncestorGuard(self.root, follow_symlinks, same_filesystem)
+		self._frames = deque()
+		if max_depth != 0:
+			chain = ()
+			if self._guard.root_key is not None:
+				chain = (self._guard.root_key,)
+			self._frames.append(_Frame(Path_Object._base(self.root), 0, None, chain))
+	#----------------------------------------------------------------------
+	@property
+	def done(self):
+		""" Whether the walk is finished. """
+		return not self._frames
+	#----------------------------------------------------------------------
+	def _list(self, frame):
+		""" Read the listing of 'frame', skipping what was taken before. """
+		entries = Path_Object._scandir(frame.top)
+		entries.sort(key=lambda entry: entry.name)
+		frame.entries = entries
+		frame.pos = 0
+		if frame.after is not None:
+			frame.pos = bisect.bisect_right([entry.name for entry in entries], frame.after)
+	#----------------------------------------------------------------------
+	def next_page(self, page_size=None):
+		""" Return a list of up to page_size results; it is empty once the
+		walk is finished.
+
+		With errors='strict' an unreadable directory raises at the start
+		of a page, after the results before it were returned, and stays
+		on the frontier: the next call, or a cursor resumed from a
+		checkpoint taken now, tries it again.
+		"""
+		size = page_size or self.page_size
+		cls = self.root.__class__
+		kind, guard, frames = self.kind, self._guard, self._frames
+		matches, excluded, max_depth = self._matches, self._excluded, self.max_depth
+		dfs = self.order == 'dfs'
+		page = []
+		while frames and len(page) < size:
+			frame = frames[-1] if dfs else frames[0]
+			if frame.entries is None:
+				try:
+					self._list(frame)
+				except Exception, exc:
+					if page and self.errors == 'strict':
+						break
+					Path_Object._handleException(exc, self.errors,
+						PathWalkWarning("Unable to list directory '%s': %%(exc)s" % frame.top))
+					if dfs:
+						frames.pop()
+					else:
+						frames.popleft()
+					continue
+			entries = frame.entries
+			descend = max_depth is None or frame.depth + 1 < max_depth
+			guard.chain = frame.chain
+			while frame.pos < len(entries) and len(page) < size:
+				entry = entries[frame.pos]
+				frame.pos += 1
+				frame.after = entry.name
+				item, subdir = Path_Object._walk_decision(cls, kind, entry, matches, False, guard, excluded)
+				if item is not None:
+					page.append(item)
+				if subdir is not None and descend:
+					chain = frame.chain
+					if guard.key is not None:
+						chain = chain + (guard.key,)
+					frames.append(_Frame(Path_Object._base(subdir), frame.depth + 1, None, chain))
+					if dfs:
+						break
+			if frame.pos >= len(entries):
+				if dfs and frames[-1] is frame:
+					frames.pop()
+				elif not dfs:
+					frames.popleft()
+		self.count += len(page)
+		return page
+	#----------------------------------------------------------------------
+	def __iter__(self):
+		""" Iterate over the remaining results, a page at a time. """
+		while True:
+			page = self.next_page()
+			if not page:
+				return
+			for item in page:
+				yield item
+	#----------------------------------------------------------------------
+	def checkpoint(self):
+		""" A token of the cursor's position, for WalkCursor.resume().
+
+		The token is a printable string that holds the arguments of the
+		walk, apart from matcher and errors, and its frontier.
+		"""
+		state = {
+			'version': _TOKEN_VERSION,
+			'root': Path_Object._base(self.root),
+			'pattern': self.pattern,
+			'kind': self.kind,
+			'order': self.order,
+			'max_depth': self.max_depth,
+			'page_size': self.page_size,
+			'regex': self.regex,
+			'follow_symlinks': self.follow_symlinks,
+			'same_filesystem': self.same_filesystem,
+			'count': self.count,
+			'frames': [(f.top, f.depth, f.after, f.chain) for f in self._frames],
+		}
+		return base64.urlsafe_b64encode(zlib.compress(marshal.dumps(state)))
+	#----------------------------------------------------------------------
+	@classmethod
+	def resume(cls, token, matcher=None, errors='strict', page_size=None):
+		""" A cursor carrying on from the position in 'token'.  A matcher
+		cannot be stored in a token, so it is passed again here.
+
+		Only resume tokens from a trusted source: they are unpacked with
+		marshal.
+		"""
+		try:
+			state = marshal.loads(zlib.decompress(base64.urlsafe_b64decode(str(token))))
+		except (TypeError, ValueError, EOFError, zlib.error):
+			raise ValueError("Not A Walk Cursor Checkpoint Token")
+		if not isinstance(state, dict) or state.get('version') != _TOKEN_VERSION:
+			raise ValueError("Unsupported Walk Cursor Checkpoint Token")
+		cursor = cls(state['root'], state['pattern'], state['kind'], state['order'], state['max_depth'],
+		             page_size or state['page_size'], errors, state['regex'], matcher,
+		             state['follow_symlinks'], state['same_filesystem'])
+		cursor.count = state['count']
+		cursor._frames = deque(_Frame(top, depth, after, chain) for top, depth, after, chain in state['frames'])
+		return cursor
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'WalkCursor(%r, kind=%r, order=%r, %d returned, %d directories pending)' % (
+			Path_Object._base(self.root), self.kind, self.order, self.count, len(self._frames))
@@ -0,0 +1,125 @@
+""" Path_Dedupe.py - Find files with identical content.
+
+Example:
+
+from Path_Object import path
+for size, copies in path('W:/').duplicates('*.exr'):
+    print size * (len(copies) - 1), copies
+
+The search narrows the candidates in three stages so that most bytes are
+never read:
+
+1. Files are grouped by size; a file with a unique size has no copy.
+2. Within each size group a digest of the first and last 'sample_size'
+   bytes of every file is compared.
+3. Only files whose samples still collide are hashed completely.
+
+The sample and full hashes run on a pool of worker threads, and each set
+of duplicates is yielded as soon as its last member has been hashed.
+The largest files are started first.  Hard links to the same inode
+count as one file, since removing one of them would not free any space.
+"""
+import os, io
+from collections import deque
+
+import Path_Object
+import Path_Columns
+from Path_Object import path, PathWalkWarning
+
+__all__ = ['find_duplicates']
+
+#----------------------------------------------------------------------
+def _sample_digest(p, size, sample_size, algorithm):
+	""" Digest of the first and last sample_size bytes of file p. """
+	h = Path_Object._new_hasher(algorithm)
+	f = io.open(p, 'rb')
+	try:
+		h.update(f.read(sample_size))
+		if size > sample_size:
+			f.seek(max(sample_size, size - sample_size))
+			h.update(f.read(sample_size))
+	finally:
+		f.close()
+	return h.hexdigest()
+
+#----------------------------------------------------------------------
+def find_duplicates(roots, pattern=None, min_size=1, workers=8, sample_size=65536,
+                    algorithm='md5', errors='strict', cache=None, max_pending=None):
+	""" Iterate over (size, [paths]) for every set of files with identical
+	content below the directories in 'roots'.
+
+	pattern     - only consider files whose names match this pattern.
+	min_size    - ignore files smaller than this many bytes.
+	workers     - number of threads reading files.
+	sample_size - bytes read from each end of a file in stage 2.  Files
+	              no larger than twice this are fully compared by it.
+	algorithm   - hashlib algorithm used for the sample and full digests.
+	errors      - 'strict', 'warn' or 'ignore', as for path.walk().  A
+	              file that can not be read is left out of its group.
+	cache       - optional Path_Hash_Cache.HashCache for the full digests.
+	"""
+	if isinstance(roots, basestring):
+		roots = [roots]
+	if max_pending is None:
+		max_pending = 2 * workers
+
+	# Stage 1 - group by size.
+	by_size = {}
+	seen = set()
+	for root in roots:
+		for top, name, st in Path_Columns.walk_stats(root, pattern, errors):
+			if st.st_size < min_size:
+				continue
+			if st.st_ino:
+				inode = (st.st_dev, st.st_ino)
+				if inode in seen:
+					continue
+				seen.add(inode)
+			by_size.setdefault(st.st_size, []).append(path(os.path.join(top, name)))
+	seen = None
+
+	def run(job):
+		stage, key, p = job
+		if stage == 'sample':
+			return _sample_digest(p, key, sample_size, algorithm)
+		return Path_Object.hash_file(p, (algorithm,), cache=cache)[algorithm]
+
+	jobs = deque()
+	# (stage, key) -> [files still to hash, {digest: [paths]}]
+	groups = {}
+	for size in sorted(by_size, reverse=True):
+		paths = by_size.pop(size)
+		if len(paths) < 2:
+			continue
+		groups[('sample', size)] = [len(paths), {}]
+		jobs.extend(('sample', size, p) for p in paths)
+
+	pool = Path_Object._WorkerPool(run, workers, max_pending, name='path-dedupe')
+	try:
+		while jobs or pool.outstanding:
+			while jobs and pool.outstanding < max_pending:
+				pool.submit(jobs.popleft())
+			(stage, key, p), digest, exc = pool.next_result()
+			group = groups[(stage, key)]
+			group[0] -= 1
+			if exc is not None:
+				Path_Object._handleException(exc, errors, PathWalkWarning("Unable to read '%s': %%(exc)s" % p))
+			else:
+				group[1].setdefault(digest, []).append(p)
+			if group[0]:
+				continue
+			del groups[(stage, key)]
+			size = key if stage == 'sample' else key[0]
+			for digest, paths in group[1].iteritems():
+				if len(paths) < 2:
+					continue
+				if stage == 'sample' and size > 2 * sample_size:
+					# Stage 3 - hash the colliding files completely.  The jobs
+					# go to the front so that open groups finish first.
+					full_key = (size, digest)
+					groups[('full', full_key)] = [len(paths), {}]
+					jobs.extendleft(('full', full_key, p) for p in reversed(paths))
+				else:
+					yield size, sorted(paths)
+	finally:
+		pool.close()
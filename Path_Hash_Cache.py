@@ -0,0 +1,224 @@
+""" Path_Hash_Cache.py - A persistent cache of file content hashes.
+
+Example:
+
+from Path_Object import path
+from Path_Hash_Cache import HashCache
+cache = HashCache()
+print path('/Volumes/common/Show/plate.exr').hashes(('md5', 'sha256'), cache=cache)
+print cache.stats()
+
+A digest is stored against the file's identity - (st_dev, st_ino), or
+the normalised absolute path where the platform reports no inode - and
+is only returned while the file's size and mtime still match the ones
+it was computed for.  An unchanged file therefore costs one stat() call
+instead of a full read.
+
+The cache is an SQLite database on local disk, so any number of threads
+and processes can read and write it at the same time.  It holds at most
+'max_entries' digests: a store that takes it past that evicts the least
+recently used ones, down to 15/16 of max_entries so the digests are
+only counted again after max_entries / 16 more stores.  Each HashCache
+object keeps its own count, so digests other processes store meanwhile
+are only seen at its next eviction and can run the total over by that
+many.
+"""
+import os, time, threading, sqlite3
+
+import Path_Object
+
+__all__ = ['HashCache', 'default_cache_path']
+
+# How often, in seconds, a hit refreshes an entry's last-used time.
+# Refreshing on every hit would turn every lookup into a write.
+_TOUCH_INTERVAL = 3600.0
+# A store past max_entries evicts down to this fraction of it.
+_EVICT_TO = 15 / 16.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+	file_key  TEXT    NOT NULL,
+	algorithm TEXT    NOT NULL,
+	size      INTEGER NOT NULL,
+	mtime_ns  INTEGER NOT NULL,
+	digest    TEXT    NOT NULL,
+	path      TEXT,
+	last_used REAL    NOT NULL,
+	PRIMARY KEY (file_key, algorithm)
+);
+CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used);
+"""
+
+#----------------------------------------------------------------------
+def default_cache_path():
+	""" The per-user location of the hash cache on local disk. """
+	if os.name == 'nt':
+		base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+	else:
+		base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+	return os.path.join(base, 'Environment_Access', 'hashes.sqlite')
+
+#----------------------------------------------------------------------
+def _identity(p, st):
+	""" Return (file_key, size, mtime_ns) for file p with stat result st. """
+	mtime_ns = getattr(st, 'st_mtime_ns', None)
+	if mtime_ns is None:
+		mtime_ns = int(st.st_mtime * 1000000000)
+	if st.st_ino:
+		key = "%d:%d" % (st.st_dev, st.st_ino)
+	else:
+		# Python 2 on Windows reports st_ino as 0.
+		key = "path:" + os.path.normcase(os.path.abspath(p))
+	return key, st.st_size, mtime_ns
+
+########################################################################
+class HashCache(object):
+	""" Persistent {file identity: digest} store shared between processes. """
+	#----------------------------------------------------------------------
+	def __init__(self, filename=None, max_entries=1000000, timeout=30.0):
+		self.filename = filename or default_cache_path()
+		self.max_entries = max_entries
+		self.timeout = timeout
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		# Digests in the database as of the last count, plus those
+		# stored since; None until the first store counts them.
+		self._entries = None
+		self._lock = threading.Lock()
+		self._local = threading.local()
+		folder = os.path.dirname(self.filename)
+		if folder and not os.path.isdir(folder):
+			try:
+				os.makedirs(folder)
+			except OSError:
+				# Created by another process in the meantime.
+				if not os.path.isdir(folder):
+					raise
+		conn = self._connection()
+		conn.executescript(_SCHEMA)
+		conn.commit()
+	#----------------------------------------------------------------------
+	def _connection(self):
+		""" The calling thread's connection; sqlite3 connections can not be shared between threads. """
+		conn = getattr(self._local, 'conn', None)
+		if conn is None:
+			conn = sqlite3.connect(self.filename, timeout=self.timeout)
+			try:
+				conn.execute("PRAGMA journal_mode=WAL")
+			except sqlite3.DatabaseError:
+				pass
+			self._local.conn = conn
+		return conn
+	#----------------------------------------------------------------------
+	def _count(self, hits=0, misses=0, evictions=0):
+		with self._lock:
+			self.hits += hits
+			self.misses += misses
+			self.evictions += evictions
+	#----------------------------------------------------------------------
+	def lookup(self, p, algorithms=('md5',), st=None):
+		""" Return {algorithm: hexdigest} for the algorithms cached for p
+		that are still valid.  Algorithms without a valid digest are
+		left out of the result. """
+		if st is None:
+			st = os.stat(p)
+		key, size, mtime_ns = _identity(p, st)
+		conn = self._connection()
+		now = time.time()
+		res = {}
+		stale_touch = []
+		for name in algorithms:
+			row = conn.execute("SELECT size, mtime_ns, digest, last_used FROM hashes "
+			                   "WHERE file_key = ? AND algorithm = ?", (key, name)).fetchone()
+			if row is not None and row[0] == size and row[1] == mtime_ns:
+				res[name] = str(row[2])
+				if now - row[3] > _TOUCH_INTERVAL:
+					stale_touch.append(name)
+		if stale_touch:
+			conn.executemany("UPDATE hashes SET last_used = ? WHERE file_key = ? AND algorithm = ?",
+			                 [(now, key, name) for name in stale_touch])
+			conn.commit()
+		self._count(hits=len(res), misses=len(algorithms) - len(res))
+		return res
+	#----------------------------------------------------------------------
+	def store(self, p, digests, st):
+		""" Record {algorithm: hexdigest} for p, as computed when p had stat result st. """
+		key, size, mtime_ns = _identity(p, st)
+		now = time.time()
+		conn = self._connection()
+		conn.executemany("INSERT OR REPLACE INTO hashes (file_key, algorithm, size, mtime_ns, digest, path, last_used) "
+		                 "VALUES (?, ?, ?, ?, ?, ?, ?)",
+		                 [(key, name, size, mtime_ns, digest, Path_Object._base(p), now)
+		                  for name, digest in digests.iteritems()])
+		conn.commit()
+		with self._lock:
+			if self._entries is not None:
+				# Replaced digests are counted too, which only evicts sooner.
+				self._entries += len(digests)
+			check = self._entries is None or self._entries > self.max_entries
+		if check:
+			self._evict(int(self.max_entries * _EVICT_TO))
+	#----------------------------------------------------------------------
+	def evict(self):
+		""" Drop the least recently used digests beyond max_entries. """
+		return self._evict(self.max_entries)
+	#----------------------------------------------------------------------
+	def _evict(self, keep):
+		""" Count the digests and, if there are more than max_entries, drop
+		the least recently used down to 'keep'.  Returns how many went. """
+		conn = self._connection()
+		count = conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+		excess = count - keep if count > self.max_entries else 0
+		if excess > 0:
+			conn.execute("DELETE FROM hashes WHERE rowid IN "
+			             "(SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)", (excess,))
+			conn.commit()
+			self._count(evictions=excess)
+		with self._lock:
+			self._entries = count - excess
+		return excess
+	#----------------------------------------------------------------------
+	def hash_file(self, p, algorithms=('md5',), buffer_size=None):
+		""" Return {algorithm: hexdigest} for file p, reading the file only
+		for the algorithms that have no valid cached digest. """
+		if isinstance(algorithms, basestring):
+			algorithms = (algorithms,)
+		st = os.stat(p)
+		res = self.lookup(p, algorithms, st)
+		missing = [name for name in algorithms if name not in res]
+		if missing:
+			hashers = Path_Object._hash_file(p, missing, buffer_size)
+			computed = dict((name, h.hexdigest()) for name, h in zip(missing, hashers))
+			res.update(computed)
+			# Only keep the digests if the file did not change while it was read.
+			after = os.stat(p)
+			if _identity(p, after) == _identity(p, st):
+				self.store(p, computed, st)
+		return res
+	#----------------------------------------------------------------------
+	def invalidate(self, p):
+		""" Forget every digest stored for p. """
+		key = _identity(p, os.stat(p))[0]
+		conn = self._connection()
+		conn.execute("DELETE FROM hashes WHERE file_key = ?", (key,))
+		conn.commit()
+	#----------------------------------------------------------------------
+	def clear(self):
+		""" Forget every digest. """
+		conn = self._connection()
+		conn.execute("DELETE FROM hashes")
+		conn.commit()
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return self._connection().execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+	#----------------------------------------------------------------------
+	def stats(self):
+		""" Return a dict of hits, misses, evictions and entries counted
+		by this HashCache object (entries covers every process). """
+		with self._lock:
+			res = {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+		res['entries'] = len(self)
+		total = res['hits'] + res['misses']
+		res['hit_rate'] = float(res['hits']) / total if total else 0.0
+		return res
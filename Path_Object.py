@@ -17,7 +17,6 @@ Date:    7 Mar 2004
 
 
 # TODO
-#   - Tree-walking functions don't avoid symlink loops.  Matt Harrison sent me a patch for this.
 #   - Tree-walking functions can't ignore errors.  Matt Harrison asked for this.
 #
 #   - Two people asked for path.chdir().  This just seems wrong to me,
@@ -33,15 +32,35 @@ Date:    7 Mar 2004
 #   - Could add split() and join() methods that generate warnings.
 
 from __future__ import generators
-import sys, warnings, os, fnmatch, glob, shutil, codecs, re, datetime
+import sys, warnings, os, fnmatch, glob, shutil, codecs, re, datetime, time, io, binascii, mmap
+from stat import S_ISDIR, S_ISREG, S_ISLNK
+import threading, Queue, itertools
+from collections import OrderedDict
 
 try:
 	import grp
 except ImportError:
 	grp = None
 
+# Directory reads that carry the entry type (d_type) with each name.
+# Python 3.5+ ships this as os.scandir, Python 2 needs the scandir backport.
+try:
+	from os import scandir as _scandir_impl
+except ImportError:
+	try:
+		from scandir import scandir as _scandir_impl
+	except ImportError:
+		_scandir_impl = None
+
+# fix for python 2.5 - module md5 is deprecated and now part of new hashlib
+try:
+	import hashlib
+except ImportError:
+	hashlib = None
+
 __version__ = '2.1'
-__all__ = ['path']
+__all__ = ['path', 'PathMatcher', 'StatCache', 'enable_stat_cache', 'disable_stat_cache', 'get_stat_cache', 'stat_many',
+           'hash_file', 'hash_files']
 
 # Platform-specific support for path.owner
 if os.name == 'nt':
@@ -82,6 +101,19 @@ _textmode = 'r'
 if hasattr(file, 'newlines'):
 	_textmode = 'U'
 
+# Every standard end-of-line sequence, matched in one pass.
+_NEWLINES_RE = re.compile('\r\n?')
+_UNICODE_NEWLINES_RE = re.compile(u'\r\n|\r\x85|[\r\x85\u2028]')
+
+# Every end-of-line sequence including '\n', for rewriting them to a linesep.
+_WRITE_NEWLINES_RE = re.compile('\r\n?|\n')
+_WRITE_UNICODE_NEWLINES_RE = re.compile(u'\r\n|\r\x85|[\r\n\x85\u2028]')
+
+# Size of the blocks read by path.iter_chunks() and path.iter_lines().
+READ_CHUNK_SIZE = 1024 * 1024
+# Characters of text path.write_lines() gathers before encoding and writing them.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class PathWalkWarning(Warning):
 	pass
@@ -94,6 +126,811 @@ def _handleException(exc, mode, warningObject):
 	else:
 		raise exc
 
+class _ListdirEntry(object):
+	""" Stand-in for a scandir() DirEntry when scandir is not available.
+
+	Answers is_dir()/is_file()/is_symlink() from a single lstat() of the
+	entry (plus one stat() for symbolic links), instead of the separate
+	isfile() and isdir() calls the walkers used to make.
+	"""
+	__slots__ = ('name', 'path', '_lstat', '_stat')
+
+	def __init__(self, top, name):
+		self.name = name
+		self.path = os.path.join(top, name)
+		self._lstat = None
+		self._stat = None
+
+	def stat(self, follow_symlinks=True):
+		if self._lstat is None:
+			self._lstat = os.lstat(self.path)
+		if follow_symlinks and S_ISLNK(self._lstat.st_mode):
+			if self._stat is None:
+				self._stat = os.stat(self.path)
+			return self._stat
+		return self._lstat
+
+	def inode(self):
+		return self.stat(follow_symlinks=False).st_ino
+
+	def is_symlink(self):
+		try:
+			return S_ISLNK(self.stat(follow_symlinks=False).st_mode)
+		except OSError:
+			return False
+
+	def is_dir(self, follow_symlinks=True):
+		try:
+			return S_ISDIR(self.stat(follow_symlinks).st_mode)
+		except OSError:
+			return False
+
+	def is_file(self, follow_symlinks=True):
+		try:
+			return S_ISREG(self.stat(follow_symlinks).st_mode)
+		except OSError:
+			return False
+
+def _scandir(top):
+	""" Return the entries of directory 'top' from one directory read.
+
+	The entries are scandir() DirEntry objects when scandir is available
+	and _ListdirEntry objects otherwise.  The listing is read completely
+	so no directory handle stays open while the caller walks below it.
+	"""
+	if _scandir_impl is not None:
+		return list(_scandir_impl(top))
+	return [_ListdirEntry(top, name) for name in os.listdir(top)]
+
+class PathMatcher(object):
+	""" Any number of include and exclude patterns compiled into one matcher.
+
+	include       - glob(s) a name must match, as the walkers' 'pattern'.
+	include_regex - regex(es) a name must match (re.match), as 'regex'.
+	exclude       - glob(s) of names to skip.
+	exclude_regex - regex(es) of names to skip.
+
+	A name is included if it matches any of the include globs or
+	regexes (or if none are given).  Passed to walk(), walkdirs(),
+	walkfiles() or walk_parallel() as matcher=, the includes act exactly
+	like the 'pattern' argument, while excluded entries are dropped
+	before anything else happens: an excluded directory is never listed,
+	so the whole subtree below it is pruned.  For example
+
+		m = PathMatcher(include='*.py', exclude=['.git', '__pycache__', '*_cache'])
+		for f in path(code_root).walkfiles(matcher=m):
+			...
+
+	All the globs, and all the regexes, are each compiled into one
+	regular expression.  Globs follow fnmatch and are case-insensitive
+	where the platform is.
+	"""
+	def __init__(self, include=None, exclude=None, include_regex=None, exclude_regex=None):
+		self._include = self._compile(include, include_regex)
+		self._exclude = self._compile(exclude, exclude_regex)
+
+	@staticmethod
+	def _compile(globs, regexes):
+		""" Return a function name -> bool matching any of globs/regexes, or None. """
+		if isinstance(globs, basestring):
+			globs = [globs]
+		if isinstance(regexes, basestring):
+			regexes = [regexes]
+		tests = []
+		if globs:
+			parts = []
+			for g in globs:
+				t = fnmatch.translate(os.path.normcase(g))
+				if t.endswith('(?ms)'):
+					# Python 2 appends the flags; they are given once below.
+					t = t[:-5]
+				parts.append('(?:%s)' % t)
+			flags = re.S
+			if os.path.normcase('A') == 'a':
+				flags |= re.I
+			tests.append(re.compile('|'.join(parts), flags).match)
+		if regexes:
+			tests.append(re.compile('|'.join('(?:%s)' % r for r in regexes)).match)
+		if not tests:
+			return None
+		if len(tests) == 1:
+			test = tests[0]
+			return lambda name: test(name) is not None
+		glob_test, regex_test = tests
+		return lambda name: glob_test(name) is not None or regex_test(name) is not None
+
+	def included(self, name):
+		""" Whether 'name' matches the include patterns. """
+		return self._include is None or self._include(name)
+
+	def excluded(self, name):
+		""" Whether 'name' matches an exclude pattern. """
+		return self._exclude is not None and self._exclude(name)
+
+	def matches(self, name):
+		""" Whether 'name' is included and not excluded. """
+		return self.included(name) and not self.excluded(name)
+
+	def _walk_filters(self):
+		""" Return (include test or None, exclude test or None) for the walkers. """
+		return self._include, self._exclude
+
+def _name_matcher(pattern, regex, matcher=None):
+	""" Return a function testing an entry name against the walkers'
+	'pattern' (fnmatch) and 'regex' (re.match) arguments and the
+	include patterns of 'matcher', or None when none of them is given.
+	"""
+	include = None
+	if matcher is not None:
+		include = matcher._walk_filters()[0]
+	if pattern is None and regex is None and include is None:
+		return None
+	regex_match = None
+	if regex is not None:
+		regex_match = re.compile(regex).match
+	def matches(name):
+		if pattern is not None and not fnmatch.fnmatch(name, pattern):
+			return False
+		if include is not None and not include(name):
+			return False
+		return regex_match is None or regex_match(name) is not None
+	return matches
+
+# Base names of the mount points, as (time read, frozenset or None).
+_mount_names_cache = (0.0, None)
+# Seconds _mount_names() reuses the mount table for.
+_MOUNT_TABLE_TTL = 10.0
+
+def _mount_names():
+	""" The base names of the mount points of this system, or None if
+	the mount table can not be read on this platform.  Read from
+	/proc/self/mountinfo on Linux and from mount(8) on macOS and BSD. """
+	global _mount_names_cache
+	read_at, names = _mount_names_cache
+	if time.time() - read_at < _MOUNT_TABLE_TTL:
+		return names
+	points = None
+	try:
+		if sys.platform.startswith('linux'):
+			f = open('/proc/self/mountinfo')
+			try:
+				# Field 5 is the mount point, with blanks escaped as \040.
+				points = [re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), line.split()[4])
+				          for line in f if len(line.split()) > 4]
+			finally:
+				f.close()
+		elif sys.platform == 'darwin' or 'bsd' in sys.platform:
+			import subprocess
+			output = subprocess.Popen(['/sbin/mount'], stdout=subprocess.PIPE).communicate()[0]
+			points = [m.group(1) for m in re.finditer(r'(?m)^.*? on (.*) \(.*\)$', output)]
+	except (IOError, OSError):
+		points = None
+	if points is not None:
+		names = frozenset(os.path.basename(p.rstrip('/')) for p in points)
+	else:
+		names = None
+	_mount_names_cache = (time.time(), names)
+	return names
+
+class _WalkGuard(object):
+	""" Decides which directories a walk descends into.
+
+	Every directory is entered at most once, by its (st_dev, st_ino),
+	so symbolic links that point back up the tree or to a folder that
+	is linked from several places neither loop nor repeat work.  With
+	follow_symlinks=False links to directories are not entered at all,
+	and with same_filesystem=True directories on a device other than
+	the root's are not entered.
+
+	Only links and possible mount points are stat'ed.  Any other
+	directory is on the device of the directory it was listed in, so
+	its inode from the listing and that device identify it.  Where the
+	mount points can not be found (Windows) every directory is stat'ed.
+	"""
+	def __init__(self, root, follow_symlinks=True, same_filesystem=False):
+		self.follow_symlinks = follow_symlinks
+		self.same_filesystem = same_filesystem
+		# st_dev -> set of the st_ino of the directories entered.
+		self._visited = {}
+		# Realpaths of the directories entered, where st_ino is not
+		# available (0 on Python 2 on Windows).
+		self._visited_paths = set()
+		# Directories entered that are not on the root's device -> st_dev.
+		self._devices = {}
+		self._mount_names = _mount_names()
+		try:
+			st = os.stat(root)
+		except OSError:
+			# The walk reports the error when it lists the root.
+			self.device = None
+			return
+		self.device = st.st_dev
+		self._visit(root, st.st_dev, st.st_ino)
+
+	def _visit(self, p, device, inode):
+		""" Record the directory p with the given st_dev and st_ino; None
+		if it was seen before. """
+		if inode:
+			inodes = self._visited.get(device)
+			if inodes is None:
+				inodes = self._visited[device] = set()
+			if inode in inodes:
+				return None
+			inodes.add(inode)
+			if device != self.device:
+				self._devices[p] = device
+			return True
+		key = os.path.normcase(os.path.realpath(p))
+		if key in self._visited_paths:
+			return None
+		self._visited_paths.add(key)
+		return True
+
+	def prepare(self, entry):
+		""" Make the file system calls that enter() and _walk_decision()
+		need for 'entry' ahead of time, for instance on the thread that
+		listed it.  The entry keeps the results; nothing is recorded. """
+		try:
+			if entry.is_symlink():
+				entry.stat()
+			elif entry.is_dir():
+				if self._mount_names is None or entry.name in self._mount_names:
+					entry.stat()
+				else:
+					entry.inode()
+		except OSError:
+			# Gone since the listing, or a broken link; the walk finds out again.
+			pass
+
+	def enter(self, entry):
+		""" Whether the walk descends into the directory 'entry': True or
+		False, or None if the directory was entered before. """
+		is_link = entry.is_symlink()
+		if is_link and not self.follow_symlinks:
+			return False
+		if not is_link and self._mount_names is not None and entry.name not in self._mount_names:
+			try:
+				inode = entry.inode()
+			except OSError:
+				# Gone since the listing; the walk reports it when listing it.
+				return True
+			if inode:
+				device = self._devices.get(os.path.dirname(entry.path), self.device)
+				return self._visit(entry.path, device, inode)
+		try:
+			st = entry.stat()
+		except OSError:
+			return True
+		if self.same_filesystem and self.device is not None and st.st_dev != self.device:
+			return False
+		return self._visit(entry.path, st.st_dev, st.st_ino)
+
+def _walk_decision(cls, kind, entry, matches, realpath, guard, excluded=None):
+	""" Decide what a walk of the given kind ('all', 'dirs' or 'files')
+	does with one directory entry.
+
+	Returns (item, subdir): the path to yield, or None, and the
+	directory to descend into, or None.  guard is the _WalkGuard that
+	decides whether a directory is entered.  Entries whose names pass
+	'excluded' are skipped, and so never listed.
+	"""
+	if excluded is not None and excluded(entry.name):
+		return None, None
+	if kind == 'files':
+		if entry.is_file():
+			if matches is None or matches(entry.name):
+				return cls(entry.path), None
+			return None, None
+		if entry.is_dir() and guard.enter(entry):
+			return None, cls(entry.path)
+		return None, None
+
+	if matches is not None and not matches(entry.name):
+		return None, None
+	if kind == 'all':
+		child = cls(entry.path)
+		if entry.is_dir() and guard.enter(entry):
+			return child, child
+		return child, None
+
+	if not entry.is_dir():
+		return None, None
+	child = cls(entry.path)
+	enter = guard.enter(entry)
+	if not enter:
+		if enter is None and entry.is_symlink():
+			# A link to a directory already walked is not reported again.
+			return None, None
+		return child.realpath() if realpath else child, None
+	if realpath:
+		child = child.realpath()
+	return child, child
+
+class _WorkerPool(object):
+	""" Runs func(arg) for submitted args on a bounded pool of daemon threads.
+
+	At most max_pending calls may be outstanding (queued, running or
+	finished but not yet taken with next_result()); callers keep any
+	further work in a backlog of their own and submit it as results are
+	taken.  So neither the task queue nor the results queue grow beyond
+	max_pending, and the workers block once the consumer falls behind.
+	"""
+	def __init__(self, func, workers, max_pending, name='path-worker'):
+		if workers < 1:
+			raise ValueError("workers must be at least 1")
+		self.func = func
+		self.max_pending = max_pending
+		self.outstanding = 0
+		self._tasks = Queue.Queue(max_pending)
+		self._results = Queue.Queue(max_pending)
+		self._stop = threading.Event()
+		self._threads = []
+		for i in range(workers):
+			t = threading.Thread(target=self._run, name="%s-%d" % (name, i))
+			t.daemon = True
+			t.start()
+			self._threads.append(t)
+
+	def _run(self):
+		while not self._stop.is_set():
+			arg = self._tasks.get()
+			if arg is None:
+				return
+			try:
+				result = (arg, self.func(arg), None)
+			except Exception, exc:
+				result = (arg, None, exc)
+			while not self._stop.is_set():
+				try:
+					self._results.put(result, True, 0.1)
+					break
+				except Queue.Full:
+					pass
+
+	def submit(self, arg):
+		""" Queue func(arg) to be run.  Raises RuntimeError if
+		max_pending calls are already outstanding. """
+		if self.outstanding >= self.max_pending:
+			raise RuntimeError("%d calls are already outstanding" % self.outstanding)
+		self.outstanding += 1
+		self._tasks.put(arg)
+
+	def next_result(self):
+		""" Wait for the next finished call and return (arg, result, exc). """
+		while True:
+			# A timeout keeps the wait interruptible with Ctrl-C on Python 2.
+			try:
+				result = self._results.get(True, 0.5)
+			except Queue.Empty:
+				continue
+			self.outstanding -= 1
+			return result
+
+	def close(self, timeout=1.0):
+		""" Stop the workers, dropping any calls still queued.
+
+		Waits up to 'timeout' seconds for idle workers to exit; a worker
+		still inside func() is left to finish on its own.
+		"""
+		self._stop.set()
+		for t in self._threads:
+			self._tasks.put(None)
+		deadline = time.time() + timeout
+		for t in self._threads:
+			t.join(max(0.0, deadline - time.time()))
+
+def _thread_map(func, items, workers, max_pending=None):
+	""" Run func(item) for every item on a pool of worker threads.
+
+	Yields (item, result, exc) in the order the calls finish.  At most
+	max_pending (default 2 * workers) items are taken from 'items' ahead
+	of the consumer, so 'items' may be a lazy walk of any size.
+	"""
+	if max_pending is None:
+		max_pending = 2 * workers
+	pool = _WorkerPool(func, workers, max_pending)
+	try:
+		items = iter(items)
+		exhausted = False
+		while True:
+			while not exhausted and pool.outstanding < max_pending:
+				try:
+					pool.submit(next(items))
+				except StopIteration:
+					exhausted = True
+			if not pool.outstanding:
+				return
+			yield pool.next_result()
+	finally:
+		pool.close()
+
+class StatCache(object):
+	""" Remembers os.stat()/os.lstat() results per path.
+
+	Results are reused for 'ttl' seconds (None keeps them until they are
+	invalidated).  Failed calls are never cached.  Beyond 'max_entries'
+	results the least recently used are dropped.  Install one with
+	enable_stat_cache() to have path.stat(), lstat() and everything built
+	on them (size, mtime, owner, date_time_object, ...) share a single
+	system call per path.
+	"""
+	def __init__(self, ttl=5.0, max_entries=100000):
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self._lock = threading.Lock()
+		# (path, follow_symlinks) -> (time stored, stat result), least recently used first
+		self._entries = OrderedDict()
+
+	def _key(self, p, follow_symlinks):
+		return (os.path.abspath(p), follow_symlinks)
+
+	def _get(self, key):
+		""" The fresh cached result for key, or None. """
+		with self._lock:
+			cached = self._entries.pop(key, None)
+			if cached is None:
+				return None
+			self._entries[key] = cached
+		if self.ttl is None or time.time() - cached[0] < self.ttl:
+			return cached[1]
+		return None
+
+	def _put(self, key, st):
+		with self._lock:
+			self._entries.pop(key, None)
+			self._entries[key] = (time.time(), st)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def stat(self, p, follow_symlinks=True):
+		""" Return the stat result for p, calling os.stat()/os.lstat()
+		only when there is no fresh cached result. """
+		key = self._key(p, follow_symlinks)
+		st = self._get(key)
+		if st is not None:
+			return st
+		if follow_symlinks:
+			st = os.stat(p)
+		else:
+			st = os.lstat(p)
+		self._put(key, st)
+		return st
+
+	def add(self, p, st, follow_symlinks=True):
+		""" Store the stat result 'st' for p. """
+		self._put(self._key(p, follow_symlinks), st)
+
+	def invalidate(self, paths=None):
+		""" Forget the results for the given path or paths, or for every path. """
+		with self._lock:
+			if paths is None:
+				self._entries.clear()
+				return
+			if isinstance(paths, basestring):
+				paths = [paths]
+			for p in paths:
+				p = os.path.abspath(p)
+				self._entries.pop((p, True), None)
+				self._entries.pop((p, False), None)
+
+	def stat_many(self, paths, follow_symlinks=True):
+		""" Stat every path in 'paths' and cache the results.
+
+		Returns a list of stat results in the same order, with None for
+		paths that could not be stat'ed.  Paths that share a directory
+		are answered from one scandir() of that directory where
+		possible; on Windows that directory read carries the complete
+		stat information, so no per-file call is made at all.
+		"""
+		paths = list(paths)
+		res = [None] * len(paths)
+		by_dir = {}
+		for i, p in enumerate(paths):
+			st = self._get(self._key(p, follow_symlinks))
+			if st is not None:
+				res[i] = st
+			else:
+				head, tail = os.path.split(os.path.abspath(p))
+				by_dir.setdefault(head, {})[tail] = i
+
+		for head, wanted in by_dir.iteritems():
+			if _scandir_impl is not None and len(wanted) > 1:
+				try:
+					entries = _scandir(head)
+				except OSError:
+					entries = []
+				for entry in entries:
+					i = wanted.pop(entry.name, None)
+					if i is None:
+						continue
+					try:
+						st = entry.stat(follow_symlinks=follow_symlinks)
+					except OSError:
+						continue
+					self.add(paths[i], st, follow_symlinks)
+					res[i] = st
+			# Anything the directory read did not answer is stat'ed directly.
+			for i in wanted.itervalues():
+				try:
+					res[i] = self.stat(paths[i], follow_symlinks)
+				except OSError:
+					pass
+		return res
+
+	def __len__(self):
+		return len(self._entries)
+
+# The StatCache used by path objects, or None when caching is off.
+_stat_cache = None
+
+def enable_stat_cache(ttl=5.0, max_entries=100000):
+	""" Start caching stat results for path objects and return the StatCache. """
+	global _stat_cache
+	_stat_cache = StatCache(ttl, max_entries)
+	return _stat_cache
+
+def disable_stat_cache():
+	""" Stop caching stat results and drop the cached ones. """
+	global _stat_cache
+	_stat_cache = None
+
+def get_stat_cache():
+	""" Return the active StatCache, or None when caching is off. """
+	return _stat_cache
+
+def stat_many(paths, follow_symlinks=True):
+	""" Stat every path in 'paths', filling the active stat cache.
+
+	Returns the stat results in order, None for paths that could not be
+	stat'ed.  Without an active cache the results are simply returned.
+	"""
+	cache = _stat_cache
+	if cache is None:
+		cache = StatCache(ttl=None)
+	return cache.stat_many(paths, follow_symlinks)
+
+def _invalidate_stat(p):
+	""" Drop p from the active stat cache after an operation changed it. """
+	if _stat_cache is not None:
+		_stat_cache.invalidate(p)
+
+def volume_of(p):
+	""" The volume p lives on: a drive letter or UNC share on Windows and
+	the first two components of the absolute path elsewhere, for example
+	'/Volumes/common'.  Used for per-volume limits and health. """
+	p = os.path.abspath(_base(p))
+	drive, rest = os.path.splitdrive(p)
+	if not drive and hasattr(os.path, 'splitunc'):
+		drive, rest = os.path.splitunc(p)
+	if drive:
+		return os.path.normcase(drive)
+	parts = [part for part in rest.split(os.sep) if part][:2]
+	return os.sep + os.sep.join(parts)
+
+# Read size used when hashing files.  Large reads keep the number of
+# round trips to network volumes low; each thread reuses its buffer.
+HASH_BUFFER_SIZE = 4 * 1024 * 1024
+_hash_buffers = threading.local()
+
+def _new_hasher(name):
+	if hashlib is None:
+		if name != 'md5':
+			raise ValueError("%r hashing requires hashlib" % name)
+		import md5
+		return md5.new()
+	return hashlib.new(name)
+
+_atomic_counter = itertools.count()
+
+# MoveFileExW() flags, from <winbase.h>.
+_MOVEFILE_REPLACE_EXISTING = 0x1
+_MOVEFILE_WRITE_THROUGH    = 0x8
+
+def _replace(src, dst):
+	""" Rename file src to dst, replacing dst in a single step, so that
+	readers always find either the old or the new dst.
+
+	os.rename() does not replace an existing file on Windows, and
+	removing dst first leaves a moment with no dst at all, so there
+	MoveFileExW(MOVEFILE_REPLACE_EXISTING) is called through ctypes.
+	"""
+	if os.name != 'nt':
+		os.rename(src, dst)
+		return
+	import ctypes
+	encoding = sys.getfilesystemencoding()
+	if not isinstance(src, unicode):
+		src = src.decode(encoding)
+	if not isinstance(dst, unicode):
+		dst = dst.decode(encoding)
+	if not ctypes.windll.kernel32.MoveFileExW(src, dst, _MOVEFILE_REPLACE_EXISTING | _MOVEFILE_WRITE_THROUGH):
+		raise ctypes.WinError()
+
+class _WriteTarget(object):
+	""" A binary file opened for writing by the path.write_*() methods.
+
+	With atomic=True the data goes to a temporary file next to the
+	target, which close() renames over the target, so that readers see
+	either the old or the complete new file.  abort() removes the
+	temporary file and leaves the target alone.
+	"""
+	def __init__(self, target, append=False, atomic=False):
+		self.target = _base(target)
+		self.temp = None
+		if not atomic:
+			self.file = io.open(self.target, 'ab' if append else 'wb')
+			return
+		folder, name = os.path.split(self.target)
+		self.temp = os.path.join(folder, '.%s.%d.%d.tmp' % (name, os.getpid(), next(_atomic_counter)))
+		# os.open() applies the umask, unlike tempfile.mkstemp().
+		fd = os.open(self.temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0666)
+		self.file = io.open(fd, 'wb')
+		try:
+			if os.path.exists(self.target):
+				shutil.copymode(self.target, self.temp)
+				if append:
+					src = io.open(self.target, 'rb')
+					try:
+						shutil.copyfileobj(src, self.file, WRITE_BUFFER_SIZE)
+					finally:
+						src.close()
+		except:
+			self.abort()
+			raise
+
+	def write(self, data):
+		self.file.write(data)
+
+	def close(self):
+		self.file.close()
+		if self.temp is not None:
+			_replace(self.temp, self.target)
+			self.temp = None
+		_invalidate_stat(self.target)
+
+	def abort(self):
+		self.file.close()
+		if self.temp is not None:
+			try:
+				os.remove(self.temp)
+			except OSError:
+				pass
+			self.temp = None
+		_invalidate_stat(self.target)
+
+def _decode_chunks(chunks, encoding, errors='strict'):
+	""" Decode an iterable of byte blocks into unicode blocks, carrying
+	characters split across blocks over to the next one. """
+	decoder = codecs.getincrementaldecoder(encoding)(errors)
+	for chunk in chunks:
+		text = decoder.decode(chunk)
+		if text:
+			yield text
+	text = decoder.decode('', True)
+	if text:
+		yield text
+
+def _hash_file(p, algorithms, buffer_size=None):
+	""" Read file p once, feeding every chunk to a new hasher for each
+	of the named algorithms, and return the list of hashers. """
+	buffer_size = buffer_size or HASH_BUFFER_SIZE
+	buf = getattr(_hash_buffers, 'buf', None)
+	if buf is None or len(buf) != buffer_size:
+		buf = _hash_buffers.buf = bytearray(buffer_size)
+	view = memoryview(buf)
+	hashers = [_new_hasher(name) for name in algorithms]
+	f = io.open(p, 'rb', buffering=0)
+	try:
+		while True:
+			n = f.readinto(buf)
+			if not n:
+				break
+			chunk = view[:n]
+			for h in hashers:
+				h.update(chunk)
+	finally:
+		f.close()
+	return hashers
+
+def hash_file(p, algorithms=('md5',), buffer_size=None, cache=None):
+	""" Return {algorithm: hexdigest} for file p, computing every
+	algorithm named in 'algorithms' from a single read of the file.
+
+	With a Path_Hash_Cache.HashCache as 'cache', digests stored for the
+	unchanged file are returned without reading it.
+	"""
+	if isinstance(algorithms, basestring):
+		algorithms = (algorithms,)
+	if cache is not None:
+		return cache.hash_file(p, algorithms, buffer_size)
+	hashers = _hash_file(p, algorithms, buffer_size)
+	return dict((name, h.hexdigest()) for name, h in zip(algorithms, hashers))
+
+def hash_files(paths, algorithms=('md5',), workers=4, errors='strict', buffer_size=None, cache=None):
+	""" Hash many files concurrently.
+
+	Yields (path, {algorithm: hexdigest}) for each file of 'paths' in
+	the order the files finish; 'paths' is consumed lazily, so it can
+	be a walkfiles() generator.  hashlib releases the GIL while it
+	digests large chunks, so the workers hash in parallel as well as
+	overlap their reads.  errors= behaves as it does for path.walk().
+	'cache' is passed on to hash_file().
+	"""
+	if errors not in ('strict', 'warn', 'ignore'):
+		raise ValueError("invalid errors parameter")
+	if isinstance(algorithms, basestring):
+		algorithms = (algorithms,)
+	def digest(p):
+		return hash_file(p, algorithms, buffer_size, cache)
+	for p, digests, exc in _thread_map(digest, paths, workers):
+		if exc is not None:
+			_handleException(exc, errors, PathWalkWarning("Unable to hash '%s': %%(exc)s" % p))
+			continue
+		yield p, digests
+
+# Most entries kept in the splitall() cache; a full cache is simply emptied.
+PATH_CACHE_SIZE = 65536
+# (is unicode, path string) -> tuple of splitall() components
+_splitall_cache = {}
+# Whether paths are split like posixpath does, so that the name
+# properties can slice the string themselves.
+_POSIX_NAMES = os.sep == '/' and os.altsep is None
+
+def _stripext(name):
+	""" The name with its extension removed, as os.path.splitext() does for a single name. """
+	dot = name.rfind('.')
+	if dot > 0 and name[:dot].lstrip('.'):
+		return name[:dot]
+	return name
+
+def _splitall(p, cache=True):
+	""" The components of the path string p as a tuple of plain strings;
+	see path.splitall(). """
+	key = (isinstance(p, unicode), p)
+	res = _splitall_cache.get(key) if cache else None
+	if res is None:
+		parts = []
+		loc = p
+		split = os.path.split
+		while loc != os.curdir and loc != os.pardir:
+			prev = loc
+			loc, child = split(prev)
+			if loc == prev:
+				break
+			parts.append(child)
+		parts.append(loc)
+		parts.reverse()
+		res = tuple(parts)
+		if cache:
+			if len(_splitall_cache) >= PATH_CACHE_SIZE:
+				_splitall_cache.clear()
+			_splitall_cache[key] = res
+	return res
+
+def _relpath_from(origin_parts, dest, cache=True):
+	""" The relative path from the directory whose normcase()d
+	splitall() components are origin_parts to the absolute path
+	string dest, or dest itself if there is none. """
+	normcase = os.path.normcase
+	dest_parts = _splitall(dest, cache)
+	if origin_parts[0] != normcase(dest_parts[0]):
+		# Can't get here from there.
+		return dest
+	# Find the location where the two paths start to differ.
+	i = 0
+	for start_seg, dest_seg in zip(origin_parts, dest_parts):
+		if start_seg != normcase(dest_seg):
+			break
+		i += 1
+	# Work up from the origin to the point of divergence, then down
+	# the diverging part of dest.
+	segments = [os.pardir] * (len(origin_parts) - i)
+	segments += dest_parts[i:]
+	if not segments:
+		# If they happen to be identical, use os.curdir.
+		return os.curdir
+	return os.path.join(*segments)
+
 class date_time_object(object):
 	def __init__(self, full_path):
 		self.path = Path(str(full_path))
@@ -225,6 +1062,11 @@ class path(_base):
 
 		For example, path('/usr/local/lib/libpython.so').parent == path('/usr/local/lib')
 		"""
+		if _POSIX_NAMES:
+			head = self[:self.rfind('/') + 1]
+			if head and head != '/' * len(head):
+				head = head.rstrip('/')
+			return self.__class__(head)
 		return self.dirname()
 	@property
 	def name(self):
@@ -233,6 +1075,8 @@ class path(_base):
 
 		For example, path('/usr/local/lib/libpython.so').name == 'libpython.so'
 		"""
+		if _POSIX_NAMES:
+			return self[self.rfind('/') + 1:]
 		return self.basename()
 	@property
 	def namebase(self):
@@ -242,8 +1086,7 @@ class path(_base):
 		For example, path('/home/guido/python.tar.gz').name     == 'python.tar.gz',
 		but          path('/home/guido/python.tar.gz').namebase == 'python.tar'
 		"""
-		base, ext = os.path.splitext(self.name)
-		return base
+		return _stripext(self.name)
 
 
 	@property
@@ -251,6 +1094,9 @@ class path(_base):
 		"""
 		The file extension, for example '.py'.
 		"""
+		if _POSIX_NAMES:
+			name = self[self.rfind('/') + 1:]
+			return name[len(_stripext(name)):]
 		f, extn = os.path.splitext(_base(self))
 		return extn
 
@@ -325,16 +1171,8 @@ class path(_base):
 
 		path.path.joinpath(*result) will yield the original path.
 		"""
-		parts = []
-		loc = self
-		while loc != os.curdir and loc != os.pardir:
-			prev = loc
-			loc, child = prev.splitpath()
-			if loc == prev:
-				break
-			parts.append(child)
-		parts.append(loc)
-		parts.reverse()
+		parts = list(_splitall(self))
+		parts[0] = self.__class__(parts[0])
 		return parts
 
 	def relpath(self):
@@ -351,37 +1189,35 @@ class path(_base):
 		they reside on different drives in Windows, then this returns
 		dest.abspath().
 		"""
-		origin = self.abspath()
-		dest = self.__class__(dest).abspath()
-
-		orig_list = origin.normcase().splitall()
+		origin = os.path.normcase(os.path.abspath(self))
 		# Don't normcase dest!  We want to preserve the case.
-		dest_list = dest.splitall()
+		dest = os.path.abspath(dest)
+		res = self.__class__(_relpath_from(_splitall(origin), dest))
+		isinstance(res,path)
+		return res
 
-		if orig_list[0] != os.path.normcase(dest_list[0]):
-			# Can't get here from there.
-			return dest
+	def relativize_many(self, paths):
+		""" Return [self.relpathto(p) for p in paths], computed faster.
 
-		# Find the location where the two paths start to differ.
-		i = 0
-		for start_seg, dest_seg in zip(orig_list, dest_list):
-			if start_seg != os.path.normcase(dest_seg):
-				break
-			i += 1
-
-		# Now i is the point where the two paths diverge.
-		# Need a certain number of "os.pardir"s to work up
-		# from the origin to the point of divergence.
-		segments = [os.pardir] * (len(orig_list) - i)
-		# Need to add the diverging part of dest_list.
-		segments += dest_list[i:]
-		if len(segments) == 0:
-			# If they happen to be identical, use os.curdir.
-			relpath = os.curdir
-		else:
-			relpath = os.path.join(*segments)
-		res = self.__class__(relpath)
-		isinstance(res,path)
+		This path is normalised once.  Every normalised absolute path
+		below it is then relativized by slicing the string; the other
+		paths take the general route of relpathto().
+		"""
+		normcase = os.path.normcase
+		sep, altsep = os.sep, os.altsep
+		origin = normcase(os.path.abspath(self))
+		origin_parts = _splitall(origin)
+		prefix = origin if origin.endswith(sep) else origin + sep
+		cls = self.__class__
+		res = []
+		for p in paths:
+			if (p[len(prefix) - 1:len(prefix)] == sep and normcase(p[:len(prefix)]) == prefix
+			    and sep + sep not in p and sep + os.curdir not in p and not p.endswith(sep)
+			    and (altsep is None or altsep not in p)):
+				rel = p[len(prefix):]
+			else:
+				rel = _relpath_from(origin_parts, os.path.abspath(p), cache=False)
+			res.append(cls(rel))
 		return res
 	# --- Listing, searching, walking, and matching
 
@@ -412,10 +1248,11 @@ class path(_base):
 		directories whose names match the given pattern.  For
 		example, d.dirs('build-*').
 		"""
+		res = [self.__class__(entry.path) for entry in _scandir(self)
+		       if (pattern is None or fnmatch.fnmatch(entry.name, pattern)) and entry.is_dir()]
 		if realpath:
-			return [p.realpath() for p in self.listdir(pattern) if p.isdir()]
-		else:
-			return [p for p in self.listdir(pattern) if p.isdir()]
+			return [p.realpath() for p in res]
+		return res
 
 	def files(self, pattern=None):
 		""" D.files() -> List of the files in this directory.
@@ -427,10 +1264,71 @@ class path(_base):
 		whose names match the given pattern.  For example,
 		d.files('*.pyc').
 		"""
+		return [self.__class__(entry.path) for entry in _scandir(self)
+		        if (pattern is None or fnmatch.fnmatch(entry.name, pattern)) and entry.is_file()]
+
+	def sequences(self, pattern=None, min_frames=2, max_gap=1000):
+		""" D.sequences() -> List of the frame sequences in this directory.
+
+		Numbered files such as shot_010.1001.exr ... shot_010.2400.exr
+		are returned as one Path_Sequence.FrameSequence holding the name
+		pattern, frame range, padding and missing frames.  Files that
+		are not part of a sequence of at least min_frames frames are
+		left out; use Path_Sequence.sequences() to get them as well.
+		Frames more than max_gap missing frames apart are split into
+		separate sequences.
+		"""
+		import Path_Sequence
+		return Path_Sequence.sequences(self, pattern, min_frames, max_gap)[0]
+
+	def _walk_tree(self, kind, pattern, errors, regex, realpath=False, matcher=None,
+	               follow_symlinks=True, same_filesystem=False):
+		""" Depth-first traversal engine behind walk(), walkdirs() and walkfiles().
+
+		kind is 'all', 'dirs' or 'files' and selects the semantics of the
+		matching public method.  Every directory is read once with
+		_scandir(), so entry types come from the directory listing rather
+		than from a stat() per child, and the traversal keeps an explicit
+		stack of pending listings instead of one generator per level.
+		A _WalkGuard keeps it from entering any directory twice.
+		"""
+		if errors not in ('strict', 'warn', 'ignore'):
+			raise ValueError("invalid errors parameter")
 
-		return [p for p in self.listdir(pattern) if p.isfile()]
+		cls = self.__class__
+		matches = _name_matcher(pattern, regex, matcher)
+		excluded = None
+		if matcher is not None:
+			excluded = matcher._walk_filters()[1]
 
-	def walk(self, pattern=None, errors='strict', regex=None ):
+		def listing(top):
+			try:
+				return iter(_scandir(top))
+			except Exception, exc:
+				_handleException(exc, errors, PathWalkWarning("Unable to list directory '%s': %%(exc)s" % top))
+				return None
+
+		guard = _WalkGuard(self, follow_symlinks, same_filesystem)
+		entries = listing(self)
+		if entries is None:
+			return
+		# Each frame is the iterator over the remaining entries of a directory.
+		stack = [entries]
+		while stack:
+			for entry in stack[-1]:
+				item, subdir = _walk_decision(cls, kind, entry, matches, realpath, guard, excluded)
+				if item is not None:
+					yield item
+				if subdir is not None:
+					sub_entries = listing(subdir)
+					if sub_entries is not None:
+						stack.append(sub_entries)
+						break
+			else:
+				stack.pop()
+
+	def walk(self, pattern=None, errors='strict', regex=None, matcher=None,
+	         follow_symlinks=True, same_filesystem=False):
 		""" D.walk() -> iterator over files and subdirs, recursively.
 
 		The iterator yields path objects naming each child item of
@@ -444,29 +1342,20 @@ class path(_base):
 		error occurs.  The default is 'strict', which causes an
 		exception.  The other allowed values are 'warn', which
 		reports the error via warnings.warn(), and 'ignore'.
-		"""
-		if errors not in ('strict', 'warn', 'ignore'):
-			raise ValueError("invalid errors parameter")
 
-		try:
-			childList = self.listdir()
-		except Exception, exc:
-			_handleException(exc,errors,
-						     PathWalkWarning("Unable to list directory '%s': %%(exc)s" % self ))
-		else:
-			for child in childList:
-				if ( pattern is None or child.fnmatch(pattern) ) and ( regex is None or re.match( regex, child.name ) ):
-					yield child
-					try:
-						isdir = child.isdir()
-					except Exception, exc:
-						_handleException(exc,errors,PathWalkWarning("Unable to access '%s': %%(exc)s" % self))
+		matcher= takes a PathMatcher; its exclude patterns prune whole
+		subtrees before they are listed.
 
-					if isdir:
-						for item in child.walk(pattern=pattern, errors=errors, regex=regex):
-							yield item
+		follow_symlinks=False keeps the walk out of symbolic links to
+		directories.  Either way no directory is entered twice, so
+		links that loop back up the tree are safe.  same_filesystem=True
+		keeps the walk on the device D is on.
+		"""
+		return self._walk_tree('all', pattern, errors, regex, matcher=matcher,
+		                       follow_symlinks=follow_symlinks, same_filesystem=same_filesystem)
 
-	def walkdirs(self, pattern=None, errors='strict', realpath=False, regex=None):
+	def walkdirs(self, pattern=None, errors='strict', realpath=False, regex=None, matcher=None,
+	             follow_symlinks=True, same_filesystem=False):
 		""" D.walkdirs() -> iterator over subdirs, recursively.
 
 		With the optional 'pattern' argument, this yields only
@@ -478,67 +1367,229 @@ class path(_base):
 		error occurs.  The default is 'strict', which causes an
 		exception.  The other allowed values are 'warn', which
 		reports the error via warnings.warn(), and 'ignore'.
-		"""
-		if errors not in ('strict', 'warn', 'ignore'):
-			raise ValueError("invalid errors parameter")
 
-		try:
-			dirs = self.dirs(realpath=realpath)
-		except Exception, exc:
-			_handleException(exc,errors,PathWalkWarning("Unable to list directory '%s': %%(exc)s" % self))
-		else:
-			parent_realpath = None
-			for child in dirs:
-				if ( pattern is None or child.fnmatch(pattern) ) and ( regex is None or re.match( regex, child.name ) ):
-					if child.islink():
-						if parent_realpath is None:
-							parent_realpath = self.realpath()
-						if realpath:
-							child_realpath = child
-						else:
-							child_realpath = child.realpath()
-						# check for infinite recursion
-						if child_realpath == parent_realpath or parent_realpath.startswith( child_realpath + os.path.sep ):
-							#print "skipping %s to prevent infinite recursion" % child
-							continue
-						else:
-							yield child
-					else:
-						yield child
+		matcher= takes a PathMatcher; its exclude patterns prune whole
+		subtrees before they are listed.
 
-					for subsubdir in child.walkdirs(pattern, errors=errors, realpath=realpath, regex=regex):
-						yield subsubdir
+		follow_symlinks=False keeps the walk out of symbolic links to
+		directories.  Either way no directory is entered twice, so
+		links that loop back up the tree are safe.  same_filesystem=True
+		keeps the walk on the device D is on.
+		"""
+		return self._walk_tree('dirs', pattern, errors, regex, realpath=realpath, matcher=matcher,
+		                       follow_symlinks=follow_symlinks, same_filesystem=same_filesystem)
 
-	def walkfiles(self, pattern=None, errors='strict', regex=None):
+	def walkfiles(self, pattern=None, errors='strict', regex=None, matcher=None,
+	              follow_symlinks=True, same_filesystem=False):
 		""" D.walkfiles() -> iterator over files in D, recursively.
 
 		The optional argument, pattern, limits the results to files
 		with names that match the pattern.  For example,
 		mydir.walkfiles('*.tmp') yields only files with the .tmp
 		extension.
+
+		matcher= takes a PathMatcher; its exclude patterns prune whole
+		subtrees before they are listed.
+
+		follow_symlinks=False keeps the walk out of symbolic links to
+		directories.  Either way no directory is entered twice, so
+		links that loop back up the tree are safe.  same_filesystem=True
+		keeps the walk on the device D is on.
+		"""
+		return self._walk_tree('files', pattern, errors, regex, matcher=matcher,
+		                       follow_symlinks=follow_symlinks, same_filesystem=same_filesystem)
+
+	def walk_parallel(self, pattern=None, errors='strict', regex=None, workers=8,
+	                  ordered=False, kind='all', max_pending=None, matcher=None,
+	                  follow_symlinks=True, same_filesystem=False):
+		""" D.walk_parallel() -> iterator over files and subdirs, recursively,
+		listing directories on a pool of worker threads.
+
+		This is meant for network shares, where a walk spends its time
+		waiting on each directory listing rather than on the CPU.  Up to
+		'workers' directories are listed at the same time, and the worker
+		that lists a directory also finds out the type of each entry, so
+		the consuming thread makes no file system calls.
+
+		kind selects what is walked: 'all' behaves like walk(), 'dirs'
+		like walkdirs() and 'files' like walkfiles().  The pattern,
+		regex, matcher, follow_symlinks, same_filesystem and errors=
+		arguments mean the same as they do there.
+
+		By default items are yielded in the order their directory
+		listings complete.  With ordered=True they come out in exactly
+		the order the serial walker would produce, while the listings
+		are still fetched ahead of the consumer in parallel.
+
+		Results are produced lazily.  At most 'max_pending' listings
+		(default 4 * workers) are queued or held ahead of the consumer,
+		after which the workers wait, so a slow consumer does not cause
+		the whole tree to be buffered.  Directories found beyond that are
+		kept as paths until there is room.
 		"""
 		if errors not in ('strict', 'warn', 'ignore'):
 			raise ValueError("invalid errors parameter")
+		if kind not in ('all', 'dirs', 'files'):
+			raise ValueError("invalid kind parameter")
+		if max_pending is None:
+			max_pending = 4 * workers
+
+		cls = self.__class__
+		matches = _name_matcher(pattern, regex, matcher)
+		excluded = None
+		if matcher is not None:
+			excluded = matcher._walk_filters()[1]
+		guard = _WalkGuard(self, follow_symlinks, same_filesystem)
+
+		def list_dir(top):
+			entries = _scandir(top)
+			for entry in entries:
+				if excluded is None or not excluded(entry.name):
+					guard.prepare(entry)
+			return entries
+
+		pool = _WorkerPool(list_dir, workers, max_pending, name='path-lister')
+
+		def decide(top, entries, exc):
+			if exc is not None:
+				_handleException(exc, errors, PathWalkWarning("Unable to list directory '%s': %%(exc)s" % top))
+				return None
+			return [_walk_decision(cls, kind, entry, matches, False, guard, excluded) for entry in entries]
 
 		try:
-			childList = self.listdir()
-		except Exception, exc:
-			_handleException(exc,errors,PathWalkWarning("Unable to list directory '%s': %%(exc)s" % self))
-		else:
-			for child in childList:
-				try:
-					isfile = child.isfile()
-					isdir = not isfile and child.isdir()
-				except Exception, exc:
-					_handleException(exc,errors,PathWalkWarning("Unable to access '%s': %%(exc)s" % self) )
+			if not ordered:
+				# Directories waiting for a free slot in the pool.
+				backlog = [self]
+				while backlog or pool.outstanding:
+					while backlog and pool.outstanding < max_pending:
+						pool.submit(backlog.pop())
+					decisions = decide(*pool.next_result())
+					for item, subdir in decisions or ():
+						if item is not None:
+							yield item
+						if subdir is not None:
+							backlog.append(subdir)
+				return
+
+			# Directories still to be listed, kept so that popping the end
+			# gives them in the order the depth-first walk will need them.
+			prefetch = []
+			requested = set()
+			ready = {}
+
+			def fetch(top):
+				if top not in requested:
+					if prefetch and prefetch[-1] == top:
+						prefetch.pop()
+					while pool.outstanding >= max_pending:
+						result = pool.next_result()
+						ready[result[0]] = result
+					requested.add(top)
+					pool.submit(top)
+				while top not in ready:
+					result = pool.next_result()
+					ready[result[0]] = result
+				requested.discard(top)
+				decisions = decide(*ready.pop(top))
+				if decisions is None:
+					return None
+				prefetch.extend(reversed([subdir for item, subdir in decisions if subdir is not None]))
+				while prefetch and len(requested) < max_pending:
+					subdir = prefetch.pop()
+					requested.add(subdir)
+					pool.submit(subdir)
+				return iter(decisions)
+
+			decisions = fetch(self)
+			if decisions is None:
+				return
+			stack = [decisions]
+			while stack:
+				for item, subdir in stack[-1]:
+					if item is not None:
+						yield item
+					if subdir is not None:
+						sub_decisions = fetch(subdir)
+						if sub_decisions is not None:
+							stack.append(sub_decisions)
+							break
 				else:
+					stack.pop()
+		finally:
+			pool.close()
+
+	def snapshot(self, store=None, errors='strict', restat=False):
+		""" D.snapshot() -> Path_Snapshot.Snapshot index of everything below D.
+
+		If 'store' names a snapshot file saved earlier for this directory
+		it is loaded and refreshed, listing only the directories that
+		changed since, and saved again.  See Path_Snapshot for details.
+		"""
+		import Path_Snapshot
+		return Path_Snapshot.snapshot(self, store=store, errors=errors, restat=restat)
+
+	def columns(self, pattern=None, errors='strict'):
+		""" D.columns() -> Path_Columns.FileColumns of the files below D.
+
+		Holds the size, mtime, mode and owner of every file that
+		walkfiles(pattern) would yield in flat arrays rather than as
+		path and stat objects.  See Path_Columns for details.
+		"""
+		import Path_Columns
+		return Path_Columns.collect(self, pattern=pattern, errors=errors)
+
+	def table(self, pattern=None, errors='strict', matcher=None):
+		""" D.table() -> Path_Table.PathTable of the files below D.
+
+		A compact set of the paths walkfiles(pattern) would yield, with
+		membership, prefix and subtree queries.  See Path_Table.
+		"""
+		import Path_Table
+		return Path_Table.PathTable.from_walk(self, pattern, errors, matcher)
+
+	def cursor(self, pattern=None, kind='all', order='dfs', max_depth=None, page_size=1000, **kwargs):
+		""" D.cursor() -> Path_Cursor.WalkCursor over the tree below D.
+
+		A walk that returns its results a page at a time from
+		next_page(), depth or breadth first and down to max_depth
+		levels, and whose position can be saved with checkpoint() and
+		picked up again with WalkCursor.resume().  The other keyword
+		arguments are those of walk().  See Path_Cursor.
+		"""
+		import Path_Cursor
+		return Path_Cursor.WalkCursor(self, pattern, kind, order, max_depth, page_size, **kwargs)
+
+	def disk_usage(self, depth=None, workers=8, errors='strict', cache=None, restat=False):
+		""" D.disk_usage() -> {directory: (size, files)} for D and its
+		subdirectories down to 'depth' levels, each covering the whole
+		subtree.
+
+		Directories are listed on 'workers' threads, hard links are
+		counted once and the totals of unchanged directories come from a
+		cache keyed by their mtime.  See Path_Usage.disk_usage().
+		"""
+		import Path_Usage
+		return Path_Usage.disk_usage(self, depth=depth, workers=workers, errors=errors,
+		                             cache=cache, restat=restat)
+
+	def watch(self, callback=None, **kwargs):
+		""" D.watch() -> a started Path_Watch.Watcher reporting the changes
+		below D in debounced batches, to 'callback' or through its
+		get_batch() method.  See Path_Watch.Watcher for the arguments.
+		"""
+		import Path_Watch
+		return Path_Watch.Watcher([self], callback=callback, **kwargs).start()
 
-					if isfile:
-						if ( pattern is None or child.fnmatch(pattern) ) and ( regex is None or re.match( regex, child.name ) ):
-							yield child
-					elif isdir:
-						for f in child.walkfiles(pattern=pattern, errors=errors, regex=regex):
-							yield f
+	def duplicates(self, pattern=None, **kwargs):
+		""" D.duplicates() -> iterator over (size, [paths]) for every set of
+		files below D with identical content.
+
+		Files are compared by size, then by a sample of each end and
+		only then by a full hash.  See Path_Dedupe.find_duplicates()
+		for the keyword arguments.
+		"""
+		import Path_Dedupe
+		return Path_Dedupe.find_duplicates([self], pattern=pattern, **kwargs)
 
 	def fnmatch(self, pattern):
 		""" Return True if self.name matches the given pattern.
@@ -573,21 +1624,28 @@ class path(_base):
 		finally:
 			f.close()
 
-	def write_bytes(self, bytes, append=False):
+	def write_bytes(self, bytes, append=False, atomic=False):
 		""" Open this file and write the given bytes to it.
 
 		Default behavior is to overwrite any existing file.
 		Call p.write_bytes(bytes, append=True) to append instead.
+
+		With atomic=True the bytes are written to a temporary file
+		that is then renamed over this one, so other readers never
+		see a partly written file.
+
+		A unicode string is encoded with the default encoding, as
+		Python 2 file objects do; use write_text() to choose one.
 		"""
-		if append:
-			mode = 'ab'
-		else:
-			mode = 'wb'
-		f = self.open(mode)
+		if isinstance(bytes, unicode):
+			bytes = bytes.encode(sys.getdefaultencoding())
+		f = _WriteTarget(self, append, atomic)
 		try:
 			f.write(bytes)
-		finally:
-			f.close()
+		except:
+			f.abort()
+			raise
+		f.close()
 
 	def text(self, encoding=None, errors='strict'):
 		r""" Open this file, read it in, return the content as a string.
@@ -620,13 +1678,9 @@ class path(_base):
 				t = f.read()
 			finally:
 				f.close()
-			return (t.replace(u'\r\n', u'\n')
-					.replace(u'\r\x85', u'\n')
-					.replace(u'\r', u'\n')
-					.replace(u'\x85', u'\n')
-					.replace(u'\u2028', u'\n'))
+			return _UNICODE_NEWLINES_RE.sub(u'\n', t)
 
-	def write_text(self, text, encoding=None, errors='strict', linesep=os.linesep, append=False):
+	def write_text(self, text, encoding=None, errors='strict', linesep=os.linesep, append=False, atomic=False):
 		r""" Write the given text to this file.
 
 		The default behavior is to overwrite any existing file;
@@ -657,6 +1711,9 @@ class path(_base):
 		    the file already exists (True: append to the end of it;
 		    False: overwrite it.)  The default is False.
 
+		  - atomic - keyword argument - bool - Write a temporary file
+		    and rename it over this one; see write_bytes().
+
 
 		--- Newline handling.
 
@@ -693,13 +1750,8 @@ class path(_base):
 		if isinstance(text, unicode):
 			if linesep is not None:
 				# Convert all standard end-of-line sequences to
-				# ordinary newline characters.
-				text = (text.replace(u'\r\n', u'\n')
-						.replace(u'\r\x85', u'\n')
-						.replace(u'\r', u'\n')
-						.replace(u'\x85', u'\n')
-						.replace(u'\u2028', u'\n'))
-				text = text.replace(u'\n', linesep)
+				# linesep in one pass.
+				text = _WRITE_UNICODE_NEWLINES_RE.sub(linesep.replace('\\', '\\\\'), text)
 			if encoding is None:
 				encoding = sys.getdefaultencoding()
 			bytes = text.encode(encoding, errors)
@@ -708,12 +1760,11 @@ class path(_base):
 			# an 8-bit string.
 			assert encoding is None
 
+			bytes = text
 			if linesep is not None:
-				text = (text.replace('\r\n', '\n')
-						.replace('\r', '\n'))
-				bytes = text.replace('\n', linesep)
+				bytes = _WRITE_NEWLINES_RE.sub(linesep.replace('\\', '\\\\'), text)
 
-		self.write_bytes(bytes, append)
+		self.write_bytes(bytes, append, atomic)
 
 	def lines(self, encoding=None, errors='strict', retain=True):
 		r""" Open this file, read all lines, return them in a list.
@@ -741,8 +1792,83 @@ class path(_base):
 		else:
 			return self.text(encoding, errors).splitlines(retain)
 
+	def iter_chunks(self, size=None, use_mmap=False):
+		""" Iterate over the bytes of this file in blocks of 'size' bytes
+		(READ_CHUNK_SIZE by default), the last one possibly shorter.
+
+		Only one block is held in memory at a time.  With use_mmap=True
+		the file is memory-mapped and the blocks are sliced from the
+		mapping instead of read() from the file.
+		"""
+		size = size or READ_CHUNK_SIZE
+		f = io.open(self, 'rb', buffering=0)
+		try:
+			if use_mmap:
+				try:
+					m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+				except ValueError:
+					# An empty file can not be mapped.
+					return
+				try:
+					for offset in xrange(0, len(m), size):
+						yield m[offset:offset + size]
+				finally:
+					m.close()
+			else:
+				while True:
+					chunk = f.read(size)
+					if not chunk:
+						break
+					yield chunk
+		finally:
+			f.close()
+
+	def iter_lines(self, encoding=None, errors='strict', retain=True, size=None, use_mmap=False):
+		r""" Iterate over the lines of this file.
+
+		Takes the same arguments as lines(), and translates the same
+		end-of-line sequences to '\n', but reads the file in blocks of
+		'size' bytes (see iter_chunks()), so memory use depends on the
+		longest line rather than on the size of the file.
+		"""
+		chunks = self.iter_chunks(size, use_mmap)
+		if encoding is None:
+			newlines, cr, nl, empty = _NEWLINES_RE, '\r', '\n', ''
+		else:
+			newlines, cr, nl, empty = _UNICODE_NEWLINES_RE, u'\r', u'\n', u''
+			chunks = _decode_chunks(chunks, encoding, errors)
+		# The start of a line that has not ended yet, in pieces.
+		pending = []
+		held_cr = False
+		for text in chunks:
+			if held_cr:
+				text = cr + text
+				held_cr = False
+			# A '\r' at the end of a block may be the start of '\r\n'.
+			if text[-1:] == cr:
+				text = text[:-1]
+				held_cr = True
+			if encoding is not None or cr in text:
+				text = newlines.sub(nl, text)
+			parts = text.split(nl)
+			if len(parts) == 1:
+				if text:
+					pending.append(text)
+				continue
+			pending.append(parts[0])
+			first = empty.join(pending)
+			yield first + nl if retain else first
+			for line in parts[1:-1]:
+				yield line + nl if retain else line
+			pending = [parts[-1]] if parts[-1] else []
+		if held_cr:
+			pending.append(nl if retain else empty)
+			yield empty.join(pending)
+		elif pending:
+			yield empty.join(pending)
+
 	def write_lines(self, lines, encoding=None, errors='strict',
-		            linesep=os.linesep, append=False):
+		            linesep=os.linesep, append=False, atomic=False, buffer_size=None):
 		r""" Write the given lines of text to this file.
 
 		By default this overwrites any existing file at this path.
@@ -750,7 +1876,8 @@ class path(_base):
 		This puts a platform-specific newline sequence on every line.
 		See 'linesep' below.
 
-		lines - A list of strings.
+		lines - A list of strings, or any iterable of them; it is
+		    consumed as it is written.
 
 		encoding - A Unicode encoding to use.  This applies only if
 		    'lines' contains any Unicode strings.
@@ -774,13 +1901,20 @@ class path(_base):
 		you specify with the encoding= parameter, the result is
 		mixed-encoding data, which can really confuse someone trying
 		to read the file later.
+
+		Lines are gathered into blocks of about 'buffer_size'
+		characters (WRITE_BUFFER_SIZE by default), and each block is
+		joined, encoded and written at once.  Use atomic=True to
+		write a temporary file and rename it over this one; see
+		write_bytes().
 		"""
-		if append:
-			mode = 'ab'
-		else:
-			mode = 'wb'
-		f = self.open(mode)
+		buffer_size = buffer_size or WRITE_BUFFER_SIZE
+		f = _WriteTarget(self, append, atomic)
 		try:
+			encoder = None
+			batch = []
+			batch_size = 0
+			batch_unicode = False
 			for line in lines:
 				isUnicode = isinstance(line, unicode)
 				if linesep is not None:
@@ -798,38 +1932,63 @@ class path(_base):
 						elif line[-1:] in ('\r', '\n'):
 							line = line[:-1]
 					line += linesep
-				if isUnicode:
-					if encoding is None:
-						encoding = sys.getdefaultencoding()
-					line = line.encode(encoding, errors)
-				f.write(line)
-		finally:
-			f.close()
+				if isUnicode != batch_unicode and batch:
+					encoder = self._write_batch(f, batch, batch_unicode, encoder, encoding, errors)
+					batch_size = 0
+				batch_unicode = isUnicode
+				batch.append(line)
+				batch_size += len(line)
+				if batch_size >= buffer_size:
+					encoder = self._write_batch(f, batch, batch_unicode, encoder, encoding, errors)
+					batch_size = 0
+			if batch:
+				self._write_batch(f, batch, batch_unicode, encoder, encoding, errors)
+		except:
+			f.abort()
+			raise
+		f.close()
+
+	@staticmethod
+	def _write_batch(f, batch, isUnicode, encoder, encoding, errors):
+		""" Join, encode and write the lines in 'batch', then empty it.
+		Returns the incremental encoder used for Unicode lines, so that a
+		byte order mark is only written once. """
+		if isUnicode:
+			if encoder is None:
+				encoder = codecs.getincrementalencoder(encoding or sys.getdefaultencoding())(errors)
+			f.write(encoder.encode(u''.join(batch)))
+		else:
+			f.write(''.join(batch))
+		del batch[:]
+		return encoder
 
-	def read_md5(self):
+	def read_md5(self, cache=None):
 		""" Calculate the md5 hash for this file.
 
-		This reads through the entire file.
+		This reads through the entire file, unless 'cache' (a
+		Path_Hash_Cache.HashCache) holds the digest of the unchanged file.
 		"""
+		if cache is not None:
+			return binascii.unhexlify(cache.hash_file(self, ('md5',))['md5'])
+		return _hash_file(self, ('md5',))[0].digest()
 
-		f = self.open('rb')
-		try:
-			m = None
-			try:
-				# fix for python 2.5 - module md5 is deprecated and now part of new hashlib
-				import hashlib
-				m = hashlib.md5()
-			except ImportError:
-				import md5
-				m = md5.new()
-			while True:
-				d = f.read(8192)
-				if not d:
-					break
-				m.update(d)
-		finally:
-			f.close()
-		return m.digest()
+	def hashes(self, algorithms=('md5',), cache=None):
+		""" Return {algorithm: hexdigest} for this file.
+
+		All the named algorithms are computed from a single read of
+		the file, for example p.hashes(('md5', 'sha256')).  See
+		hash_file() for 'cache'.
+		"""
+		return hash_file(self, algorithms, cache=cache)
+
+	def walkhashes(self, pattern=None, algorithms=('md5',), workers=4, errors='strict', regex=None, cache=None):
+		""" D.walkhashes() -> iterator over (file, {algorithm: hexdigest})
+		for the files walkfiles() yields, hashed on 'workers' threads.
+
+		Results come in the order the files finish hashing.
+		"""
+		return hash_files(self.walkfiles(pattern, errors=errors, regex=regex),
+		                  algorithms, workers=workers, errors=errors, cache=cache)
 
 	# --- Methods for querying the filesystem.
 
@@ -885,16 +2044,20 @@ class path(_base):
 		"""
 		return self.__class__(self.abspath().realpath().normpath())
 
-	getatime = os.path.getatime
+	def getatime(self):
+		return self.stat().st_atime
 	atime = property(getatime, None, None,""" Last access time of the file. """)
-	getmtime = os.path.getmtime
+	def getmtime(self):
+		return self.stat().st_mtime
 	mtime = property(getmtime, None, None,""" Last-modified time of the file. """)
 
 	if hasattr(os.path, 'getctime'):
-		getctime = os.path.getctime
+		def getctime(self):
+			return self.stat().st_ctime
 		ctime = property(getctime, None, None,""" Creation time of the file. """)
 
-	getsize = os.path.getsize
+	def getsize(self):
+		return self.stat().st_size
 	size = property(getsize, None, None,""" Size of the file, in bytes. """)
 
 	if hasattr(os, 'access'):
@@ -906,13 +2069,25 @@ class path(_base):
 			return os.access(self, mode)
 
 	def stat(self):
-		""" Perform a stat() system call on this path. """
+		""" Perform a stat() system call on this path.
+
+		When a stat cache is active (see enable_stat_cache()) a recent
+		result for this path is returned instead.
+		"""
+		if _stat_cache is not None:
+			return _stat_cache.stat(self)
 		return os.stat(self)
 
 	def lstat(self):
 		""" Like path.stat(), but do not follow symbolic links. """
+		if _stat_cache is not None:
+			return _stat_cache.stat(self, follow_symlinks=False)
 		return os.lstat(self)
 
+	def invalidate_stat(self):
+		""" Drop any cached stat results for this path. """
+		_invalidate_stat(self)
+
 	def get_owner(self):
 		r""" Return the name of the owner of this file or directory.
 
@@ -947,6 +2122,7 @@ class path(_base):
 			if isinstance(group, basestring):
 				group = grp.getgrnam(group).gr_gid
 			os.chown( self, -1, group )
+			_invalidate_stat(self)
 
 	if hasattr(os, 'statvfs'):
 		def statvfs(self):
@@ -963,19 +2139,26 @@ class path(_base):
 	def utime(self, times):
 		""" Set the access and modified times of this file. """
 		os.utime(self, times)
+		_invalidate_stat(self)
 
 	def chmod(self, mode):
 		os.chmod(self, mode)
+		_invalidate_stat(self)
 
 	if hasattr(os, 'chown'):
 		def chown(self, uid, gid):
 			os.chown(self, uid, gid)
+			_invalidate_stat(self)
 
 	def rename(self, new):
 		os.rename(self, new)
+		_invalidate_stat(self)
+		_invalidate_stat(new)
 
 	def renames(self, new):
 		os.renames(self, new)
+		_invalidate_stat(self)
+		_invalidate_stat(new)
 
 
 	# --- Create/delete operations on directories
@@ -988,9 +2171,11 @@ class path(_base):
 
 	def rmdir(self):
 		os.rmdir(self)
+		_invalidate_stat(self)
 
 	def removedirs(self):
 		os.removedirs(self)
+		_invalidate_stat(self)
 
 	file_name = property(basename,rename)
 	
@@ -1003,12 +2188,15 @@ class path(_base):
 		fd = os.open(self, os.O_WRONLY | os.O_CREAT, 0666)
 		os.close(fd)
 		os.utime(self, None)
+		_invalidate_stat(self)
 
 	def remove(self):
 		os.remove(self)
+		_invalidate_stat(self)
 
 	def unlink(self):
 		os.unlink(self)
+		_invalidate_stat(self)
 
 
 	# --- Links
@@ -1055,6 +2243,36 @@ class path(_base):
 		move = shutil.move
 	rmtree = shutil.rmtree
 
+	def fastcopy(self, dst, skip_same=False, resume=True, preserve=True, progress=None):
+		""" Copy this file to dst like copy2(), using kernel-side copies
+		where available and resuming an interrupted copy.  See
+		Path_Copy.copy_file() for the arguments and return value.
+		"""
+		import Path_Copy
+		return Path_Copy.copy_file(self, dst, skip_same=skip_same, resume=resume,
+		                           preserve=preserve, progress=progress)
+
+	def fastcopytree(self, dst, workers=4, pattern=None, skip_same=True, resume=True,
+	                 preserve=True, progress=None, errors='strict'):
+		""" Copy this directory tree into dst on 'workers' threads, skipping
+		files that are already up to date there.  See
+		Path_Copy.copy_tree() for the arguments and return value.
+		"""
+		import Path_Copy
+		return Path_Copy.copy_tree(self, dst, workers=workers, pattern=pattern, skip_same=skip_same,
+		                           resume=resume, preserve=preserve, progress=progress, errors=errors)
+
+
+	# --- Non-blocking access
+
+	@property
+	def aio(self):
+		""" A Path_Async.AsyncPath for this path: its blocking methods
+		run on a shared pool of worker threads and return futures.
+		"""
+		import Path_Async
+		return Path_Async.AsyncPath(self)
+
 
 	# --- Special stuff from os
 
@@ -0,0 +1,199 @@
+""" Path_Probe.py - Existence checks that can not hang on a dead mount.
+
+Example:
+
+import Path_Probe
+if Path_Probe.exists('/Volumes/common/Utilities'):
+    ...
+print Path_Probe.status('/Volumes/common')      # 'up', 'slow' or 'down'
+
+A stat() of a path on a hung NFS or SMB mount can block the calling
+thread for minutes.  An ExistenceProbe runs each check on a daemon
+thread and waits at most the timeout of the path's volume for it; if
+the check has not finished by then the volume is marked down and the
+path reported missing.  The stuck thread is left to finish on its own
+and brings the volume back up when it does; until then checks of other
+paths on the volume are answered at once, as missing, instead of
+piling up more stuck threads.
+
+Results are cached per path: found paths for positive_ttl seconds and
+missing ones, including those on a volume that is down, for the much
+shorter negative_ttl.  At most max_entries results are kept; past
+that the expired ones are dropped, then those closest to expiring.
+Each volume is reported 'up', 'slow' (its last check took longer than
+slow_after seconds) or 'down'.  Volumes are those of
+Path_Object.volume_of(): a drive letter or UNC share on Windows, the
+first two path components elsewhere.
+"""
+import os, time, threading
+
+import Path_Object
+from Path_Object import volume_of
+
+__all__ = ['ExistenceProbe', 'default_probe', 'exists', 'status', 'UP', 'SLOW', 'DOWN']
+
+# Volume states.
+UP   = 'up'
+SLOW = 'slow'
+DOWN = 'down'
+
+########################################################################
+class _Check(object):
+	""" One existence check in flight, shared by every caller waiting on it. """
+	__slots__ = ('done', 'result', 'started')
+	#----------------------------------------------------------------------
+	def __init__(self):
+		self.done = threading.Event()
+		self.result = False
+		self.started = time.time()
+
+########################################################################
+class ExistenceProbe(object):
+	""" Timeout-bounded, cached os.path.exists() with per-volume health. """
+	#----------------------------------------------------------------------
+	def __init__(self, timeout=2.0, slow_after=0.5, positive_ttl=300.0, negative_ttl=10.0,
+	             max_entries=10000):
+		"""
+		timeout      - seconds to wait for a check, unless set_timeout()
+		               gave the volume its own.
+		slow_after   - seconds after which a finished check marks its
+		               volume slow.
+		positive_ttl - seconds a path found to exist is cached.
+		negative_ttl - seconds a missing path, or any path on a volume
+		               that is down, is cached.
+		max_entries  - most results cached.
+		"""
+		self.timeout = timeout
+		self.slow_after = slow_after
+		self.positive_ttl = positive_ttl
+		self.negative_ttl = negative_ttl
+		self.max_entries = max_entries
+		self._lock = threading.Lock()
+		# path -> (exists, expires)
+		self._cache = {}
+		# path -> _Check in flight
+		self._checks = {}
+		# volume -> timeout
+		self._timeouts = {}
+		# volume -> number of checks in flight
+		self._running = {}
+		# volume -> (status, seconds the last check took, time of the last check)
+		self._volumes = {}
+	#----------------------------------------------------------------------
+	def set_timeout(self, volume, timeout):
+		""" Wait at most 'timeout' seconds for checks on 'volume' (a path
+		on it will do); None goes back to the default. """
+		volume = volume_of(volume)
+		with self._lock:
+			if timeout is None:
+				self._timeouts.pop(volume, None)
+			else:
+				self._timeouts[volume] = timeout
+	#----------------------------------------------------------------------
+	def _remember(self, p, result, now, ttl):
+		""" Cache 'result' for path p.  Called with the lock held. """
+		cache = self._cache
+		if p not in cache and len(cache) >= self.max_entries:
+			for key, (exists, expires) in cache.items():
+				if expires <= now:
+					del cache[key]
+			if len(cache) >= self.max_entries:
+				# Keep the three quarters that stay valid longest, so this
+				# runs once per max_entries / 4 new paths at most.
+				by_expiry = sorted(cache, key=lambda key: cache[key][1])
+				for key in by_expiry[:len(cache) - self.max_entries * 3 // 4]:
+					del cache[key]
+		cache[p] = (result, now + ttl)
+	#----------------------------------------------------------------------
+	def _run(self, p, volume, check):
+		try:
+			result = os.path.exists(p)
+		except Exception:
+			result = False
+		now = time.time()
+		took = now - check.started
+		with self._lock:
+			self._remember(p, result, now, self.positive_ttl if result else self.negative_ttl)
+			self._checks.pop(p, None)
+			self._running[volume] -= 1
+			if not self._running[volume]:
+				del self._running[volume]
+			self._volumes[volume] = (SLOW if took > self.slow_after else UP, took, now)
+		check.result = result
+		check.done.set()
+	#----------------------------------------------------------------------
+	def exists(self, p, timeout=None):
+		""" Whether path p exists.  False if it does not, or if its volume
+		did not answer within the timeout or is known to be down. """
+		p = os.path.abspath(Path_Object._base(p))
+		volume = volume_of(p)
+		now = time.time()
+		with self._lock:
+			cached = self._cache.get(p)
+			if cached is not None and cached[1] > now:
+				return cached[0]
+			if timeout is None:
+				timeout = self._timeouts.get(volume, self.timeout)
+			check = self._checks.get(p)
+			if check is None:
+				state = self._volumes.get(volume)
+				if state is not None and state[0] == DOWN and self._running.get(volume):
+					# A check that timed out on this volume is still stuck.
+					self._remember(p, False, now, self.negative_ttl)
+					return False
+				check = self._checks[p] = _Check()
+				self._running[volume] = self._running.get(volume, 0) + 1
+				t = threading.Thread(target=self._run, args=(p, volume, check), name='path-probe')
+				t.daemon = True
+				t.start()
+		if check.done.wait(timeout):
+			return check.result
+		with self._lock:
+			if check.done.is_set():
+				return check.result
+			now = time.time()
+			self._volumes[volume] = (DOWN, None, now)
+			self._remember(p, False, now, self.negative_ttl)
+			return False
+	#----------------------------------------------------------------------
+	def status(self, volume):
+		""" 'up', 'slow' or 'down' for 'volume' (a path on it will do),
+		or None if nothing on it has been checked. """
+		state = self._volumes.get(volume_of(volume))
+		return None if state is None else state[0]
+	#----------------------------------------------------------------------
+	def volumes(self):
+		""" {volume: (status, seconds the last finished check took or None,
+		time of the last check)} for every volume checked so far. """
+		with self._lock:
+			return dict(self._volumes)
+	#----------------------------------------------------------------------
+	def invalidate(self, p=None):
+		""" Forget the cached result for path p, or every result. """
+		with self._lock:
+			if p is None:
+				self._cache.clear()
+			else:
+				self._cache.pop(os.path.abspath(Path_Object._base(p)), None)
+
+_default_probe = None
+_default_lock = threading.Lock()
+
+#----------------------------------------------------------------------
+def default_probe():
+	""" The ExistenceProbe shared by exists(), status() and utilities. """
+	global _default_probe
+	with _default_lock:
+		if _default_probe is None:
+			_default_probe = ExistenceProbe()
+		return _default_probe
+
+#----------------------------------------------------------------------
+def exists(p, timeout=None):
+	""" default_probe().exists(p, timeout) """
+	return default_probe().exists(p, timeout)
+
+#----------------------------------------------------------------------
+def status(volume):
+	""" default_probe().status(volume) """
+	return default_probe().status(volume)
@@ -0,0 +1,272 @@
+""" Path_Sequence.py - Frame sequence detection for directory listings.
+
+Example:
+
+from Path_Object import path
+for seq in path('/Volumes/common/Show/renders/shot_010').sequences('*.exr'):
+    print seq.pattern, seq.frame_range, seq.missing_range
+
+A directory such as
+
+	shot_010.1001.exr  shot_010.1002.exr ... shot_010.2400.exr
+
+is reported as a single FrameSequence('shot_010.', 4, '.exr') covering
+1001-2400 instead of 1400 separate paths.  The frame number is the last
+run of digits in a file name.  Detection makes one pass over the
+listing and keeps only the frame numbers of each candidate sequence, in
+arrays, so a directory with 100k frames costs a few hundred kilobytes.
+A FrameSequence keeps its missing frames as ranges, so its size depends
+on the number of gaps, not on their length.
+
+Numbers further apart than max_gap missing frames (1000 by default) do
+not belong to the same sequence, so loosely numbered names such as
+render_1.log and render_20240101.log are not taken for a sequence with
+twenty million missing frames.
+
+Padding follows the usual conventions: frames written with leading
+zeros ('0099') fix the padding to their width, and unpadded numbers of
+a single width ('1001' ... '2400') are treated as padded to that width.
+Unpadded numbers of varying width ('8', '9', '10') form a sequence with
+padding 1, i.e. '%d'.
+"""
+import os, re, fnmatch
+from array import array
+from bisect import bisect_right
+
+import Path_Object
+from Path_Object import path
+
+__all__ = ['FrameSequence', 'find_sequences', 'sequences', 'frame_ranges']
+
+_FRAME_RE = re.compile(r'^(.*?)(\d+)(\D*)$')
+
+# Default largest number of missing frames between two frames of one sequence.
+MAX_GAP = 1000
+
+#----------------------------------------------------------------------
+def frame_ranges(frames):
+	""" Compact a sorted list of frames into a string like '1001-1004,1010,1012-1020'. """
+	parts = []
+	start = prev = None
+	for f in frames:
+		if prev is not None and f == prev + 1:
+			prev = f
+			continue
+		if start is not None:
+			parts.append(str(start) if start == prev else "%d-%d" % (start, prev))
+		start = prev = f
+	if start is not None:
+		parts.append(str(start) if start == prev else "%d-%d" % (start, prev))
+	return ",".join(parts)
+
+########################################################################
+class FrameSequence(object):
+	""" A numbered file sequence: directory, head + padded frame + tail.
+
+	Only the first and last frame and the ranges of missing frames are
+	stored; the frame paths are produced on demand.
+	"""
+	__slots__ = ('directory', 'head', 'padding', 'tail', 'start', 'end',
+	             '_gap_starts', '_gap_stops', '_missing_count')
+	#----------------------------------------------------------------------
+	def __init__(self, directory, head, padding, tail, frames):
+		""" frames is a sorted sequence of the frame numbers present. """
+		self.directory = directory
+		self.head = head
+		self.padding = padding
+		self.tail = tail
+		self.start = frames[0]
+		self.end = frames[-1]
+		# Missing frames as ranges: gap i is xrange(_gap_starts[i], _gap_stops[i]).
+		starts = array('l')
+		stops = array('l')
+		count = 0
+		expected = self.start
+		for f in frames:
+			if f > expected:
+				starts.append(expected)
+				stops.append(f)
+				count += f - expected
+			expected = f + 1
+		self._gap_starts = starts
+		self._gap_stops = stops
+		self._missing_count = count
+	#----------------------------------------------------------------------
+	def missing_ranges(self):
+		""" [(start, stop), ...] of the runs of missing frames, each
+		covering xrange(start, stop). """
+		return zip(self._gap_starts, self._gap_stops)
+	#----------------------------------------------------------------------
+	@property
+	def missing(self):
+		""" The list of every missing frame number; see missing_ranges(). """
+		res = []
+		for start, stop in self.missing_ranges():
+			res.extend(xrange(start, stop))
+		return res
+	#----------------------------------------------------------------------
+	@property
+	def pattern(self):
+		""" printf style name, for example 'shot_010.%04d.exr'. """
+		if self.padding > 1:
+			return "%s%%0%dd%s" % (self.head, self.padding, self.tail)
+		return "%s%%d%s" % (self.head, self.tail)
+	#----------------------------------------------------------------------
+	@property
+	def hash_pattern(self):
+		""" Nuke/RV style name, for example 'shot_010.####.exr'. """
+		return "%s%s%s" % (self.head, '#' * self.padding, self.tail)
+	#----------------------------------------------------------------------
+	@property
+	def frame_range(self):
+		""" 'start-end' """
+		return "%d-%d" % (self.start, self.end)
+	#----------------------------------------------------------------------
+	@property
+	def missing_range(self):
+		""" The missing frames compacted like '1005-1010,1200'. """
+		return ",".join(str(start) if stop == start + 1 else "%d-%d" % (start, stop - 1)
+		                for start, stop in self.missing_ranges())
+	#----------------------------------------------------------------------
+	def frame_name(self, frame):
+		""" The file name of 'frame'. """
+		return "%s%0*d%s" % (self.head, self.padding, frame, self.tail)
+	#----------------------------------------------------------------------
+	def frame_path(self, frame):
+		""" The path object of 'frame'. """
+		return path(os.path.join(self.directory, self.frame_name(frame)))
+	#----------------------------------------------------------------------
+	def frames(self):
+		""" Iterate over the frame numbers present. """
+		first = self.start
+		for start, stop in self.missing_ranges():
+			for f in xrange(first, start):
+				yield f
+			first = stop
+		for f in xrange(first, self.end + 1):
+			yield f
+	#----------------------------------------------------------------------
+	def paths(self):
+		""" Iterate over the path objects of the frames present. """
+		for f in self.frames():
+			yield self.frame_path(f)
+	__iter__ = paths
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return self.end - self.start + 1 - self._missing_count
+	#----------------------------------------------------------------------
+	def __contains__(self, frame):
+		if not self.start <= frame <= self.end:
+			return False
+		i = bisect_right(self._gap_starts, frame) - 1
+		return i < 0 or frame >= self._gap_stops[i]
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		res = "FrameSequence(%r, %s" % (os.path.join(self.directory, self.pattern), self.frame_range)
+		if self._missing_count:
+			res += ", missing %s" % self.missing_range
+		return res + ")"
+
+#----------------------------------------------------------------------
+def _split_padding(strict, loose):
+	""" Decide the padding of one (head, tail) group.
+
+	strict maps a padding to the frames written with leading zeros at
+	that width; loose holds the frames written without leading zeros.
+	Returns [(padding, frames), ...].
+	"""
+	groups = dict((pad, list(frames)) for pad, frames in strict.iteritems())
+	if not groups:
+		widths = set(len(str(f)) for f in loose)
+		if len(widths) == 1:
+			return [(widths.pop(), list(loose))]
+		return [(1, list(loose))]
+	pads = sorted(groups, reverse=True)
+	unpadded = []
+	for f in loose:
+		width = len(str(f))
+		for pad in pads:
+			if width >= pad:
+				groups[pad].append(f)
+				break
+		else:
+			unpadded.append(f)
+	res = groups.items()
+	if unpadded:
+		res.append((1, unpadded))
+	return res
+
+#----------------------------------------------------------------------
+def _split_gaps(frames, max_gap):
+	""" Split sorted 'frames' where more than max_gap frames are missing. """
+	if max_gap is None:
+		return [frames]
+	runs = []
+	first = 0
+	for i in xrange(1, len(frames)):
+		if frames[i] - frames[i - 1] > max_gap + 1:
+			runs.append(frames[first:i])
+			first = i
+	runs.append(frames[first:])
+	return runs
+
+#----------------------------------------------------------------------
+def find_sequences(names, directory='', min_frames=2, max_gap=MAX_GAP):
+	""" Group file names into frame sequences in one pass.
+
+	Returns (sequences, others): a list of FrameSequence objects with at
+	least min_frames frames, sorted by pattern, and the list of the
+	names that are not part of any sequence.  Frames more than max_gap
+	missing frames apart start a new sequence; None never splits.
+	"""
+	# (head, tail) -> [{padding: array of frames}, array of unpadded frames, [names]]
+	groups = {}
+	others = []
+	match = _FRAME_RE.match
+	for name in names:
+		m = match(name)
+		if m is None:
+			others.append(name)
+			continue
+		head, digits, tail = m.groups()
+		group = groups.get((head, tail))
+		if group is None:
+			group = groups[(head, tail)] = [{}, array('l'), []]
+		if len(digits) > 1 and digits[0] == '0':
+			frames = group[0].get(len(digits))
+			if frames is None:
+				frames = group[0][len(digits)] = array('l')
+			frames.append(int(digits))
+		else:
+			group[1].append(int(digits))
+		# Names are only kept until the group has enough frames to be a sequence.
+		if group[2] is not None:
+			group[2].append(name)
+			if len(group[2]) >= min_frames:
+				group[2] = None
+
+	sequences = []
+	for (head, tail), (strict, loose, kept) in groups.iteritems():
+		if kept is not None:
+			others.extend(kept)
+			continue
+		for padding, frames in _split_padding(strict, loose):
+			frames.sort()
+			for run in _split_gaps(frames, max_gap):
+				if len(run) < min_frames:
+					others.extend("%s%0*d%s" % (head, padding, f, tail) for f in run)
+					continue
+				sequences.append(FrameSequence(directory, head, padding, tail, run))
+	sequences.sort(key=lambda seq: (seq.pattern, seq.start))
+	return sequences, others
+
+#----------------------------------------------------------------------
+def sequences(directory, pattern=None, min_frames=2, max_gap=MAX_GAP):
+	""" Return (sequences, others) for the files in 'directory' whose
+	names match 'pattern'; others holds path objects of the files that
+	are not part of a sequence.  See find_sequences(). """
+	directory = Path_Object._base(directory)
+	names = (entry.name for entry in Path_Object._scandir(directory)
+	         if entry.is_file() and (pattern is None or fnmatch.fnmatch(entry.name, pattern)))
+	seqs, others = find_sequences(names, directory, min_frames, max_gap)
+	return seqs, [path(os.path.join(directory, name)) for name in others]
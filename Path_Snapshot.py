@@ -0,0 +1,273 @@
+""" Path_Snapshot.py - A persistent, incrementally refreshed index of a file tree.
+
+Example:
+
+from Path_Object import path
+snap = path('/Volumes/common/Show').snapshot('/tmp/show.snap')
+for f in snap.walkfiles('*.exr'):
+    print f
+snap.refresh()
+snap.save()
+
+A snapshot records the name, type, size, mtime and inode of every entry
+below a root, grouped by directory together with that directory's own
+mtime.  Adding, removing or renaming an entry changes the mtime of its
+directory, so refresh() stats every directory once but only lists the
+directories whose mtime changed.  A file rewritten in place does not
+touch its directory; use refresh(restat=True) to pick up new sizes and
+mtimes of files in unchanged directories as well.
+"""
+import os, time, zlib, marshal, fnmatch
+from stat import S_ISDIR, S_ISREG, S_ISLNK
+
+import Path_Object
+from Path_Object import path, PathWalkWarning
+
+__all__ = ['Snapshot', 'DIR', 'FILE', 'LINK', 'OTHER']
+
+_FORMAT_VERSION = 1
+# Directories whose mtime is this close to the time they were listed may
+# still change within the same mtime tick (SMB reports 1-2s resolution),
+# so they are listed again on the next refresh.
+_MTIME_RACE_WINDOW = 2.0
+
+# Entry types as stored in the snapshot.
+DIR   = 'd'
+FILE  = 'f'
+LINK  = 'l'
+OTHER = '?'
+
+def _entry_type(mode):
+	if S_ISDIR(mode):
+		return DIR
+	if S_ISREG(mode):
+		return FILE
+	if S_ISLNK(mode):
+		return LINK
+	return OTHER
+
+########################################################################
+class Snapshot(object):
+	""" Index of every entry below 'root', optionally kept in the file 'store'.
+
+	Symbolic links are recorded but never followed.  The errors=
+	argument controls unreadable directories the same way it does for
+	path.walk(): 'strict' raises, 'warn' warns and 'ignore' skips them.
+	"""
+	#----------------------------------------------------------------------
+	def __init__(self, root, store=None, errors='strict'):
+		if errors not in ('strict', 'warn', 'ignore'):
+			raise ValueError("invalid errors parameter")
+		self.root = path(root)
+		self.store = store
+		self.errors = errors
+		# relative directory -> (mtime, listed_at, ((name, type, size, mtime, inode), ...))
+		self._dirs = {}
+		# Number of directories listed by the last build or refresh.
+		self.relisted = 0
+	#----------------------------------------------------------------------
+	@classmethod
+	def load(cls, store, errors='strict'):
+		""" Read a snapshot previously written with save(). """
+		f = open(store, 'rb')
+		try:
+			data = marshal.loads(zlib.decompress(f.read()))
+		finally:
+			f.close()
+		if data.get('version') != _FORMAT_VERSION:
+			raise ValueError("Unsupported Snapshot Format %r In %r" % (data.get('version'), store))
+		snap = cls(data['root'], store=store, errors=errors)
+		snap._dirs = data['dirs']
+		return snap
+	#----------------------------------------------------------------------
+	def save(self, store=None):
+		""" Write the snapshot to 'store' (default self.store).
+
+		The data is written to a temporary file that is renamed over
+		the store, so readers never see a partly written snapshot.
+		"""
+		store = store or self.store
+		if store is None:
+			raise ValueError("No Store File Was Given For The Snapshot Of %r" % self.root)
+		data = zlib.compress(marshal.dumps({'version': _FORMAT_VERSION,
+		                                    'root'   : _str(self.root),
+		                                    'dirs'   : self._dirs}))
+		path(store).write_bytes(data, atomic=True)
+		self.store = store
+	#----------------------------------------------------------------------
+	def _list(self, top):
+		""" Return the entry records of directory 'top', or None if it can not be listed. """
+		try:
+			entries = Path_Object._scandir(top)
+		except Exception, exc:
+			Path_Object._handleException(exc, self.errors, PathWalkWarning("Unable to list directory '%s': %%(exc)s" % top))
+			return None
+		self.relisted += 1
+		records = []
+		for entry in entries:
+			try:
+				st = entry.stat(follow_symlinks=False)
+			except OSError:
+				# Removed between the listing and the stat.
+				continue
+			records.append((entry.name, _entry_type(st.st_mode), st.st_size, st.st_mtime, st.st_ino))
+		return tuple(records)
+	#----------------------------------------------------------------------
+	def _restat(self, top, records):
+		""" Return 'records' with the size and mtime of every file stat'ed again. """
+		res = []
+		for record in records:
+			if record[1] == FILE:
+				try:
+					st = os.lstat(os.path.join(top, record[0]))
+				except OSError:
+					continue
+				record = (record[0], _entry_type(st.st_mode), st.st_size, st.st_mtime, st.st_ino)
+			res.append(record)
+		return tuple(res)
+	#----------------------------------------------------------------------
+	def refresh(self, restat=False):
+		""" Bring the snapshot up to date with the filesystem.
+
+		Every directory is stat'ed once, but only the directories whose
+		mtime changed since the last refresh (or that are new) are
+		listed again.  With restat=True the files of unchanged
+		directories are stat'ed as well.  Returns self.
+		"""
+		self.relisted = 0
+		old_dirs = self._dirs
+		new_dirs = {}
+		stack = ['']
+		while stack:
+			rel = stack.pop()
+			top = os.path.join(self.root, rel) if rel else self.root
+			try:
+				st = os.stat(top)
+			except Exception, exc:
+				Path_Object._handleException(exc, self.errors, PathWalkWarning("Unable to access '%s': %%(exc)s" % top))
+				continue
+			listed_at = time.time()
+			old = old_dirs.get(rel)
+			if old is not None and old[0] == st.st_mtime and old[1] - old[0] > _MTIME_RACE_WINDOW:
+				records = old[2]
+				listed_at = old[1]
+				if restat:
+					records = self._restat(top, records)
+			else:
+				records = self._list(top)
+				if records is None:
+					continue
+			new_dirs[rel] = (st.st_mtime, listed_at, records)
+			for record in records:
+				if record[1] == DIR:
+					stack.append(os.path.join(rel, record[0]))
+		self._dirs = new_dirs
+		return self
+	#----------------------------------------------------------------------
+	def _relative(self, subdir):
+		""" Turn 'subdir' into a key of self._dirs.  It may be a path below
+		the root as returned by walk(), an absolute path, or a path
+		relative to the root. """
+		if subdir is None:
+			return ''
+		subdir = _str(subdir)
+		prefix = _str(self.root).rstrip(os.sep) + os.sep
+		if subdir.startswith(prefix):
+			subdir = subdir[len(prefix):]
+		elif os.path.isabs(subdir):
+			subdir = self.root.relpathto(subdir)
+		subdir = os.path.normpath(subdir)
+		if subdir == os.curdir:
+			return ''
+		return subdir
+	#----------------------------------------------------------------------
+	def entries(self, subdir=None):
+		""" Iterate over (path, type, size, mtime, inode) for every entry
+		below 'subdir' (default the root), depth first.
+
+		type is one of DIR, FILE, LINK or OTHER.
+		"""
+		start = self._relative(subdir)
+		if start not in self._dirs:
+			return
+		# Each frame is (relative directory, full directory, remaining records).
+		stack = [(start, os.path.join(self.root, start) if start else self.root, iter(self._dirs[start][2]))]
+		while stack:
+			rel, top, records = stack[-1]
+			for name, kind, size, mtime, ino in records:
+				yield path(os.path.join(top, name)), kind, size, mtime, ino
+				if kind == DIR:
+					child = os.path.join(rel, name)
+					if child in self._dirs:
+						stack.append((child, os.path.join(top, name), iter(self._dirs[child][2])))
+						break
+			else:
+				stack.pop()
+	#----------------------------------------------------------------------
+	def walk(self, pattern=None, subdir=None):
+		""" Iterate over every entry below 'subdir' whose name matches 'pattern'. """
+		for p, kind, size, mtime, ino in self.entries(subdir):
+			if pattern is None or fnmatch.fnmatch(p.name, pattern):
+				yield p
+	#----------------------------------------------------------------------
+	def walkfiles(self, pattern=None, subdir=None):
+		""" Iterate over the files below 'subdir' whose names match 'pattern'. """
+		for p, kind, size, mtime, ino in self.entries(subdir):
+			if kind == FILE and (pattern is None or fnmatch.fnmatch(p.name, pattern)):
+				yield p
+	#----------------------------------------------------------------------
+	def walkdirs(self, pattern=None, subdir=None):
+		""" Iterate over the directories below 'subdir' whose names match 'pattern'. """
+		for p, kind, size, mtime, ino in self.entries(subdir):
+			if kind == DIR and (pattern is None or fnmatch.fnmatch(p.name, pattern)):
+				yield p
+	#----------------------------------------------------------------------
+	def listdir(self, subdir=None):
+		""" List the entries directly inside 'subdir' (default the root). """
+		rel = self._relative(subdir)
+		if rel not in self._dirs:
+			raise KeyError("%r Is Not A Directory In The Snapshot Of %r" % (subdir, self.root))
+		top = os.path.join(self.root, rel) if rel else self.root
+		return [path(os.path.join(top, record[0])) for record in self._dirs[rel][2]]
+	#----------------------------------------------------------------------
+	def __contains__(self, p):
+		rel = self._relative(p)
+		if rel == '':
+			return True
+		parent, name = os.path.split(rel)
+		if parent not in self._dirs:
+			return False
+		for record in self._dirs[parent][2]:
+			if record[0] == name:
+				return True
+		return False
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return sum(len(d[2]) for d in self._dirs.itervalues())
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'Snapshot(%r, %d entries)' % (_str(self.root), len(self))
+
+def _str(p):
+	""" The plain str/unicode value of a path, for marshal and repr. """
+	return Path_Object._base(p)
+
+#----------------------------------------------------------------------
+def snapshot(root, store=None, errors='strict', restat=False):
+	""" Return an up to date Snapshot of 'root'.
+
+	If 'store' names an existing snapshot of the same root it is loaded
+	and refreshed, so only changed directories are listed; otherwise the
+	tree is indexed from scratch.  The result is saved back to 'store'.
+	"""
+	snap = None
+	if store is not None and os.path.exists(store):
+		snap = Snapshot.load(store, errors=errors)
+		if os.path.normcase(snap.root) != os.path.normcase(root):
+			snap = None
+	if snap is None:
+		snap = Snapshot(root, store=store, errors=errors)
+	snap.refresh(restat=restat)
+	if store is not None:
+		snap.save()
+	return snap
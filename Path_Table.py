@@ -0,0 +1,208 @@
+""" Path_Table.py - A memory-compact set of paths.
+
+Example:
+
+from Path_Object import path
+from Path_Table import PathTable
+table = PathTable.from_walk(path('/Volumes/common/Show'), '*.exr')
+print len(table), '/Volumes/common/Show/shot_010/plate.1001.exr' in table
+for p in table.subtree('/Volumes/common/Show/shot_010'):
+    print p
+
+A million paths below one show root repeat the same long prefixes a
+million times when they are kept as strings.  A PathTable stores every
+path component once, as a node of a tree held in flat arrays (parent
+and name indexes), and every distinct name once in an interned name
+table.  The children of each directory are kept in a pair of arrays
+sorted by name, searched with bisect, so a lookup needs no per-path
+hash table.  path objects are built only when a path is handed out.
+
+Paths are split on os.sep (and os.altsep) and rebuilt by joining the
+components with os.sep, so a path comes back exactly as it was added,
+apart from any trailing separator.
+"""
+import os
+from array import array
+from bisect import bisect_left
+
+import Path_Object
+from Path_Object import path
+
+__all__ = ['PathTable']
+
+########################################################################
+class PathTable(object):
+	""" A set of paths stored as a tree of interned path components. """
+	#----------------------------------------------------------------------
+	def __init__(self, paths=None):
+		# Per node: parent node (-1 for a top level component), name id
+		# and membership flag.  Nodes are numbered in the order added.
+		self._parent = array('l')
+		self._name = array('l')
+		self._member = bytearray()
+		# node (-1 for the top level) -> (name ids, child nodes): the
+		# children of each node that has any, sorted by name id.
+		self._children = {}
+		# Interned names: name -> name id, and name id -> name.
+		self._name_ids = {}
+		self._names = []
+		self._count = 0
+		if paths is not None:
+			self.update(paths)
+	#----------------------------------------------------------------------
+	@classmethod
+	def from_walk(cls, root, pattern=None, errors='strict', matcher=None):
+		""" A PathTable of the files path(root).walkfiles() yields. """
+		table = cls()
+		table.update(path(root).walkfiles(pattern, errors=errors, matcher=matcher))
+		return table
+	#----------------------------------------------------------------------
+	@staticmethod
+	def _split(p):
+		p = Path_Object._base(p)
+		if os.altsep:
+			p = p.replace(os.altsep, os.sep)
+		if not p:
+			raise ValueError("empty path")
+		parts = p.split(os.sep)
+		# Drop a trailing separator; '/' itself becomes the single
+		# component '', the parent of every absolute path.
+		while len(parts) > 1 and parts[-1] == '':
+			parts.pop()
+		return parts
+	#----------------------------------------------------------------------
+	def _name_id(self, name, create):
+		name_id = self._name_ids.get(name)
+		if name_id is None and create:
+			name_id = self._name_ids[name] = len(self._names)
+			self._names.append(intern(name) if isinstance(name, str) else name)
+		return name_id
+	#----------------------------------------------------------------------
+	def _node(self, p, create=False):
+		""" The node of path p, or -1 if it is not in the table. """
+		node = -1
+		for part in self._split(p):
+			name_id = self._name_id(part, create)
+			if name_id is None:
+				return -1
+			children = self._children.get(node)
+			if children is not None:
+				name_ids, nodes = children
+				i = bisect_left(name_ids, name_id)
+				if i < len(name_ids) and name_ids[i] == name_id:
+					node = nodes[i]
+					continue
+			if not create:
+				return -1
+			child = len(self._parent)
+			self._parent.append(node)
+			self._name.append(name_id)
+			self._member.append(0)
+			if children is None:
+				children = self._children[node] = (array('l'), array('l'))
+				i = 0
+			# New names get the highest ids, so this is usually an append.
+			children[0].insert(i, name_id)
+			children[1].insert(i, child)
+			node = child
+		return node
+	#----------------------------------------------------------------------
+	def _child_nodes(self, node):
+		""" The child nodes of 'node' in the order they were added. """
+		children = self._children.get(node)
+		if children is None:
+			return []
+		return sorted(children[1])
+	#----------------------------------------------------------------------
+	def add(self, p):
+		""" Add path p. """
+		node = self._node(p, create=True)
+		if not self._member[node]:
+			self._member[node] = 1
+			self._count += 1
+	#----------------------------------------------------------------------
+	def update(self, paths):
+		""" Add every path in 'paths'. """
+		for p in paths:
+			self.add(p)
+	#----------------------------------------------------------------------
+	def discard(self, p):
+		""" Remove path p if it is present.  Its components stay in the
+		table, so a later add() of the same path is cheap. """
+		node = self._node(p)
+		if node != -1 and self._member[node]:
+			self._member[node] = 0
+			self._count -= 1
+	#----------------------------------------------------------------------
+	def __contains__(self, p):
+		node = self._node(p)
+		return node != -1 and self._member[node] == 1
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return self._count
+	#----------------------------------------------------------------------
+	def _string(self, node):
+		parts = []
+		names, parents, name_ids = self._names, self._parent, self._name
+		while node != -1:
+			parts.append(names[name_ids[node]])
+			node = parents[node]
+		parts.reverse()
+		if parts == ['']:
+			return os.sep
+		return os.sep.join(parts)
+	#----------------------------------------------------------------------
+	def _members_below(self, node):
+		""" Iterate over the member nodes in the subtree of 'node', depth first. """
+		member = self._member
+		stack = [node]
+		while stack:
+			n = stack.pop()
+			if member[n]:
+				yield n
+			children = self._child_nodes(n)
+			# Push the newest first so the oldest pops first.
+			children.reverse()
+			stack.extend(children)
+	#----------------------------------------------------------------------
+	def __iter__(self):
+		""" Iterate over the paths as path objects. """
+		member = self._member
+		for node in xrange(len(self._parent)):
+			if member[node]:
+				yield path(self._string(node))
+	#----------------------------------------------------------------------
+	def has_prefix(self, prefix):
+		""" Whether any path in the table is 'prefix' or lies below it. """
+		node = self._node(prefix)
+		if node == -1:
+			return False
+		for n in self._members_below(node):
+			return True
+		return False
+	#----------------------------------------------------------------------
+	def subtree(self, prefix):
+		""" Iterate over the paths that are 'prefix' or lie below it. """
+		node = self._node(prefix)
+		if node == -1:
+			return
+		for n in self._members_below(node):
+			yield path(self._string(n))
+	#----------------------------------------------------------------------
+	def count_below(self, prefix):
+		""" The number of paths that are 'prefix' or lie below it. """
+		node = self._node(prefix)
+		if node == -1:
+			return 0
+		return sum(1 for n in self._members_below(node))
+	#----------------------------------------------------------------------
+	def children(self, prefix):
+		""" The path objects of the components directly below 'prefix'
+		that are, or lead to, paths in the table. """
+		node = self._node(prefix)
+		if node == -1:
+			return []
+		return [path(self._string(c)) for c in self._child_nodes(node)]
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'PathTable(%d paths, %d nodes, %d names)' % (self._count, len(self._parent), len(self._names))
@@ -0,0 +1,216 @@
+""" Path_Usage.py - Directory sizes, computed in parallel and cached.
+
+Example:
+
+from Path_Object import path
+for folder, (size, files) in sorted(path('/Volumes/common/Show').disk_usage(depth=1).items()):
+    print "%10.1f GB %8d files  %s" % (size / 1e9, files, folder)
+
+disk_usage() lists the directories of a tree on a pool of worker
+threads and returns the total size and number of files below each
+directory down to the requested depth.  Sizes are apparent sizes
+(st_size), symbolic links are neither followed nor counted, and a file
+with several hard links inside the tree is counted once, in the first
+directory that holds it in sorted order.
+
+The size and file count of the files directly inside each directory
+are cached against that directory's mtime.  Adding, removing or
+renaming a file changes the mtime of its directory, so a repeat query
+stats every directory but only lists the ones that changed.  A file
+rewritten in place does not touch its directory; pass restat=True to
+list every directory again.  The cache lives in memory for the life of
+the process, holding at most max_entries directories and dropping the
+least recently used first, and UsageCache(store) keeps it in a file
+between runs.
+"""
+import os, time, zlib, marshal, threading
+from collections import OrderedDict
+from stat import S_ISDIR, S_ISREG
+
+import Path_Object
+from Path_Object import path, PathWalkWarning
+from Path_Snapshot import _MTIME_RACE_WINDOW
+
+__all__ = ['UsageCache', 'disk_usage', 'shared_cache']
+
+_FORMAT_VERSION = 1
+
+########################################################################
+class UsageCache(object):
+	""" The totals of the files directly inside each directory, keyed by
+	the directory's path and only valid while its mtime is unchanged.
+	Beyond 'max_entries' directories the least recently used are
+	dropped. """
+	#----------------------------------------------------------------------
+	def __init__(self, store=None, max_entries=100000):
+		self.store = store
+		self.max_entries = max_entries
+		self._lock = threading.Lock()
+		# directory -> (mtime, listed_at, size, files, (subdir names), ((dev, ino, size), ...)),
+		# least recently used first
+		self._dirs = OrderedDict()
+		if store is not None and os.path.exists(store):
+			f = open(store, 'rb')
+			try:
+				data = marshal.loads(zlib.decompress(f.read()))
+			finally:
+				f.close()
+			if data.get('version') == _FORMAT_VERSION:
+				self._dirs.update(data['dirs'])
+				self._trim()
+	#----------------------------------------------------------------------
+	def get(self, top, mtime):
+		""" The cached (size, files, subdirs, linked) of directory 'top',
+		or None if it is missing or stale. """
+		with self._lock:
+			record = self._dirs.pop(top, None)
+			if record is None:
+				return None
+			self._dirs[top] = record
+		if record[0] != mtime or record[1] - mtime < _MTIME_RACE_WINDOW:
+			return None
+		return record[2:]
+	#----------------------------------------------------------------------
+	def put(self, top, mtime, listed_at, record):
+		with self._lock:
+			self._dirs.pop(top, None)
+			self._dirs[top] = (mtime, listed_at) + tuple(record)
+			self._trim()
+	#----------------------------------------------------------------------
+	def _trim(self):
+		while len(self._dirs) > self.max_entries:
+			self._dirs.popitem(last=False)
+	#----------------------------------------------------------------------
+	def clear(self):
+		with self._lock:
+			self._dirs.clear()
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return len(self._dirs)
+	#----------------------------------------------------------------------
+	def save(self, store=None):
+		""" Write the cache to 'store' (default self.store), atomically. """
+		store = store or self.store
+		if store is None:
+			raise ValueError("No Store File Was Given For The Usage Cache")
+		with self._lock:
+			dirs = dict(self._dirs)
+		path(store).write_bytes(zlib.compress(marshal.dumps({'version': _FORMAT_VERSION, 'dirs': dirs})), atomic=True)
+		self.store = store
+
+_shared_cache = UsageCache()
+
+#----------------------------------------------------------------------
+def shared_cache():
+	""" The in-memory UsageCache disk_usage() uses by default. """
+	return _shared_cache
+
+#----------------------------------------------------------------------
+def _scan(top, cache, restat):
+	""" Return (size, files, subdirs, linked) for the files directly
+	inside directory 'top'.  linked holds (dev, ino, size) of the files
+	with more than one link, which are not included in size and files. """
+	mtime = os.stat(top).st_mtime
+	if cache is not None and not restat:
+		record = cache.get(top, mtime)
+		if record is not None:
+			return record
+	listed_at = time.time()
+	size = files = 0
+	subdirs = []
+	linked = []
+	for entry in Path_Object._scandir(top):
+		try:
+			st = entry.stat(follow_symlinks=False)
+		except OSError:
+			# Removed between the listing and the stat.
+			continue
+		if S_ISDIR(st.st_mode):
+			subdirs.append(entry.name)
+		elif S_ISREG(st.st_mode):
+			if st.st_nlink > 1 and st.st_ino:
+				linked.append((st.st_dev, st.st_ino, st.st_size))
+			else:
+				size += st.st_size
+				files += 1
+	record = (size, files, tuple(sorted(subdirs)), tuple(linked))
+	if cache is not None:
+		cache.put(top, mtime, listed_at, record)
+	return record
+
+#----------------------------------------------------------------------
+def disk_usage(root, depth=None, workers=8, errors='strict', cache=None, restat=False):
+	""" Return {directory: (size, files)} for 'root' and the directories
+	below it down to 'depth' levels (None for every level, 0 for the
+	root only).  Each total covers the directory's whole subtree.
+
+	workers - number of threads listing directories.
+	errors  - 'strict', 'warn' or 'ignore', as for path.walk(); an
+	          unreadable directory is left out of the totals.
+	cache   - the UsageCache to use, shared_cache() by default, or
+	          False for none.
+	restat  - list every directory even where the cache is valid.
+	"""
+	if errors not in ('strict', 'warn', 'ignore'):
+		raise ValueError("invalid errors parameter")
+	if cache is None:
+		cache = _shared_cache
+	elif cache is False:
+		cache = None
+	root = Path_Object._base(root)
+
+	# directory -> (size, files, subdirs, linked)
+	records = {}
+	pool = Path_Object._WorkerPool(lambda top: _scan(top, cache, restat), workers, 4 * workers,
+	                               name='path-usage')
+	# Directories waiting for a free slot in the pool.
+	backlog = [root]
+	try:
+		while backlog or pool.outstanding:
+			while backlog and pool.outstanding < pool.max_pending:
+				pool.submit(backlog.pop())
+			top, record, exc = pool.next_result()
+			if exc is not None:
+				Path_Object._handleException(exc, errors, PathWalkWarning("Unable to list directory '%s': %%(exc)s" % top))
+				continue
+			records[top] = record
+			for name in record[2]:
+				backlog.append(os.path.join(top, name))
+	finally:
+		pool.close()
+	if root not in records:
+		return {}
+
+	# Add up the subtrees depth first in sorted order, counting each
+	# hard linked file in the first directory that holds it.
+	seen = set()
+	totals = {}
+	res = {}
+	stack = [(root, 0, False)]
+	while stack:
+		top, level, done = stack.pop()
+		if done:
+			size, files = totals[top]
+			for name in records[top][2]:
+				child = os.path.join(top, name)
+				if child in totals:
+					size += totals[child][0]
+					files += totals[child][1]
+			totals[top] = (size, files)
+			if depth is None or level <= depth:
+				res[path(top)] = (size, files)
+			continue
+		size, files, subdirs, linked = records[top]
+		for dev, ino, link_size in linked:
+			if (dev, ino) not in seen:
+				seen.add((dev, ino))
+				size += link_size
+				files += 1
+		totals[top] = (size, files)
+		stack.append((top, level, True))
+		for name in reversed(subdirs):
+			child = os.path.join(top, name)
+			if child in records:
+				stack.append((child, level + 1, False))
+
+	return res
@@ -0,0 +1,484 @@
+""" Path_Watch.py - Batched change notifications for directory trees.
+
+Example:
+
+from Path_Object import path
+from Path_Watch import Watcher
+def changed(events):
+    for event in events:
+        print event.kind, event.path
+watcher = Watcher(['/Volumes/common/LUTs', '/Volumes/common/ICC'], callback=changed)
+watcher.start()
+...
+watcher.stop()
+
+A Watcher reports every file and directory created, modified or deleted
+below a set of roots.  On Linux local trees are watched with inotify,
+through ctypes, so changes are seen as they happen.  inotify does not
+see changes made by other machines on NFS or SMB mounts, so roots on
+network filesystems, and every root on other platforms, are polled
+instead: every 'poll_interval' seconds a Path_Snapshot of the root is
+refreshed and compared with the previous one.  Polling stats every
+entry, so it suits configuration trees rather than whole shows.
+
+Events are collected until none has arrived for 'debounce' seconds (or
+for at most 'max_delay' seconds), merged per path - a file created and
+then modified is reported once, as created; a file created and deleted
+again not at all - and delivered as one batch, either to 'callback' on
+the watcher's thread or through get_batch().  If inotify drops events
+an OVERFLOW event for the root is delivered; anything cached about that
+root should then be rebuilt.
+
+With invalidate=True (the default) the Path_Object stat cache entry of
+every changed path is dropped before the batch is delivered.
+"""
+import os, sys, time, struct, select, errno, threading, warnings, Queue
+from collections import OrderedDict
+
+import Path_Object
+import Path_Snapshot
+from Path_Object import path, PathWalkWarning
+
+__all__ = ['Watcher', 'ChangeEvent', 'CREATED', 'MODIFIED', 'DELETED', 'OVERFLOW', 'inotify_available']
+
+# Event kinds.
+CREATED  = 'created'
+MODIFIED = 'modified'
+DELETED  = 'deleted'
+OVERFLOW = 'overflow'
+
+# Filesystems inotify can not watch for changes made by other machines.
+_NETWORK_FILESYSTEMS = frozenset(('nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', 'ncpfs', 'coda',
+                                  'fuse.sshfs', 'fuse.glusterfs', 'glusterfs', 'ceph', 'lustre', '9p'))
+
+# inotify constants, from <sys/inotify.h>.
+IN_MODIFY      = 0x00000002
+IN_ATTRIB      = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF   = 0x00000800
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ONLYDIR     = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = 0x00000800
+IN_CLOEXEC     = 0x00080000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+               IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+_EVENT_HEADER = struct.Struct('iIII')
+
+########################################################################
+class ChangeEvent(object):
+	""" One change below a watched root. """
+	__slots__ = ('kind', 'path', 'is_dir')
+	#----------------------------------------------------------------------
+	def __init__(self, kind, p, is_dir=False):
+		self.kind = kind
+		self.path = path(p)
+		self.is_dir = is_dir
+	#----------------------------------------------------------------------
+	def __eq__(self, other):
+		return (isinstance(other, ChangeEvent) and
+		        (self.kind, self.path, self.is_dir) == (other.kind, other.path, other.is_dir))
+	#----------------------------------------------------------------------
+	def __ne__(self, other):
+		return not self == other
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'ChangeEvent(%r, %r%s)' % (self.kind, Path_Object._base(self.path), ', dir' if self.is_dir else '')
+
+#----------------------------------------------------------------------
+def _merge(previous, kind):
+	""" The kind reporting 'previous' followed by 'kind' for one path, or
+	None if the two cancel out. """
+	if previous == CREATED:
+		if kind == DELETED:
+			return None
+		return CREATED
+	if previous == DELETED and kind == CREATED:
+		return MODIFIED
+	return kind
+
+_libc = None
+
+#----------------------------------------------------------------------
+def _inotify():
+	""" The C library with the inotify functions, or None. """
+	global _libc
+	if _libc is None:
+		_libc = False
+		if sys.platform.startswith('linux'):
+			try:
+				import ctypes, ctypes.util
+				libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+				libc.inotify_init1.argtypes = [ctypes.c_int]
+				libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+				libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+				_libc = libc
+			except (ImportError, OSError, AttributeError):
+				pass
+	return _libc or None
+
+#----------------------------------------------------------------------
+def inotify_available():
+	""" Whether this platform offers inotify. """
+	return _inotify() is not None
+
+#----------------------------------------------------------------------
+def _filesystem_type(p):
+	""" The type of the filesystem holding p, from /proc/mounts, or None. """
+	try:
+		f = open('/proc/mounts')
+		try:
+			mounts = f.read().splitlines()
+		finally:
+			f.close()
+	except IOError:
+		return None
+	p = os.path.realpath(Path_Object._base(p))
+	best, kind = '', None
+	for line in mounts:
+		fields = line.split()
+		if len(fields) < 3:
+			continue
+		# Spaces and the like in mount points are written as octal escapes.
+		mount = fields[1].decode('string_escape') if isinstance(fields[1], str) else fields[1]
+		if (p == mount or p.startswith(mount.rstrip('/') + '/')) and len(mount) >= len(best):
+			best, kind = mount, fields[2]
+	return kind
+
+########################################################################
+class _InotifyBackend(object):
+	""" Watches local directory trees with inotify. """
+	#----------------------------------------------------------------------
+	def __init__(self, emit, errors):
+		self.libc = _inotify()
+		self.emit = emit
+		self.errors = errors
+		self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		if self.fd < 0:
+			raise OSError(self._errno(), "inotify_init1 failed")
+		# watch descriptor -> directory
+		self.dirs = {}
+		self.roots = []
+	#----------------------------------------------------------------------
+	def _errno(self):
+		import ctypes
+		return ctypes.get_errno()
+	#----------------------------------------------------------------------
+	def _add_watch(self, top):
+		name = top.encode(sys.getfilesystemencoding()) if isinstance(top, unicode) else top
+		wd = self.libc.inotify_add_watch(self.fd, name, _WATCH_MASK)
+		if wd < 0:
+			code = self._errno()
+			raise OSError(code, "%s: %r" % (os.strerror(code), top))
+		self.dirs[wd] = top
+	#----------------------------------------------------------------------
+	def add_tree(self, top, report=False):
+		""" Watch directory 'top' and every directory below it.  With
+		report=True everything found is emitted as CREATED, for trees
+		that appeared after their parent was watched. """
+		self._add_watch(top)
+		# Links are not followed, so no watch lands outside the tree, and
+		# the entry types come from the listings, without a stat() each.
+		stack = [Path_Object._base(top)]
+		while stack:
+			current = stack.pop()
+			try:
+				entries = Path_Object._scandir(current)
+			except OSError:
+				continue
+			for entry in entries:
+				p = os.path.join(current, entry.name)
+				try:
+					is_dir = entry.is_dir(follow_symlinks=False)
+				except OSError:
+					continue
+				if is_dir:
+					try:
+						self._add_watch(p)
+					except OSError, exc:
+						if exc.errno == errno.ENOSPC:
+							raise
+						continue
+					stack.append(p)
+				if report:
+					self.emit(ChangeEvent(CREATED, p, is_dir))
+	#----------------------------------------------------------------------
+	def add_root(self, root):
+		self.add_tree(root)
+		self.roots.append(root)
+	#----------------------------------------------------------------------
+	def read(self, timeout):
+		""" Wait up to 'timeout' seconds for events and emit them. """
+		ready = select.select([self.fd], [], [], timeout)[0]
+		if not ready:
+			return
+		try:
+			data = os.read(self.fd, 256 * 1024)
+		except OSError, exc:
+			if exc.errno == errno.EAGAIN:
+				return
+			raise
+		offset = 0
+		while offset + _EVENT_HEADER.size <= len(data):
+			wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+			offset += _EVENT_HEADER.size
+			name = data[offset:offset + length].rstrip('\0')
+			offset += length
+			self._event(wd, mask, name)
+	#----------------------------------------------------------------------
+	def _event(self, wd, mask, name):
+		if mask & IN_Q_OVERFLOW:
+			for root in self.roots:
+				self.emit(ChangeEvent(OVERFLOW, root, True))
+			return
+		top = self.dirs.get(wd)
+		if top is None:
+			return
+		if mask & IN_IGNORED:
+			# The watch was removed, because its directory was deleted.
+			del self.dirs[wd]
+			return
+		if not name:
+			# Events of the watched directory itself; its parent reports them.
+			return
+		p = os.path.join(top, name)
+		is_dir = bool(mask & IN_ISDIR)
+		if mask & (IN_CREATE | IN_MOVED_TO):
+			self.emit(ChangeEvent(CREATED, p, is_dir))
+			if is_dir:
+				try:
+					self.add_tree(p, report=True)
+				except OSError, exc:
+					Path_Object._handleException(exc, self.errors, PathWalkWarning("Unable to watch '%s': %%(exc)s" % p))
+		elif mask & (IN_DELETE | IN_MOVED_FROM):
+			self.emit(ChangeEvent(DELETED, p, is_dir))
+		elif mask & (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE):
+			self.emit(ChangeEvent(MODIFIED, p, is_dir))
+	#----------------------------------------------------------------------
+	def close(self):
+		os.close(self.fd)
+
+########################################################################
+class _PollingBackend(object):
+	""" Watches directory trees by comparing Path_Snapshot refreshes. """
+	#----------------------------------------------------------------------
+	def __init__(self, emit, errors):
+		self.emit = emit
+		self.errors = errors
+		self.snapshots = []
+	#----------------------------------------------------------------------
+	def add_root(self, root):
+		self.snapshots.append(Path_Snapshot.Snapshot(root, errors=self.errors).refresh())
+	#----------------------------------------------------------------------
+	def poll(self):
+		for snap in self.snapshots:
+			old = snap._dirs
+			snap.refresh(restat=True)
+			self._compare(snap.root, old, snap._dirs)
+	#----------------------------------------------------------------------
+	def _compare(self, root, old, new):
+		for rel in set(old) | set(new):
+			before = old.get(rel)
+			after = new.get(rel)
+			if before is not None and after is not None and before[2] is after[2]:
+				continue
+			top = os.path.join(root, rel) if rel else root
+			before = dict((r[0], r) for r in before[2]) if before is not None else {}
+			after = dict((r[0], r) for r in after[2]) if after is not None else {}
+			for name, record in after.iteritems():
+				is_dir = record[1] == Path_Snapshot.DIR
+				previous = before.get(name)
+				if previous is None:
+					self.emit(ChangeEvent(CREATED, os.path.join(top, name), is_dir))
+				elif previous[1] != record[1]:
+					self.emit(ChangeEvent(DELETED, os.path.join(top, name), previous[1] == Path_Snapshot.DIR))
+					self.emit(ChangeEvent(CREATED, os.path.join(top, name), is_dir))
+				elif not is_dir and previous[2:] != record[2:]:
+					self.emit(ChangeEvent(MODIFIED, os.path.join(top, name), is_dir))
+			for name, record in before.iteritems():
+				if name not in after:
+					self.emit(ChangeEvent(DELETED, os.path.join(top, name), record[1] == Path_Snapshot.DIR))
+
+########################################################################
+class Watcher(object):
+	""" Delivers batches of ChangeEvents for the trees below 'roots'. """
+	#----------------------------------------------------------------------
+	def __init__(self, roots, callback=None, debounce=0.5, max_delay=5.0, poll_interval=5.0,
+	             backend='auto', invalidate=True, errors='warn'):
+		"""
+		roots         - directories to watch, recursively.
+		callback      - called with each batch (a list of ChangeEvents) on
+		                the watcher's thread.  Without one, batches are
+		                fetched with get_batch().
+		debounce      - deliver a batch once no event arrived for this many
+		                seconds ...
+		max_delay     - ... or once its first event is this many seconds old.
+		poll_interval - seconds between two polls of a polled root.
+		backend       - 'auto', 'inotify' or 'poll'.  'auto' uses inotify
+		                for local roots on Linux and polls the others.
+		invalidate    - drop the stat cache entries of changed paths.
+		errors        - 'strict', 'warn' or 'ignore' for directories that
+		                can not be read or watched.
+		"""
+		if backend not in ('auto', 'inotify', 'poll'):
+			raise ValueError("invalid backend parameter")
+		if errors not in ('strict', 'warn', 'ignore'):
+			raise ValueError("invalid errors parameter")
+		if isinstance(roots, basestring):
+			roots = [roots]
+		self.roots = [Path_Object._base(path(root).abspath()) for root in roots]
+		self.callback = callback
+		self.debounce = debounce
+		self.max_delay = max_delay
+		self.poll_interval = poll_interval
+		self.backend = backend
+		self.invalidate = invalidate
+		self.errors = errors
+		self._raw = Queue.Queue()
+		self._batches = Queue.Queue()
+		self._stop = threading.Event()
+		self._threads = []
+		self._inotify = None
+		self._polling = None
+	#----------------------------------------------------------------------
+	def _use_inotify(self, root):
+		if self.backend == 'poll':
+			return False
+		if not inotify_available():
+			if self.backend == 'inotify':
+				raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+			return False
+		return self.backend == 'inotify' or _filesystem_type(root) not in _NETWORK_FILESYSTEMS
+	#----------------------------------------------------------------------
+	def start(self):
+		""" Start watching.  Returns self. """
+		emit = self._raw.put
+		for root in self.roots:
+			if self._use_inotify(root):
+				if self._inotify is None:
+					self._inotify = _InotifyBackend(emit, self.errors)
+				try:
+					self._inotify.add_root(root)
+					continue
+				except OSError, exc:
+					if self.backend == 'inotify':
+						raise
+					# Usually the inotify watch limit; fall back to polling.
+					warnings.warn("Polling '%s' instead of watching it with inotify: %s" % (root, exc), PathWalkWarning)
+			if self._polling is None:
+				self._polling = _PollingBackend(emit, self.errors)
+			self._polling.add_root(root)
+		if self._inotify is not None:
+			self._spawn(self._run_inotify, 'path-watch-inotify')
+		if self._polling is not None:
+			self._spawn(self._run_polling, 'path-watch-poll')
+		self._spawn(self._dispatch, 'path-watch-dispatch')
+		return self
+	#----------------------------------------------------------------------
+	def _spawn(self, target, name):
+		t = threading.Thread(target=target, name=name)
+		t.daemon = True
+		t.start()
+		self._threads.append(t)
+	#----------------------------------------------------------------------
+	def _run_inotify(self):
+		while not self._stop.is_set():
+			try:
+				self._inotify.read(0.2)
+			except Exception, exc:
+				if self._stop.is_set():
+					return
+				Path_Object._handleException(exc, 'warn', PathWalkWarning("inotify failed: %(exc)s"))
+				time.sleep(1.0)
+	#----------------------------------------------------------------------
+	def _run_polling(self):
+		while not self._stop.wait(self.poll_interval):
+			try:
+				self._polling.poll()
+			except Exception, exc:
+				Path_Object._handleException(exc, 'warn', PathWalkWarning("Polling failed: %(exc)s"))
+	#----------------------------------------------------------------------
+	def _dispatch(self):
+		""" Merge raw events per path and deliver them in debounced batches. """
+		pending = OrderedDict()
+		first = last = None
+		while not self._stop.is_set():
+			if pending:
+				timeout = min(last + self.debounce, first + self.max_delay) - time.time()
+			else:
+				timeout = 0.2
+			try:
+				event = self._raw.get(True, max(timeout, 0.0))
+			except Queue.Empty:
+				event = None
+			now = time.time()
+			if event is not None:
+				key = (event.path, event.is_dir)
+				previous = pending.pop(key, None)
+				kind = event.kind if previous is None else _merge(previous.kind, event.kind)
+				if kind is not None:
+					event.kind = kind
+					pending[key] = event
+				if first is None:
+					first = now
+				last = now
+				# A steady stream of events must not hold the batch back
+				# past max_delay, so the deadline is checked here too.
+				if now - first < self.max_delay:
+					continue
+			if pending and (now - last >= self.debounce or now - first >= self.max_delay):
+				self._deliver(pending.values())
+				pending = OrderedDict()
+				first = last = None
+		if pending:
+			self._deliver(pending.values())
+	#----------------------------------------------------------------------
+	def _deliver(self, batch):
+		if self.invalidate:
+			for event in batch:
+				Path_Object._invalidate_stat(event.path)
+		if self.callback is None:
+			self._batches.put(batch)
+			return
+		try:
+			self.callback(batch)
+		except Exception, exc:
+			Path_Object._handleException(exc, 'warn', PathWalkWarning("Watcher callback failed: %(exc)s"))
+	#----------------------------------------------------------------------
+	def get_batch(self, timeout=None):
+		""" Wait up to 'timeout' seconds (forever if None) for the next
+		batch of events and return it, or [] on a timeout.  Only used
+		without a callback. """
+		deadline = None if timeout is None else time.time() + timeout
+		while True:
+			# A timeout keeps the wait interruptible with Ctrl-C on Python 2.
+			wait = 0.5 if deadline is None else min(0.5, deadline - time.time())
+			try:
+				return self._batches.get(True, max(wait, 0.0))
+			except Queue.Empty:
+				if deadline is not None and time.time() >= deadline:
+					return []
+	#----------------------------------------------------------------------
+	def stop(self):
+		""" Stop watching and wait for the watcher's threads to exit. """
+		self._stop.set()
+		for t in self._threads:
+			t.join()
+		self._threads = []
+		if self._inotify is not None:
+			self._inotify.close()
+			self._inotify = None
+	#----------------------------------------------------------------------
+	def __enter__(self):
+		return self.start()
+	#----------------------------------------------------------------------
+	def __exit__(self, *exc_info):
+		self.stop()
@@ -1,104 +1,299 @@
+""" System_Paths - The studio's code, application and share locations.
+
+Example:
+
+from Environment_Access import System_Paths
+print System_Paths.AW_GLOBAL_SYSTEMS
+System_Paths.populate_environ()
+
+Nothing below is resolved when the module is imported.  Each constant
+is worked out the first time it is read, from the constants it is
+built on, and then stored on the module, so later reads are ordinary
+attribute lookups.  A missing or hung mount therefore only costs the
+processes that actually use a path on it.
+
+The constants are entries of REGISTRY, a System_Registry.Registry, so
+they can be listed and checked with REGISTRY.validate(), and resolve()
+works out just the ones named and those they are built on.
+
+Every constant below is defined at every site.  A site that keeps a
+location elsewhere overrides it in _SITES, which applies only when the
+AW_SITE environment key names that site.  A site location can also be
+given at run time with REGISTRY.override(site, name, entry); for the
+site in use that drops every constant resolved so far, snapshot values
+included, so they are resolved again with the override.  Values read,
+and keys written to os.environ, before the override keep what they
+were.
+
+Importing the module still adds AW_GLOBAL_SYSTEMS to sys.path and
+writes it to os.environ, as it always has.  It is built on _CODE_BASE
+alone, so working it out costs no file system access outside Windows
+and a local realpath() on it, but adding it to sys.path checks that the
+folder exists.  That check goes through Path_Probe, so a hung mount
+costs the import at most the probe's timeout.  If the folder is
+missing, or its volume is not responding, a warning is issued instead
+of the import failing.
+
+The other AW_* / *_USER_TOOLS_DIR keys are no longer written to
+os.environ on import.  Reading one of those constants writes it, and
+processes that need the whole environment, for example to hand it on
+to child processes, call populate_environ(), which sets every key.
+
+Resolving the roots can be skipped altogether by compiling a snapshot
+of every constant once per site and platform with System_Snapshot.
+When the snapshot matches the definitions below, importing the module
+reads it and takes the values from it.
+"""
 import os
-import subprocess
-from Environment_Access import utilities
+import sys
+import types
+import warnings
+from Environment_Access import utilities, System_Snapshot, System_Registry
+from Environment_Access.System_Registry import root as _root, below as _below, environ as _environ
 
 __this_dir = os.path.dirname(__file__)
 
+########################################################################
+class _Lazy(object):
+	""" A module constant resolved through REGISTRY on first access,
+	together with the constants it is built on that are not resolved
+	yet.  The results are stored on the module, which hides the
+	descriptors from then on; an environ constant is also written to
+	os.environ. """
+	#----------------------------------------------------------------------
+	def __init__(self, name):
+		self.name = name
+	#----------------------------------------------------------------------
+	def __get__(self, module, cls):
+		if module is None:
+			return self
+		try:
+			values = REGISTRY.resolve([self.name], known=module.__dict__)
+		except ValueError, exc:
+			raise AttributeError(str(exc))
+		value = values[self.name]
+		spec = REGISTRY.definition(self.name)
+		if spec[0] == 'environ':
+			values[self.name] = utilities.get_and_set_environ_key(spec[1], default=value, force_default=True)
+		module.__dict__.update(values)
+		return values[self.name]
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return '<unresolved %s>' % self.name
+
 # Master Code Location Paths
-if os.name == 'nt':
-	_CODE_BASE               = utilities.path_fixer(os.path.realpath(__this_dir+"/../.."))
-	_APPS_BASE               = utilities.path_fixer(os.path.realpath(__this_dir+"/../../../Apps"))
-	_PIPE_BASE               = utilities.path_fixer(os.path.realpath(__this_dir+"/../../../Pipeline"))
-	_COMMON_BASE             = utilities.path_fixer(os.path.realpath("V:"))
-	_LIBRARY_BASE            = utilities.path_fixer(os.path.realpath("W:"))
-	_CODE_AMSTERDAM          = utilities.path_fixer(os.path.realpath(__this_dir+"/../../../Amsterdam"))
-elif os.name == 'posix':
-	_CODE_BASE               = utilities.path_fixer("/Volumes/aw_config/Git_Live_Code")
-	_APPS_BASE               = utilities.path_fixer(os.path.realpath("/Volumes/aw_config/Apps"))
-	_PIPE_BASE               = utilities.path_fixer(os.path.realpath("/Volumes/aw_config/Pipeline"))
-	_COMMON_BASE             = utilities.path_fixer(os.path.realpath("/Volumes/common"))
-	_LIBRARY_BASE             = utilities.path_fixer(os.path.realpath("/Volumes/library"))
-
-_EXT_API_SHOTGUN_SGTK    = utilities.path_Builder(_PIPE_BASE, "Shotgun", "studio", "install", "core", "python")
-
-_CODE_COMMON_UTILITIES   = utilities.path_Builder(_COMMON_BASE, "Utilities") 
+_CODE_BASE               = _root(nt=__this_dir+"/../..", posix=("/Volumes/aw_config/Git_Live_Code", False))
+_APPS_BASE               = _root(nt=__this_dir+"/../../../Apps", posix="/Volumes/aw_config/Apps")
+_PIPE_BASE               = _root(nt=__this_dir+"/../../../Pipeline", posix="/Volumes/aw_config/Pipeline")
+_COMMON_BASE             = _root(nt="V:", posix="/Volumes/common")
+_LIBRARY_BASE            = _root(nt="W:", posix="/Volumes/library")
+# Site Locations
+_CODE_AMSTERDAM          = _root(nt=__this_dir+"/../../../Amsterdam")
+
+_EXT_API_SHOTGUN_SGTK    = _below('_PIPE_BASE', "Shotgun", "studio", "install", "core", "python")
+
+_CODE_COMMON_UTILITIES   = _below('_COMMON_BASE', "Utilities")
 # _CODE_BASE             = r"C:\Users\dloveridge\Documents\AW_Git_New_Storage_Repos"
 
 # Top Level Code Location Paths
-_CODE_GLOBAL_SYSTEMS     = utilities.path_Builder(_CODE_BASE, "Global_Systems")
-_CODE_SOFTWARE           = utilities.path_Builder(_CODE_BASE, "Software")
-_CODE_SGTK               = utilities.path_Builder(_CODE_BASE, "SGTK")
+_CODE_GLOBAL_SYSTEMS     = _below('_CODE_BASE', "Global_Systems")
+_CODE_SOFTWARE           = _below('_CODE_BASE', "Software")
+_CODE_SGTK               = _below('_CODE_BASE', "SGTK")
 # PIPLINE Code Location Paths
 # Global Systems Code Location Paths
-_CODE_SETTINGS_AND_PREFS = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "Settings_And_Prefs")
-_CODE_ENVIRONMENT_ACCESS = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "Environment_Access")
-_CODE_AW_SITE_PACKAGES   = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "AW_site_packages")
-_CODE_COMMAND_LINE_APPS  = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "Command_Line_Apps")
-_CODE_AW_USER_TOOLS      = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "User_Tools")
-_CODE_QT                 = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "QT")
-_CODE_DEADLINE_SCRIPT_EXECUTE  = utilities.path_Builder(_CODE_GLOBAL_SYSTEMS, "Deadline_Script_Execute")
+_CODE_SETTINGS_AND_PREFS = _below('_CODE_GLOBAL_SYSTEMS', "Settings_And_Prefs")
+_CODE_ENVIRONMENT_ACCESS = _below('_CODE_GLOBAL_SYSTEMS', "Environment_Access")
+_CODE_AW_SITE_PACKAGES   = _below('_CODE_GLOBAL_SYSTEMS', "AW_site_packages")
+_CODE_COMMAND_LINE_APPS  = _below('_CODE_GLOBAL_SYSTEMS', "Command_Line_Apps")
+_CODE_AW_USER_TOOLS      = _below('_CODE_GLOBAL_SYSTEMS', "User_Tools")
+_CODE_QT                 = _below('_CODE_GLOBAL_SYSTEMS', "QT")
+_CODE_DEADLINE_SCRIPT_EXECUTE  = _below('_CODE_GLOBAL_SYSTEMS', "Deadline_Script_Execute")
 
 # Application Location Paths
-_CODE_PYTHON             = utilities.path_Builder(_APPS_BASE, "Python")
-_CODE_PYTHON_27          = utilities.path_Builder(_CODE_PYTHON, "Python27")
-_CODE_RV                 = utilities.path_Builder(_APPS_BASE, "RV")
+_CODE_PYTHON             = _below('_APPS_BASE', "Python")
+_CODE_PYTHON_27          = _below('_CODE_PYTHON', "Python27")
+_CODE_RV                 = _below('_APPS_BASE', "RV")
 
 #Amsterdam Locations
-_CODE_AMSTERDAM_MAYA     = utilities.path_Builder(_CODE_AMSTERDAM, "Maya")
+_CODE_AMSTERDAM_MAYA     = _below('_CODE_AMSTERDAM', "Maya")
 
 
 # Software Code Location Paths
-_CODE_DEADLINE       = utilities.path_Builder(_CODE_SOFTWARE, "Deadline")
-_CODE_SHOTGUN        = utilities.path_Builder(_CODE_SOFTWARE, "Shotgun")
+_CODE_DEADLINE       = _below('_CODE_SOFTWARE', "Deadline")
+_CODE_SHOTGUN        = _below('_CODE_SOFTWARE', "Shotgun")
 
 # Common Config Location Paths
-_CONFIG_OCIO          = utilities.path_Builder(_LIBRARY_BASE, "OCIO_Configs")
+_CONFIG_OCIO          = _below('_LIBRARY_BASE', "OCIO_Configs")
 
 # Maya Paths
-_CODE_MAYA                         = utilities.path_Builder(_CODE_SOFTWARE, "Maya")
-_CODE_MAYA_SCRIPT_PATH             = utilities.path_Builder(_CODE_MAYA, "Mel")
-_CODE_MAYA_SCRIPT_PATH_2015        = utilities.path_Builder(_CODE_MAYA_SCRIPT_PATH, "2015")
-_CODE_MAYA_PLUGINS                 = utilities.path_Builder(_CODE_MAYA, "plug-ins")
-_CODE_MAYA_USER_TOOLS              = utilities.path_Builder(_CODE_AW_USER_TOOLS, "Maya_User_Tools")
-_CODE_MAYA_XBM_PATH                = utilities.path_Builder(_CODE_MAYA,"icons")
-_CODE_MAYA_BONUS_TOOLS_Contents    = utilities.path_Builder(_CODE_MAYA_SCRIPT_PATH, "MayaBonusTools", "Contents")
-_CODE_MAYA_BONUS_TOOLS_ICONS       = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "icons")
-_CODE_MAYA_BONUS_TOOLS_MEL         = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "scripts")
-_CODE_MAYA_BONUS_TOOLS_MEL_2014    = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "scripts-2014")
-_CODE_MAYA_BONUS_TOOLS_MEL_2015    = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "scripts-2015")
-_CODE_MAYA_BONUS_TOOLS_PYTHON      = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "python")
-_CODE_MAYA_BONUS_TOOLS_PYTHON_2014 = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "python-2014")
-_CODE_MAYA_BONUS_TOOLS_PYTHON_2015 = utilities.path_Builder(_CODE_MAYA_BONUS_TOOLS_Contents, "python-2015")
+_CODE_MAYA                         = _below('_CODE_SOFTWARE', "Maya")
+_CODE_MAYA_SCRIPT_PATH             = _below('_CODE_MAYA', "Mel")
+_CODE_MAYA_SCRIPT_PATH_2015        = _below('_CODE_MAYA_SCRIPT_PATH', "2015")
+_CODE_MAYA_PLUGINS                 = _below('_CODE_MAYA', "plug-ins")
+_CODE_MAYA_USER_TOOLS              = _below('_CODE_AW_USER_TOOLS', "Maya_User_Tools")
+_CODE_MAYA_XBM_PATH                = _below('_CODE_MAYA',"icons")
+_CODE_MAYA_BONUS_TOOLS_Contents    = _below('_CODE_MAYA_SCRIPT_PATH', "MayaBonusTools", "Contents")
+_CODE_MAYA_BONUS_TOOLS_ICONS       = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "icons")
+_CODE_MAYA_BONUS_TOOLS_MEL         = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "scripts")
+_CODE_MAYA_BONUS_TOOLS_MEL_2014    = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "scripts-2014")
+_CODE_MAYA_BONUS_TOOLS_MEL_2015    = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "scripts-2015")
+_CODE_MAYA_BONUS_TOOLS_PYTHON      = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "python")
+_CODE_MAYA_BONUS_TOOLS_PYTHON_2014 = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "python-2014")
+_CODE_MAYA_BONUS_TOOLS_PYTHON_2015 = _below('_CODE_MAYA_BONUS_TOOLS_Contents', "python-2015")
 
 # Nuke Paths
-_CODE_NUKE              = utilities.path_Builder(_CODE_SOFTWARE, "Nuke")
-_CODE_NUKE_GIZMOS       = utilities.path_Builder(_CODE_SOFTWARE, "Nuke_Gizmos")
-_CODE_NUKE_USER_TOOLS   = utilities.path_Builder(_CODE_AW_USER_TOOLS, "Nuke_User_Tools")
-_CODE_NUKE_PLUGINS      = utilities.path_Builder(_CODE_NUKE, "Plugins")
+_CODE_NUKE              = _below('_CODE_SOFTWARE', "Nuke")
+_CODE_NUKE_GIZMOS       = _below('_CODE_SOFTWARE', "Nuke_Gizmos")
+_CODE_NUKE_USER_TOOLS   = _below('_CODE_AW_USER_TOOLS', "Nuke_User_Tools")
+_CODE_NUKE_PLUGINS      = _below('_CODE_NUKE', "Plugins")
 
 # Shotgun Paths
-_CODE_SHOTGUN_EVENTS              = utilities.path_Builder(_CODE_SHOTGUN, "Event_Triggers")
-_CODE_SHOTGUN_ACTION_MENU_ITEMS   = utilities.path_Builder(_CODE_SHOTGUN, "Shotgun_ActionMenu_Items")
+_CODE_SHOTGUN_EVENTS              = _below('_CODE_SHOTGUN', "Event_Triggers")
+_CODE_SHOTGUN_ACTION_MENU_ITEMS   = _below('_CODE_SHOTGUN', "Shotgun_ActionMenu_Items")
+
+# Site Overrides, Applied Only When AW_SITE Names The Site: Site -> {Name -> Entry}
+# For Example {"Amsterdam": {"_CODE_MAYA": _below('_CODE_AMSTERDAM', "Maya")}}
+_SITES = {
+}
 
 #----------------------------------------------------------------------
-AW_BASE                = utilities.get_and_set_environ_key("AW_BASE", default=_CODE_BASE, force_default=True)
+AW_BASE                = _environ("AW_BASE", '_CODE_BASE')
 #----------------------------------------------------------------------
-AW_GLOBAL_SYSTEMS      = utilities.get_and_set_environ_key("AW_GLOBAL_SYSTEMS", default=_CODE_GLOBAL_SYSTEMS, force_default=True)
+AW_GLOBAL_SYSTEMS      = _environ("AW_GLOBAL_SYSTEMS", '_CODE_GLOBAL_SYSTEMS')
 #----------------------------------------------------------------------
-AW_SOFTWARE_SYSTEMS    = utilities.get_and_set_environ_key("AW_SOFTWARE_SYSTEMS", default=_CODE_SOFTWARE, force_default=True)
+AW_SOFTWARE_SYSTEMS    = _environ("AW_SOFTWARE_SYSTEMS", '_CODE_SOFTWARE')
 #----------------------------------------------------------------------
-AW_ENVIRONMENT_ACCESS  = utilities.get_and_set_environ_key("AW_ENVIRONMENT_ACCESS", default=_CODE_ENVIRONMENT_ACCESS, force_default=True)
+AW_ENVIRONMENT_ACCESS  = _environ("AW_ENVIRONMENT_ACCESS", '_CODE_ENVIRONMENT_ACCESS')
 #----------------------------------------------------------------------
-AW_SITE_PACKAGES       = utilities.get_and_set_environ_key("AW_SITE_PACKAGES", default=_CODE_AW_SITE_PACKAGES, force_default=True)
+AW_SITE_PACKAGES       = _environ("AW_SITE_PACKAGES", '_CODE_AW_SITE_PACKAGES')
 #----------------------------------------------------------------------
-AW_USER_TOOLS          = utilities.get_and_set_environ_key("AW_USER_TOOLS", default=_CODE_AW_USER_TOOLS, force_default=True)
+AW_USER_TOOLS          = _environ("AW_USER_TOOLS", '_CODE_AW_USER_TOOLS')
 #----------------------------------------------------------------------
 ##NUKE_USER_TOOLS_DIR    = utilities.get_and_set_environ_key("NUKE_USER_TOOLS_DIR", default=_CODE_NUKE_USER_TOOLS, force_default=True)
-NUKE_USER_TOOLS_DIR    = utilities.get_and_set_environ_key("NUKE_USER_TOOLS_DIR", default=_CODE_NUKE_USER_TOOLS, force_default=True)
+NUKE_USER_TOOLS_DIR    = _environ("NUKE_USER_TOOLS_DIR", '_CODE_NUKE_USER_TOOLS')
+#----------------------------------------------------------------------
+MAYA_USER_TOOLS_DIR    = _environ("MAYA_USER_TOOLS_DIR", '_CODE_MAYA_USER_TOOLS')
+#----------------------------------------------------------------------
+AW_COMMON_UTILITIES    = _environ("AW_COMMON_UTILITIES", '_CODE_COMMON_UTILITIES')
+
+# The keys populate_environ() writes, in the order they used to be set.
+ENVIRON_KEYS = ("AW_BASE", "AW_GLOBAL_SYSTEMS", "AW_SOFTWARE_SYSTEMS", "AW_ENVIRONMENT_ACCESS",
+                "AW_SITE_PACKAGES", "AW_USER_TOOLS", "NUKE_USER_TOOLS_DIR", "MAYA_USER_TOOLS_DIR",
+                "AW_COMMON_UTILITIES")
+
+#----------------------------------------------------------------------
+def populate_environ():
+	"""Resolves Every Key In ENVIRON_KEYS, Writes Them To os.environ And Adds AW_GLOBAL_SYSTEMS To The System Paths"""
+	for key in ENVIRON_KEYS:
+		utilities.get_and_set_environ_key(key, default=getattr(_module, key), force_default=True)
+	utilities.add_To_System_Path(_module.AW_GLOBAL_SYSTEMS)
+
 #----------------------------------------------------------------------
-MAYA_USER_TOOLS_DIR    = utilities.get_and_set_environ_key("MAYA_USER_TOOLS_DIR", default=_CODE_MAYA_USER_TOOLS, force_default=True)
+def resolve(*names):
+	"""Resolves The Named Constants, And Only The Ones They Are Built On, And Returns Them As A Dict"""
+	return dict((name, getattr(_module, name)) for name in names)
+
 #----------------------------------------------------------------------
-AW_COMMON_UTILITIES    = utilities.get_and_set_environ_key("AW_COMMON_UTILITIES", default=_CODE_COMMON_UTILITIES, force_default=True)
+def resolved():
+	"""Returns A Dict Of The Constants That Have Been Resolved So Far"""
+	return dict((name, _module.__dict__[name]) for name in REGISTRY.names() if name in _module.__dict__)
+
+#----------------------------------------------------------------------
+def compute_all():
+	"""Returns A Dict Of Every Constant Worked Out Afresh, Without Touching The Module Or os.environ
+	   Constants That Can Not Be Resolved On This Platform Are Left Out
+	"""
+	return REGISTRY.resolve()
+
+#----------------------------------------------------------------------
+def definitions_hash():
+	"""Returns A Content Hash Of The Definitions In This Module, Which A Snapshot Must Match"""
+	return REGISTRY.hash()
+
+#----------------------------------------------------------------------
+def declare_derived(name, parent, *parts):
+	"""Records The Path 'parts' Below The Constant Named 'parent' As 'name' Without Resolving It,
+	   So System_Snapshot Compiles It, And Returns Its Definition
+	"""
+	spec = _DERIVED[name] = (parent, parts)
+	return spec
+
+#----------------------------------------------------------------------
+def derived(name, parent, *parts):
+	"""Returns The Path 'parts' Below The Constant Named 'parent', For Modules Such As System_Settings
+	   The Value Comes From The Snapshot When It Holds The Same Definition For 'name'
+	"""
+	spec = declare_derived(name, parent, *parts)
+	record = _snapshot_derived.get(name)
+	if record is not None and record[0] == spec:
+		return record[1]
+	return utilities.path_Builder(getattr(_module, parent), *parts)
+
+#----------------------------------------------------------------------
+def _forget():
+	"""Drops Every Constant Resolved So Far, And The Snapshot, So They Are Resolved Again On Next Use"""
+	global _snapshot_derived
+	for name in REGISTRY.names():
+		_module.__dict__.pop(name, None)
+	_snapshot_derived = {}
+
+########################################################################
+class _System_Paths(types.ModuleType):
+	""" The System_Paths module, with its constants as _Lazy descriptors.
+	Python 2 has no module level __getattr__, so the module replaces
+	itself in sys.modules with an instance of this class. """
+	pass
+
+########################################################################
+class _Registry(System_Registry.Registry):
+	""" The registry of the module's constants.  An override for the
+	site in use makes the module forget what it resolved so far. """
+	#----------------------------------------------------------------------
+	def override(self, site, name, entry):
+		System_Registry.Registry.override(self, site, name, entry)
+		if not hasattr(_System_Paths, name):
+			setattr(_System_Paths, name, _Lazy(name))
+		if site == self.site and _module is not None:
+			_forget()
+
+# The module object, once it has replaced itself in sys.modules.
+_module = None
+
+# Every constant above, for this platform and the site named by AW_SITE.
+# The site overrides are in place before the definitions are hashed and
+# the snapshot is loaded, so the snapshot is the one of this site.
+REGISTRY = _Registry()
+for _name, _value in globals().items():
+	if isinstance(_value, System_Registry.Entry):
+		REGISTRY.add(_name, _value)
+		setattr(_System_Paths, _name, _Lazy(_name))
+		del globals()[_name]
+del _name, _value
+for _site, _entries in _SITES.items():
+	for _name, _value in _entries.items():
+		REGISTRY.override(_site, _name, _value)
+
+# name -> (parent, parts) of the paths derived() built so far.
+_DERIVED = {}
+# name -> ((parent, parts), value) of the derived paths in the snapshot.
+_snapshot_derived = {}
+_snapshot = System_Snapshot.load(definitions_hash())
+if _snapshot is not None:
+	_snapshot_derived = _snapshot['derived']
 
+_module = _System_Paths(__name__, __doc__)
+_module.__dict__.update(globals())
+if _snapshot is not None:
+	# The environ constants are left to their descriptors, which write
+	# os.environ when they are read.
+	_module.__dict__.update((name, value) for name, value in _snapshot['paths'].iteritems()
+	                        if name in REGISTRY and REGISTRY.entry(name).kind != 'environ')
+# The functions above still use this module's globals, which Python 2
+# clears when the module object is freed, so keep it alive.
+_module._original_module = sys.modules[__name__]
+sys.modules[__name__] = _module
 
-utilities.add_To_System_Path(AW_GLOBAL_SYSTEMS)
\ No newline at end of file
+try:
+	utilities.add_To_System_Path(_module.AW_GLOBAL_SYSTEMS)
+except ValueError, exc:
+	warnings.warn(str(exc), RuntimeWarning)
@@ -0,0 +1,260 @@
+""" System_Registry - Named locations defined by their parents, resolved in dependency order.
+
+Example:
+
+from Environment_Access import System_Registry
+registry = System_Registry.Registry()
+registry.add("_CODE_BASE", System_Registry.root(nt="C:/Code", posix=("/Volumes/code", False)))
+registry.add("_CODE_SOFTWARE", System_Registry.below("_CODE_BASE", "Software"))
+registry.add("_CODE_MAYA", System_Registry.below("_CODE_SOFTWARE", "Maya"))
+registry.add("AW_SOFTWARE_SYSTEMS", System_Registry.environ("AW_SOFTWARE_SYSTEMS", "_CODE_SOFTWARE"))
+print registry.plan(["_CODE_MAYA"])
+print registry.resolve(["_CODE_MAYA"])
+print registry.validate()
+
+Each entry of a Registry is one of three kinds of definition:
+
+root(**variants)       - a location per platform (os.name), resolved
+                         with os.path.realpath() unless the variant is
+                         given as (location, False).
+below(parent, *parts)  - the location 'parts' below the entry 'parent'.
+environ(key, source)   - the value of the entry 'source', which the
+                         caller also writes to os.environ[key].
+
+An entry can be replaced for one site with override(); the registry
+uses the overrides of its 'site', by default the AW_SITE environment
+key.  plan() turns a set of entries into the list of entries to
+compute, parents first, leaving out everything the caller does not
+need and everything it already knows, so each entry is worked out once
+and only the part of the graph in use is resolved.
+"""
+import os
+import hashlib
+from Environment_Access import utilities
+
+__all__ = ['Registry', 'Entry', 'root', 'below', 'environ']
+
+########################################################################
+class Entry(object):
+	""" The definition of one registry entry; see root(), below() and
+	environ(). """
+	#----------------------------------------------------------------------
+	def __init__(self, kind, args):
+		self.kind = kind
+		# A dict platform -> (location, realpath) for 'root', otherwise
+		# (parent, parts) for 'below' and (key, source) for 'environ'.
+		self.args = args
+	#----------------------------------------------------------------------
+	def definition(self, platform):
+		""" The spec of the entry on 'platform': ('root', location,
+		realpath), ('below', parent, parts) or ('environ', key, source);
+		None if it has no variant for the platform. """
+		if self.kind == 'root':
+			variant = self.args.get(platform)
+			if variant is None:
+				return None
+			return ('root',) + variant
+		return (self.kind,) + self.args
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'Entry(%r, %r)' % (self.kind, self.args)
+
+#----------------------------------------------------------------------
+def root(realpath=True, **variants):
+	"""Returns A Root Entry With A Location For Each Platform Given As A Keyword, For Example nt="V:"
+	   A Location Given As (location, realpath) Overrides 'realpath' For That Platform
+	"""
+	args = {}
+	for platform, location in variants.items():
+		if isinstance(location, tuple):
+			args[platform] = (location[0], bool(location[1]))
+		else:
+			args[platform] = (location, bool(realpath))
+	return Entry('root', args)
+
+#----------------------------------------------------------------------
+def below(parent, *parts):
+	"""Returns An Entry For The Location 'parts' Below The Entry Named 'parent'"""
+	return Entry('below', (parent, parts))
+
+#----------------------------------------------------------------------
+def environ(key, source):
+	"""Returns An Entry Holding The Value Of The Entry Named 'source', To Be Written To os.environ[key]"""
+	return Entry('environ', (key, source))
+
+#----------------------------------------------------------------------
+def _parents(spec):
+	kind = spec[0]
+	if kind == 'below':
+		return (spec[1],)
+	if kind == 'environ':
+		return (spec[2],)
+	return ()
+
+#----------------------------------------------------------------------
+def compute(spec, lookup):
+	"""Returns The Value Of An Entry With Definition 'spec', With lookup(name) Giving The Values Of Its Parents"""
+	kind = spec[0]
+	if kind == 'root':
+		location, realpath = spec[1:]
+		if realpath:
+			location = os.path.realpath(location)
+		return utilities.path_fixer(location)
+	if kind == 'below':
+		return utilities.path_Builder(lookup(spec[1]), *spec[2])
+	return lookup(spec[2])
+
+########################################################################
+class Registry(object):
+	""" A set of named entries for one platform and site. """
+	#----------------------------------------------------------------------
+	def __init__(self, platform=None, site=None):
+		self.platform = platform or os.name
+		if site is None:
+			site = os.environ.get("AW_SITE") or None
+		self.site = site
+		# name -> Entry
+		self._entries = {}
+		# site -> {name -> Entry}
+		self._overrides = {}
+	#----------------------------------------------------------------------
+	def add(self, name, entry):
+		"""Adds The Entry 'name'"""
+		if name in self._entries:
+			raise ValueError("The Entry %r Is Already Defined" % name)
+		self._entries[name] = entry
+	#----------------------------------------------------------------------
+	def override(self, site, name, entry):
+		"""Replaces, Or Adds, The Entry 'name' For The Site 'site' Only"""
+		self._overrides.setdefault(site, {})[name] = entry
+	#----------------------------------------------------------------------
+	def entry(self, name):
+		"""Returns The Entry 'name' As Seen From This Registry's Site, Raising KeyError If It Does Not Exist"""
+		overrides = self._overrides.get(self.site)
+		if overrides and name in overrides:
+			return overrides[name]
+		return self._entries[name]
+	#----------------------------------------------------------------------
+	def definition(self, name):
+		"""Returns The Spec Of The Entry 'name' On This Registry's Platform And Site, Or None If It Has No Variant For It"""
+		return self.entry(name).definition(self.platform)
+	#----------------------------------------------------------------------
+	def names(self):
+		"""Returns The Sorted Names Of Every Entry"""
+		names = set(self._entries)
+		names.update(self._overrides.get(self.site, ()))
+		return sorted(names)
+	#----------------------------------------------------------------------
+	def __contains__(self, name):
+		return name in self._entries or name in self._overrides.get(self.site, ())
+	#----------------------------------------------------------------------
+	def __iter__(self):
+		return iter(self.names())
+	#----------------------------------------------------------------------
+	def __len__(self):
+		return len(self.names())
+	#----------------------------------------------------------------------
+	def _visit(self, name, known, state, order, chain):
+		""" Add 'name' and the parents it needs to 'order', parents first. """
+		if name in known or state.get(name) == 2:
+			return
+		if state.get(name) == 1:
+			raise ValueError("The Entries %s Depend On Each Other" % " -> ".join(chain + [name]))
+		if name not in self:
+			if chain:
+				raise ValueError("The Entry %r Depends On %r Which Is Not Defined" % (chain[-1], name))
+			raise ValueError("The Entry %r Is Not Defined" % name)
+		spec = self.definition(name)
+		if spec is None:
+			if chain:
+				raise ValueError("The Entry %r Depends On %r Which Is Not Defined On %s" % (chain[-1], name, self.platform))
+			raise ValueError("The Entry %r Is Not Defined On %s" % (name, self.platform))
+		state[name] = 1
+		for parent in _parents(spec):
+			self._visit(parent, known, state, order, chain + [name])
+		state[name] = 2
+		order.append(name)
+	#----------------------------------------------------------------------
+	def plan(self, names=None, known=()):
+		"""Returns The Names To Compute, Parents First, To Resolve 'names' When The Entries In 'known' Are Already Resolved
+		   With 'names' Left Out Every Entry That Can Be Resolved On This Platform Is Planned
+		   Raises A Value Error If One Of 'names' Can Not Be Resolved
+		"""
+		order = []
+		state = {}
+		if names is not None:
+			for name in names:
+				self._visit(name, known, state, order, [])
+			return order
+		for name in self.names():
+			trial = dict(state)
+			part = []
+			try:
+				self._visit(name, known, trial, part, [])
+			except ValueError:
+				continue
+			state = trial
+			order.extend(part)
+		return order
+	#----------------------------------------------------------------------
+	def resolve(self, names=None, known=None):
+		"""Returns A Dict Of The Entries Computed To Resolve 'names' (Every Resolvable Entry By Default),
+		   Taking The Values Of Entries Already In The Dict 'known' From There
+		"""
+		values = {}
+		if known is None:
+			known = {}
+		def lookup(name):
+			if name in values:
+				return values[name]
+			return known[name]
+		for name in self.plan(names, known):
+			values[name] = compute(self.definition(name), lookup)
+		return values
+	#----------------------------------------------------------------------
+	def _other_platforms(self, name, chain=()):
+		""" Whether 'name', or an entry it is built on, is a root made for
+		other platforms only. """
+		if name in chain or name not in self:
+			return False
+		spec = self.definition(name)
+		if spec is None:
+			return True
+		for parent in _parents(spec):
+			if self._other_platforms(parent, chain + (name,)):
+				return True
+		return False
+	#----------------------------------------------------------------------
+	def validate(self):
+		"""Returns A List Of The Problems Found: References To Undefined Entries, Cycles,
+		   And Entries That Can Not Be Resolved On One Of The Platforms The Roots Name
+		"""
+		problems = []
+		platforms = set([self.platform])
+		for name in self.names():
+			entry = self.entry(name)
+			if entry.kind == 'root':
+				platforms.update(entry.args)
+		for platform in sorted(platforms):
+			view = Registry(platform, self.site)
+			view._entries = self._entries
+			view._overrides = self._overrides
+			for name in view.names():
+				if view._other_platforms(name):
+					# Made for other platforms only, or built on such a root.
+					continue
+				try:
+					view._visit(name, (), {}, [], [])
+				except ValueError, exc:
+					problems.append("%s: %s" % (platform, exc))
+		return problems
+	#----------------------------------------------------------------------
+	def hash(self):
+		"""Returns A Content Hash Of Every Entry's Definition On This Registry's Platform And Site"""
+		digest = hashlib.sha1(repr((self.platform, self.site)))
+		for name in self.names():
+			digest.update(repr((name, self.definition(name))))
+		return digest.hexdigest()
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return 'Registry(%d entries, platform=%r, site=%r)' % (len(self._entries), self.platform, self.site)
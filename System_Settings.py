@@ -1,6 +1,42 @@
+""" System_Settings - Studio settings and the files and programs built on System_Paths.
+
+The paths below are worked out the first time they are read, as the
+System_Paths constants are, so importing this module resolves none of
+the roots they are built on.  Each is declared to System_Paths when the
+module is imported, so System_Snapshot compiles it, and its value comes
+from the snapshot when that holds the same definition.
+"""
 import os
+import sys
+import types
 from Environment_Access import utilities, System_Paths
 
+########################################################################
+class _Derived(object):
+	""" A path below a System_Paths constant, resolved on first access
+	and then stored on the module, which hides the descriptor. """
+	#----------------------------------------------------------------------
+	def __init__(self, name, parent, *parts):
+		self.name = name
+		self.parent = parent
+		self.parts = parts
+		System_Paths.declare_derived(name, parent, *parts)
+	#----------------------------------------------------------------------
+	def __get__(self, module, cls):
+		if module is None:
+			return self
+		value = module.__dict__[self.name] = System_Paths.derived(self.name, self.parent, *self.parts)
+		return value
+	#----------------------------------------------------------------------
+	def __repr__(self):
+		return '<unresolved %s>' % self.name
+
+########################################################################
+class _System_Settings(types.ModuleType):
+	""" The System_Settings module, with its paths as _Derived
+	descriptors; it replaces itself in sys.modules like System_Paths. """
+	pass
+
 # Get The Current Users Name
 CURRENT_USER_NAME = os.environ.get("USERNAME", None)
 # Setting Used To Tell Wings IDE Weather Or Not To Load wingdbstub
@@ -9,16 +45,29 @@ USE_WING_DEBUG = int(utilities.get_and_set_environ_key("USE_WING_DEBUG", default
 NO_USER_TOOLS  = int(utilities.get_and_set_environ_key("NO_USER_TOOLS", default="0", force_default=False))
 
 
-SHOTGUN_USER_NAMES          = utilities.path_Builder(System_Paths._CODE_SETTINGS_AND_PREFS, "Shotgun_User_Names.json")
-LIGHTMAP_LICENSES           = utilities.path_Builder(System_Paths._CODE_SETTINGS_AND_PREFS, "lightmap", "5", "licenses")
-ICC_FILES                   = utilities.path_Builder(System_Paths._CODE_NUKE, "ICC_Profiles")
-LUT_FILES                   = utilities.path_Builder(System_Paths._CODE_NUKE, "LUTs")
-LIGHTMAP_PRESETS            = utilities.path_Builder(System_Paths._CODE_SETTINGS_AND_PREFS, "lightmap", "5", "presets")
-GLOBAL_WPYTHON_EXE          = utilities.path_Builder(System_Paths._CODE_PYTHON_27, "pythonw.exe")
-GLOBAL_PYTHON_EXE           = utilities.path_Builder(System_Paths._CODE_PYTHON_27, "python.exe")
-AWPYEXE_ICON                = utilities.path_Builder(System_Paths._CODE_PYTHON_27, "DLLs", "awpyexe.ico")
-SHOTGUN_ACTION_MENU_HANDLER = utilities.path_Builder(System_Paths._CODE_SHOTGUN, "Shotgun_ActionMenu_Items", "action_handler.py")
-RV_EXE                      = utilities.path_Builder(System_Paths._CODE_RV, "7.1.2", "bin", "rv.exe")
-AW_SYSTEM_TRAY_EXE          = utilities.path_Builder(System_Paths._CODE_COMMAND_LINE_APPS, "System_Tray", "systray.awpyexe")
-EXIF_TOOL                   = utilities.path_Builder(System_Paths._CODE_COMMAND_LINE_APPS, "exiftool.exe")
-OCIO_CONFIG_FILE			= utilities.path_Builder(System_Paths._CONFIG_OCIO, "aw_Comp_aces_1.0.3", "aw_Comp_config.ocio")
+SHOTGUN_USER_NAMES          = _Derived("SHOTGUN_USER_NAMES", "_CODE_SETTINGS_AND_PREFS", "Shotgun_User_Names.json")
+LIGHTMAP_LICENSES           = _Derived("LIGHTMAP_LICENSES", "_CODE_SETTINGS_AND_PREFS", "lightmap", "5", "licenses")
+ICC_FILES                   = _Derived("ICC_FILES", "_CODE_NUKE", "ICC_Profiles")
+LUT_FILES                   = _Derived("LUT_FILES", "_CODE_NUKE", "LUTs")
+LIGHTMAP_PRESETS            = _Derived("LIGHTMAP_PRESETS", "_CODE_SETTINGS_AND_PREFS", "lightmap", "5", "presets")
+GLOBAL_WPYTHON_EXE          = _Derived("GLOBAL_WPYTHON_EXE", "_CODE_PYTHON_27", "pythonw.exe")
+GLOBAL_PYTHON_EXE           = _Derived("GLOBAL_PYTHON_EXE", "_CODE_PYTHON_27", "python.exe")
+AWPYEXE_ICON                = _Derived("AWPYEXE_ICON", "_CODE_PYTHON_27", "DLLs", "awpyexe.ico")
+SHOTGUN_ACTION_MENU_HANDLER = _Derived("SHOTGUN_ACTION_MENU_HANDLER", "_CODE_SHOTGUN", "Shotgun_ActionMenu_Items", "action_handler.py")
+RV_EXE                      = _Derived("RV_EXE", "_CODE_RV", "7.1.2", "bin", "rv.exe")
+AW_SYSTEM_TRAY_EXE          = _Derived("AW_SYSTEM_TRAY_EXE", "_CODE_COMMAND_LINE_APPS", "System_Tray", "systray.awpyexe")
+EXIF_TOOL                   = _Derived("EXIF_TOOL", "_CODE_COMMAND_LINE_APPS", "exiftool.exe")
+OCIO_CONFIG_FILE			= _Derived("OCIO_CONFIG_FILE", "_CONFIG_OCIO", "aw_Comp_aces_1.0.3", "aw_Comp_config.ocio")
+
+# The paths become descriptors of the module's class.
+for _name, _value in globals().items():
+	if isinstance(_value, _Derived):
+		setattr(_System_Settings, _name, _value)
+		del globals()[_name]
+del _name, _value
+
+_module = _System_Settings(__name__, __doc__)
+_module.__dict__.update(globals())
+# Python 2 clears the globals of a module object when it is freed, so keep it alive.
+_module._original_module = sys.modules[__name__]
+sys.modules[__name__] = _module
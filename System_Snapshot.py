@@ -0,0 +1,131 @@
+""" System_Snapshot - The System_Paths constants compiled once per site and platform.
+
+Example:
+
+python -m Environment_Access.System_Snapshot
+
+or, from Python:
+
+from Environment_Access import System_Snapshot
+System_Snapshot.compile_snapshot()
+
+compile_snapshot() works out every System_Paths constant afresh, and
+the System_Settings paths built on them, and writes them to one
+marshalled snapshot file together with the content hash of the
+System_Paths definitions.  Next to it go ready to source copies of the
+environment keys System_Paths sets: a .sh script for bash and zsh, a
+.bat script for cmd.exe and a plain KEY=value .env file.
+
+Importing System_Paths reads the snapshot in one go and, as long as its
+hash matches the definitions, takes every value from it instead of
+resolving the roots on the mounts.  A snapshot written for other
+definitions or another platform is ignored.  The values are what the
+mounts resolved to when it was compiled, so compile it again when the
+mounts are moved.
+
+The snapshot lives in snapshots/<os.name>.snapshot next to this module,
+or snapshots/<os.name>-<site>.snapshot when AW_SITE names a site.
+AW_SYSTEM_SNAPSHOT names another file, and set to an empty string it
+turns the snapshot off.
+"""
+import os
+import sys
+import time
+import zlib
+import marshal
+from Environment_Access import utilities, Path_Object
+
+__this_dir = os.path.dirname(__file__)
+
+_FORMAT_VERSION = 1
+
+#----------------------------------------------------------------------
+def store_path():
+	"""Returns The Snapshot File Of This Platform, Or None When AW_SYSTEM_SNAPSHOT Is Set Empty"""
+	store = os.environ.get("AW_SYSTEM_SNAPSHOT")
+	if store is None:
+		name = os.name
+		if os.environ.get("AW_SITE"):
+			name = "%s-%s" % (os.name, os.environ["AW_SITE"])
+		return os.path.join(__this_dir, "snapshots", "%s.snapshot" % name)
+	return store or None
+
+#----------------------------------------------------------------------
+def load(digest, store=None):
+	"""Returns The Snapshot Saved In 'store' If It Was Compiled For The Definitions With Hash 'digest'
+	   Returns None If There Is No Snapshot Or It Is Unreadable Or Out Of Date
+	"""
+	store = store or store_path()
+	if store is None:
+		return None
+	try:
+		f = open(store, 'rb')
+		try:
+			data = marshal.loads(zlib.decompress(f.read()))
+		finally:
+			f.close()
+	except (IOError, OSError, EOFError, ValueError, TypeError, zlib.error):
+		return None
+	if not isinstance(data, dict) or data.get('version') != _FORMAT_VERSION:
+		return None
+	if data.get('hash') != digest or data.get('platform') != os.name:
+		return None
+	return data
+
+#----------------------------------------------------------------------
+def environment_scripts(environ):
+	"""Returns The Text Of The .sh, .bat And .env Files Setting The Keys Of The 'environ' Dict"""
+	keys = sorted(environ)
+	sh = ["# Generated by System_Snapshot; source this file."]
+	bat = ["@echo off", "rem Generated by System_Snapshot; call this file."]
+	env = ["# Generated by System_Snapshot."]
+	for key in keys:
+		value = environ[key]
+		sh.append("export %s='%s'" % (key, value.replace("'", "'\\''")))
+		# cmd.exe expands %NAME% even inside quotes; %% is a literal percent.
+		bat.append('set "%s=%s"' % (key, value.replace("%", "%%")))
+		env.append("%s=%s" % (key, value))
+	return {'.sh': "\n".join(sh) + "\n", '.bat': "\r\n".join(bat) + "\r\n", '.env': "\n".join(env) + "\n"}
+
+#----------------------------------------------------------------------
+def compile_snapshot(store=None):
+	"""Resolves Every System_Paths Constant And System_Settings Path And Saves Them To 'store'
+	   Along With The .sh, .bat And .env Environment Files, And Returns The Snapshot
+	"""
+	from Environment_Access import System_Paths, System_Settings
+	store = store or store_path()
+	if store is None:
+		raise ValueError("The Snapshot Is Turned Off By An Empty AW_SYSTEM_SNAPSHOT")
+
+	paths = System_Paths.compute_all()
+	derived = {}
+	for name, (parent, parts) in System_Paths._DERIVED.items():
+		if parent in paths:
+			derived[name] = ((parent, parts), utilities.path_Builder(paths[parent], *parts))
+	environ = {}
+	for name in System_Paths.ENVIRON_KEYS:
+		if name in paths:
+			environ[System_Paths.REGISTRY.definition(name)[1]] = paths[name]
+
+	data = {
+		'version': _FORMAT_VERSION,
+		'hash': System_Paths.definitions_hash(),
+		'platform': os.name,
+		'compiled': time.time(),
+		'paths': paths,
+		'derived': derived,
+		'environ': environ,
+	}
+	folder = os.path.dirname(store)
+	if folder and not os.path.isdir(folder):
+		os.makedirs(folder)
+	Path_Object.path(store).write_bytes(zlib.compress(marshal.dumps(data)), atomic=True)
+	base = os.path.splitext(store)[0]
+	for ext, text in environment_scripts(environ).items():
+		Path_Object.path(base + ext).write_bytes(text, atomic=True)
+	return data
+
+if __name__ == '__main__':
+	_snapshot = compile_snapshot(sys.argv[1] if len(sys.argv) > 1 else None)
+	print "Compiled %d paths and %d settings into %s" % (len(_snapshot['paths']), len(_snapshot['derived']),
+	                                                     sys.argv[1] if len(sys.argv) > 1 else store_path())
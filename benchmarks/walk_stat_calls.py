@@ -0,0 +1,99 @@
+""" walk_stat_calls.py - Count the stat() calls made by path.walkfiles().
+
+Builds a synthetic tree (one million files by default) in a temporary
+directory and walks it twice: once with the old listdir() + isfile() +
+isdir() recursion and once with path.walkfiles().  Every os.stat() and
+os.lstat() made from Python is counted, along with the wall time.
+
+When scandir is available the entry types come from the directory read
+itself; any lstat() the C implementation falls back to on filesystems
+without d_type is not visible to this counter.
+
+Usage:
+	python benchmarks/walk_stat_calls.py [--files N] [--per-dir N] [--keep DIR]
+"""
+import os, sys, time, shutil, tempfile, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Path_Object
+from Path_Object import path
+
+########################################################################
+class Stat_Counter(object):
+	""" Wraps os.stat and os.lstat and counts the calls made through them. """
+	#----------------------------------------------------------------------
+	def __init__(self):
+		self.calls = 0
+		self._stat = os.stat
+		self._lstat = os.lstat
+	#----------------------------------------------------------------------
+	def __enter__(self):
+		def counted(func):
+			def wrapper(*args, **kwargs):
+				self.calls += 1
+				return func(*args, **kwargs)
+			return wrapper
+		os.stat = counted(self._stat)
+		os.lstat = counted(self._lstat)
+		return self
+	#----------------------------------------------------------------------
+	def __exit__(self, *exc_info):
+		os.stat = self._stat
+		os.lstat = self._lstat
+#----------------------------------------------------------------------
+def legacy_walkfiles(top):
+	""" The recursive listdir() + isfile() + isdir() walk path.walkfiles() used to do. """
+	for child in top.listdir():
+		isfile = child.isfile()
+		isdir = not isfile and child.isdir()
+		if isfile:
+			yield child
+		elif isdir:
+			for f in legacy_walkfiles(child):
+				yield f
+#----------------------------------------------------------------------
+def build_tree(root, file_count, per_dir):
+	""" Create file_count empty files under root, per_dir files to a directory,
+	nesting the directories two levels deep. """
+	made = 0
+	dir_index = 0
+	while made < file_count:
+		folder = os.path.join(root, "d%03d" % (dir_index // 100), "d%05d" % dir_index)
+		os.makedirs(folder)
+		for i in range(min(per_dir, file_count - made)):
+			open(os.path.join(folder, "f%05d.exr" % i), 'wb').close()
+		made += per_dir
+		dir_index += 1
+#----------------------------------------------------------------------
+def measure(label, walker):
+	with Stat_Counter() as counter:
+		start = time.time()
+		count = 0
+		for _ in walker:
+			count += 1
+		elapsed = time.time() - start
+	print("%-12s files=%-9d stat calls=%-9d %.2fs" % (label, count, counter.calls, elapsed))
+	return counter.calls
+#----------------------------------------------------------------------
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--files", type=int, default=1000000)
+	parser.add_argument("--per-dir", type=int, default=1000)
+	parser.add_argument("--keep", default=None, help="Build (or reuse) the tree in this directory and leave it in place")
+	args = parser.parse_args()
+
+	root = args.keep or tempfile.mkdtemp(prefix="walk_bench_")
+	try:
+		if not os.path.isdir(root) or not os.listdir(root):
+			print("building %d files under %s" % (args.files, root))
+			build_tree(root, args.files, args.per_dir)
+		print("scandir: %s" % ("yes" if Path_Object._scandir_impl is not None else "no (listdir + lstat fallback)"))
+		legacy = measure("legacy", legacy_walkfiles(path(root)))
+		current = measure("walkfiles", path(root).walkfiles())
+		print("stat calls saved: %d" % (legacy - current))
+	finally:
+		if args.keep is None:
+			shutil.rmtree(root)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,96 @@
+""" support.py - Shared set up for the tests.
+
+The tests are plain unittest modules for Python 2.7; run them from the
+repository root with
+
+	python -m unittest discover -s tests
+
+Importing this module puts the repository on sys.path, so the Path_*
+modules import the way they import each other.  The System_* modules
+import through the Environment_Access package, which package_parent()
+provides as a symbolic link to the repository.  Importing System_Paths
+changes sys.path, os.environ and sys.modules, so its tests run their
+code in a fresh interpreter with run_python().
+"""
+import os, sys, json, atexit, shutil, tempfile, unittest, subprocess
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO not in sys.path:
+	sys.path.insert(0, REPO)
+
+_package_parent = None
+
+#----------------------------------------------------------------------
+def package_parent():
+	""" A directory holding 'Environment_Access' as a link to the
+	repository, put on sys.path; None where links can not be made. """
+	global _package_parent
+	if _package_parent is None:
+		if not hasattr(os, 'symlink'):
+			return None
+		_package_parent = tempfile.mkdtemp(prefix='ea-tests-')
+		os.symlink(REPO, os.path.join(_package_parent, 'Environment_Access'))
+		sys.path.insert(0, _package_parent)
+		atexit.register(_remove_package_parent)
+	return _package_parent
+
+#----------------------------------------------------------------------
+def _remove_package_parent():
+	# The link goes first, so nothing below it is touched.
+	link = os.path.join(_package_parent, 'Environment_Access')
+	if os.path.islink(link):
+		os.remove(link)
+	shutil.rmtree(_package_parent, True)
+
+#----------------------------------------------------------------------
+def run_python(code, **environ):
+	""" Run 'code' in a new interpreter that can import Environment_Access,
+	with the keys of 'environ' set (or removed where None), and return
+	what it printed, decoded as JSON.  A failure raises AssertionError
+	with the interpreter's output. """
+	env = dict(os.environ)
+	env['PYTHONPATH'] = package_parent()
+	for key, value in environ.items():
+		if value is None:
+			env.pop(key, None)
+		else:
+			env[key] = value
+	proc = subprocess.Popen([sys.executable, '-c', code], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	out, err = proc.communicate()
+	if proc.returncode:
+		raise AssertionError("The child interpreter failed:\n%s" % err)
+	return json.loads(out)
+
+########################################################################
+class TempDirTestCase(unittest.TestCase):
+	""" A test case with a fresh temporary directory in self.tmp. """
+	#----------------------------------------------------------------------
+	def setUp(self):
+		self.tmp = os.path.realpath(tempfile.mkdtemp(prefix='ea-test-'))
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		shutil.rmtree(self.tmp, ignore_errors=True)
+	#----------------------------------------------------------------------
+	def make(self, rel, data=''):
+		""" Write 'data' to the file 'rel' below self.tmp, creating its
+		folders, and return its full path. """
+		p = os.path.join(self.tmp, rel)
+		folder = os.path.dirname(p)
+		if not os.path.isdir(folder):
+			os.makedirs(folder)
+		f = open(p, 'wb')
+		try:
+			f.write(data)
+		finally:
+			f.close()
+		return p
+	#----------------------------------------------------------------------
+	def mkdir(self, rel):
+		""" Create the folder 'rel' below self.tmp and return its full path. """
+		p = os.path.join(self.tmp, rel)
+		os.makedirs(p)
+		return p
+	#----------------------------------------------------------------------
+	def rel(self, paths):
+		""" The sorted paths relative to self.tmp. """
+		return sorted(os.path.relpath(p, self.tmp) for p in paths)
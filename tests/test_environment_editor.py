@@ -0,0 +1,130 @@
+""" Tests for Multi_Path_Environment_Editor. """
+import os, unittest
+
+import support
+
+support.package_parent()
+try:
+	from Environment_Access import utilities
+	from Environment_Access.utilities import Multi_Path_Environment_Editor
+except ImportError:
+	utilities = None
+
+SEP = os.pathsep
+
+#----------------------------------------------------------------------
+def joined(*items):
+	return SEP.join(items)
+
+########################################################################
+@unittest.skipIf(utilities is None, "needs symbolic links")
+class EditorTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		self.environ = {'PATHS': joined('/a', '/b', '/c'), 'EMPTY': ''}
+		self.editor = Multi_Path_Environment_Editor(self.environ)
+	#----------------------------------------------------------------------
+	def test_append(self):
+		self.editor.append('PATHS', ['/d', '/b', '/e', '/d'])
+		self.editor.append('PATHS', '/f')
+		self.assertEqual(self.editor.get('PATHS'), ['/a', '/b', '/c', '/d', '/e', '/f'])
+		# Nothing is written before commit().
+		self.assertEqual(self.environ['PATHS'], joined('/a', '/b', '/c'))
+		self.assertEqual(self.editor.commit(), {'PATHS': joined('/a', '/b', '/c', '/d', '/e', '/f')})
+		self.assertEqual(self.environ['PATHS'], joined('/a', '/b', '/c', '/d', '/e', '/f'))
+	#----------------------------------------------------------------------
+	def test_prepend(self):
+		self.environ['PATHS'] = joined('/a', '/b', '/c', '/b')
+		self.editor.prepend('PATHS', ['/c', '/b', '/x'])
+		self.assertEqual(self.editor.get('PATHS'), ['/c', '/b', '/x', '/a'])
+		self.editor.prepend('PATHS', '/a')
+		self.assertEqual(self.editor.get('PATHS'), ['/a', '/c', '/b', '/x'])
+		# Appended and prepended paths keep their sides.
+		self.editor.append('PATHS', '/end')
+		self.editor.prepend('PATHS', '/start')
+		self.editor.append('PATHS', '/later')
+		self.assertEqual(self.editor.get('PATHS'), ['/start', '/a', '/c', '/b', '/x', '/end', '/later'])
+	#----------------------------------------------------------------------
+	def test_remove(self):
+		self.environ['PATHS'] = joined('/a', '/b', '/a', '/c')
+		self.editor.remove('PATHS', ['/a', '/missing'])
+		self.assertEqual(self.editor.get('PATHS'), ['/b', '/c'])
+		self.editor.append('PATHS', '/a')
+		self.assertEqual(self.editor.get('PATHS'), ['/b', '/c', '/a'])
+	#----------------------------------------------------------------------
+	def test_existing_items_are_kept(self):
+		self.environ['PATHS'] = joined('/a', '', '/b', '/a')
+		self.editor.append('PATHS', ['/a', '/c'])
+		self.assertEqual(self.editor.get('PATHS'), ['/a', '', '/b', '/a', '/c'])
+		self.editor.commit()
+		self.assertEqual(self.environ['PATHS'], joined('/a', '', '/b', '/a', '/c'))
+	#----------------------------------------------------------------------
+	def test_paths_are_fixed(self):
+		self.editor.append('NEW', 'x\\y')
+		self.assertEqual(self.editor.get('NEW'), [utilities.path_fixer('x\\y')])
+	#----------------------------------------------------------------------
+	def test_emptied_variables(self):
+		self.editor.remove('PATHS', ['/a', '/b', '/c'])
+		self.editor.remove('MISSING', '/a')
+		self.editor.append('EMPTY', [])
+		self.assertEqual(self.editor.commit(), {'PATHS': '', 'MISSING': '', 'EMPTY': ''})
+		self.assertEqual(self.environ, {'PATHS': '', 'EMPTY': ''})
+	#----------------------------------------------------------------------
+	def test_variables_are_read_again_after_commit(self):
+		self.editor.append('PATHS', '/d')
+		self.editor.commit()
+		self.environ['PATHS'] = '/z'
+		self.editor.append('PATHS', '/d')
+		self.assertEqual(self.editor.get('PATHS'), ['/z', '/d'])
+	#----------------------------------------------------------------------
+	def test_context_manager(self):
+		with Multi_Path_Environment_Editor(self.environ) as editor:
+			editor.prepend('PATHS', '/first')
+			editor.append('OTHER', ['/x', '/y'])
+		self.assertEqual(self.environ['PATHS'], joined('/first', '/a', '/b', '/c'))
+		self.assertEqual(self.environ['OTHER'], joined('/x', '/y'))
+		before = dict(self.environ)
+		try:
+			with Multi_Path_Environment_Editor(self.environ) as editor:
+				editor.append('PATHS', '/never')
+				raise RuntimeError('failed')
+		except RuntimeError:
+			pass
+		self.assertEqual(self.environ, before)
+		self.assertEqual(editor.commit(), {})
+	#----------------------------------------------------------------------
+	def test_names_on_windows(self):
+		# Names differ only in case on Windows: the existing spelling is kept.
+		name = os.name
+		os.name = 'nt'
+		try:
+			environ = {'Path': joined('a', 'b')}
+			editor = Multi_Path_Environment_Editor(environ)
+			editor.append('PATH', 'c')
+			editor.prepend('path', 'z')
+			self.assertEqual(editor.get('PaTh'), ['z', 'a', 'b', 'c'])
+			editor.append('NEW_KEY', 'x')
+			editor.commit()
+		finally:
+			os.name = name
+		self.assertEqual(environ, {'Path': joined('z', 'a', 'b', 'c'), 'NEW_KEY': 'x'})
+	#----------------------------------------------------------------------
+	def test_bad_input(self):
+		self.assertRaises(ValueError, self.editor.append, 'PATHS', 5)
+		self.assertRaises(ValueError, self.editor.prepend, 'PATHS', ['/ok', None])
+
+########################################################################
+@unittest.skipIf(utilities is None, "needs symbolic links")
+class AddToKeyTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		os.environ.pop('EA_TEST_PATHS', None)
+	#----------------------------------------------------------------------
+	def test_add_to_key(self):
+		utilities.add_To_Multi_Path_Environment_Key('EA_TEST_PATHS', '/a')
+		self.assertEqual(os.environ['EA_TEST_PATHS'], '/a')
+		utilities.add_To_Multi_Path_Environment_Key('EA_TEST_PATHS', ['/b', '/a'])
+		self.assertEqual(os.environ['EA_TEST_PATHS'], joined('/a', '/b'))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,101 @@
+""" Tests for Path_Hash_Cache. """
+import os, hashlib, unittest
+
+import support
+import Path_Hash_Cache
+from Path_Hash_Cache import HashCache
+from Path_Object import path
+
+########################################################################
+class _Clock(object):
+	""" Stands in for the time module, moving on a second per call. """
+	def __init__(self):
+		self.now = 1000000.0
+	def time(self):
+		self.now += 1
+		return self.now
+
+########################################################################
+class HashCacheTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.cache = HashCache(os.path.join(self.tmp, 'cache', 'hashes.sqlite'))
+		self.files = [self.make('f%d.bin' % i, 'data %d' % i) for i in range(5)]
+		self.clock = _Clock()
+		self._time = Path_Hash_Cache.time
+		Path_Hash_Cache.time = self.clock
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		Path_Hash_Cache.time = self._time
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def test_hit_after_miss(self):
+		p = path(self.files[0])
+		first = p.hashes(('md5', 'sha1'), cache=self.cache)
+		self.assertEqual(first['md5'], hashlib.md5('data 0').hexdigest())
+		self.assertEqual(p.hashes(('md5', 'sha1'), cache=self.cache), first)
+		self.assertEqual(p.read_md5(cache=self.cache), hashlib.md5('data 0').digest())
+		stats = self.cache.stats()
+		self.assertEqual((stats['misses'], stats['hits'], stats['entries']), (2, 3, 2))
+	#----------------------------------------------------------------------
+	def test_changed_file_is_rehashed(self):
+		p = path(self.files[0])
+		p.hashes(cache=self.cache)
+		st = os.stat(p)
+		self.make('f0.bin', 'other data')
+		os.utime(p, (st.st_atime, st.st_mtime + 10))
+		self.assertEqual(self.cache.lookup(p), {})
+		self.assertEqual(p.hashes(cache=self.cache)['md5'], hashlib.md5('other data').hexdigest())
+	#----------------------------------------------------------------------
+	def test_evicts_least_recently_used(self):
+		for p in self.files:
+			path(p).hashes(cache=self.cache)
+		# Older than the touch interval, so this hit refreshes files[0].
+		self.clock.now += Path_Hash_Cache._TOUCH_INTERVAL * 2
+		self.assertEqual(len(self.cache.lookup(self.files[0])), 1)
+		self.cache.max_entries = 3
+		self.assertEqual(self.cache.evict(), 2)
+		self.assertEqual(len(self.cache), 3)
+		self.assertEqual(self.cache.stats()['evictions'], 2)
+		kept = [p for p in self.files if self.cache.lookup(p)]
+		self.assertEqual(kept, [self.files[0]] + self.files[3:])
+		self.assertEqual(self.cache.evict(), 0)
+	#----------------------------------------------------------------------
+	def test_store_keeps_max_entries(self):
+		self.cache.max_entries = 16
+		files = [self.make('g%d.bin' % i, 'more %d' % i) for i in range(40)]
+		for i, p in enumerate(files):
+			path(p).hashes(cache=self.cache)
+			self.assertTrue(len(self.cache) <= 16)
+			if i == 16:
+				# Past max_entries: evicted down to 15/16 of it.
+				self.assertEqual(len(self.cache), 15)
+		# The most recently stored are kept.
+		self.assertEqual(len(self.cache.lookup(files[-1])), 1)
+		self.assertEqual(self.cache.lookup(files[0]), {})
+		# Another process's digests are counted at the next eviction.
+		other = HashCache(self.cache.filename, max_entries=1000)
+		for p in self.files:
+			path(p).hashes(cache=other)
+		total = len(self.cache)
+		self.assertTrue(total > 16)
+		self.assertEqual(self.cache.evict(), total - 16)
+		self.assertEqual(len(self.cache), 16)
+	#----------------------------------------------------------------------
+	def test_invalidate_and_clear(self):
+		for p in self.files:
+			path(p).hashes(cache=self.cache)
+		self.cache.invalidate(self.files[0])
+		self.assertEqual(self.cache.lookup(self.files[0]), {})
+		self.assertEqual(len(self.cache), 4)
+		self.cache.clear()
+		self.assertEqual(len(self.cache), 0)
+	#----------------------------------------------------------------------
+	def test_shared_between_instances(self):
+		path(self.files[0]).hashes(cache=self.cache)
+		other = HashCache(self.cache.filename)
+		self.assertEqual(len(other.lookup(self.files[0])), 1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,53 @@
+""" Tests for hash_file(), hash_files() and the path hashing methods. """
+import os, hashlib, unittest, warnings
+
+import support
+import Path_Object
+from Path_Object import path, PathWalkWarning
+
+########################################################################
+class HashFilesTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.data = {}
+		for i in range(8):
+			data = os.urandom(1000 * i)
+			self.data[self.make('d/f%d.bin' % i, data)] = data
+	#----------------------------------------------------------------------
+	def expected(self, p, name):
+		return hashlib.new(name, self.data[p]).hexdigest()
+	#----------------------------------------------------------------------
+	def test_several_algorithms_in_one_read(self):
+		for p in self.data:
+			digests = Path_Object.hash_file(p, ('md5', 'sha1', 'sha256'), buffer_size=4096)
+			self.assertEqual(sorted(digests), ['md5', 'sha1', 'sha256'])
+			for name, digest in digests.items():
+				self.assertEqual(digest, self.expected(p, name))
+	#----------------------------------------------------------------------
+	def test_path_methods(self):
+		p = path(sorted(self.data)[3])
+		self.assertEqual(p.read_md5(), hashlib.md5(self.data[p]).digest())
+		self.assertEqual(p.hashes('sha1'), {'sha1': self.expected(p, 'sha1')})
+	#----------------------------------------------------------------------
+	def test_hash_files(self):
+		got = dict(Path_Object.hash_files(iter(self.data), ('md5', 'sha1'), workers=3))
+		self.assertEqual(sorted(got), sorted(self.data))
+		for p, digests in got.items():
+			self.assertEqual(digests['md5'], self.expected(p, 'md5'))
+			self.assertEqual(digests['sha1'], self.expected(p, 'sha1'))
+		walked = dict(path(self.tmp).walkhashes('*.bin', 'sha256', workers=2))
+		self.assertEqual(sorted(walked), sorted(self.data))
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		paths = sorted(self.data) + [os.path.join(self.tmp, 'missing')]
+		self.assertRaises(IOError, list, Path_Object.hash_files(paths, workers=2))
+		self.assertEqual(len(list(Path_Object.hash_files(paths, errors='ignore'))), len(self.data))
+		with warnings.catch_warnings(record=True) as caught:
+			warnings.simplefilter('always')
+			self.assertEqual(len(list(Path_Object.hash_files(paths, errors='warn'))), len(self.data))
+		self.assertEqual(len([w for w in caught if w.category is PathWalkWarning]), 1)
+		self.assertRaises(ValueError, list, Path_Object.hash_files(paths, errors='bogus'))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,64 @@
+""" Tests for path.iter_lines() and path.iter_chunks(). """
+import unittest
+
+import support
+from Path_Object import path
+
+SAMPLES = [
+	'',
+	'one line without end',
+	'unix\nlines\n',
+	'dos\r\nlines\r\n',
+	'old mac\rlines\r',
+	'mixed\r\n\r\n\rends\n\r\nlast',
+	'\r',
+	'\r\n',
+	'trailing cr\r',
+	'\n\n\n',
+]
+
+########################################################################
+class IterLinesTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def file(self, data):
+		return path(self.make('lines.txt', data))
+	#----------------------------------------------------------------------
+	def test_same_lines_as_lines(self):
+		# Every block size, so every '\r\n' is split across blocks once.
+		for data in SAMPLES:
+			p = self.file(data)
+			for retain in (True, False):
+				expected = p.lines(retain=retain)
+				for size in range(1, len(data) + 2):
+					for use_mmap in (False, True):
+						got = list(p.iter_lines(retain=retain, size=size, use_mmap=use_mmap))
+						self.assertEqual(got, expected, (data, retain, size, use_mmap, got))
+	#----------------------------------------------------------------------
+	def test_cr_split_from_lf(self):
+		p = self.file('ab\r\ncd')
+		self.assertEqual(list(p.iter_lines(size=3)), ['ab\n', 'cd'])
+		self.assertEqual(list(p.iter_lines(size=3, retain=False)), ['ab', 'cd'])
+		p = self.file('ab\r\rcd')
+		self.assertEqual(list(p.iter_lines(size=3)), ['ab\n', '\n', 'cd'])
+	#----------------------------------------------------------------------
+	def test_unicode(self):
+		text = u'caf\xe9\r\n\nna\xefve\rend\u20ac'
+		p = self.file(text.encode('utf-8'))
+		expected = [u'caf\xe9\n', u'\n', u'na\xefve\n', u'end\u20ac']
+		for size in range(1, 12):
+			got = list(p.iter_lines('utf-8', size=size))
+			self.assertEqual(got, expected, size)
+			self.assertTrue(all(isinstance(line, unicode) for line in got))
+		self.assertEqual(list(p.iter_lines('utf-8', retain=False)), [line.rstrip(u'\n') for line in expected])
+	#----------------------------------------------------------------------
+	def test_iter_chunks(self):
+		data = ''.join(chr(i % 256) for i in range(1000))
+		p = self.file(data)
+		for use_mmap in (False, True):
+			chunks = list(p.iter_chunks(300, use_mmap=use_mmap))
+			self.assertEqual([len(c) for c in chunks], [300, 300, 300, 100])
+			self.assertEqual(''.join(chunks), data)
+		self.assertEqual(list(self.file('').iter_chunks(use_mmap=True)), [])
+
+if __name__ == '__main__':
+	unittest.main()
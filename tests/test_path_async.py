@@ -0,0 +1,129 @@
+""" Tests for Path_Async. """
+import os, time, threading, unittest
+
+import support
+import Path_Async
+from Path_Async import AsyncPath, PathExecutor
+from Path_Object import path
+
+TIMEOUT = 10
+
+########################################################################
+class ExecutorTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		self.executor = PathExecutor(workers=4, per_volume=2)
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		self.executor.shutdown()
+	#----------------------------------------------------------------------
+	def test_per_volume_limit(self):
+		release = threading.Event()
+		lock = threading.Lock()
+		running = {'now': 0, 'most': 0}
+		def slow():
+			with lock:
+				running['now'] += 1
+				running['most'] = max(running['most'], running['now'])
+			release.wait(TIMEOUT)
+			with lock:
+				running['now'] -= 1
+		hung = [self.executor.submit('/Volumes/hung', slow) for i in range(4)]
+		# Calls for another volume still run while the first one is stuck.
+		other = self.executor.submit('/Volumes/other', lambda: 'done')
+		self.assertEqual(other.result(TIMEOUT), 'done')
+		deadline = time.time() + TIMEOUT
+		while running['now'] < 2 and time.time() < deadline:
+			time.sleep(0.01)
+		self.assertEqual(running['most'], 2)
+		release.set()
+		for future in hung:
+			future.result(TIMEOUT)
+		self.assertEqual(running['most'], 2)
+	#----------------------------------------------------------------------
+	def test_exceptions(self):
+		future = self.executor.submit('/', os.stat, '/no/such/path')
+		self.assertRaises(OSError, future.result, TIMEOUT)
+		self.assertTrue(isinstance(future.exception(TIMEOUT), OSError))
+	#----------------------------------------------------------------------
+	def test_shutdown(self):
+		self.executor.shutdown()
+		self.assertRaises(RuntimeError, self.executor.submit, '/', len, '')
+	#----------------------------------------------------------------------
+	def test_plain_future(self):
+		future = Path_Async._Future()
+		done = []
+		future.add_done_callback(done.append)
+		self.assertFalse(future.done())
+		self.assertRaises(RuntimeError, future.result, 0.01)
+		future.set_result(3)
+		self.assertEqual((future.result(), done), (3, [future]))
+
+########################################################################
+class AsyncPathTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.executor = PathExecutor(workers=2, per_volume=2)
+		for i in range(25):
+			self.make('d/f%02d.txt' % i, 'x' * i)
+		self.root = AsyncPath(self.tmp, self.executor)
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		self.executor.shutdown()
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def test_blocking_methods_return_futures(self):
+		f = self.root / 'd' / 'f03.txt'
+		self.assertEqual(f.stat().result(TIMEOUT).st_size, 3)
+		self.assertEqual(f.bytes().result(TIMEOUT), 'xxx')
+		self.assertTrue(f.exists().result(TIMEOUT))
+		self.assertEqual(len((self.root / 'd').listdir().result(TIMEOUT)), 25)
+		# String operations stay synchronous.
+		self.assertEqual(f.name, 'f03.txt')
+		self.assertEqual(path(self.tmp).aio.path, self.tmp)
+	#----------------------------------------------------------------------
+	def test_walk_in_batches(self):
+		walk = self.root.walkfiles('*.txt', batch_size=10)
+		sizes = []
+		found = []
+		while True:
+			batch = walk.next_batch().result(TIMEOUT)
+			if not batch:
+				break
+			sizes.append(len(batch))
+			found.extend(batch)
+		self.assertEqual(sizes, [10, 10, 5])
+		self.assertEqual(sorted(found), sorted(path(self.tmp).walkfiles()))
+		self.assertEqual(walk.next_batch().result(TIMEOUT), [])
+	#----------------------------------------------------------------------
+	def test_batches_asked_for_at_once(self):
+		walk = self.root.walkfiles(batch_size=10)
+		futures = [walk.next_batch() for i in range(4)]
+		self.assertEqual([len(f.result(TIMEOUT)) for f in futures], [10, 10, 5, 0])
+	#----------------------------------------------------------------------
+	def test_close(self):
+		closed = []
+		def gen():
+			try:
+				for i in xrange(100):
+					yield i
+			finally:
+				closed.append(True)
+		walk = Path_Async.AsyncWalk(self.executor, '/', gen(), batch_size=10)
+		self.assertEqual(walk.next_batch().result(TIMEOUT), range(10))
+		closing = walk.close()
+		self.assertTrue(walk.close() is closing)
+		self.assertEqual(closing.result(TIMEOUT), None)
+		self.assertEqual(closed, [True])
+		self.assertEqual(walk.next_batch().result(TIMEOUT), [])
+	#----------------------------------------------------------------------
+	def test_duplicates_is_a_walk(self):
+		self.make('a/one', 'same')
+		self.make('a/two', 'same')
+		walk = self.root.duplicates(min_size=1)
+		self.assertTrue(isinstance(walk, Path_Async.AsyncWalk))
+		self.assertEqual(len(walk.next_batch().result(TIMEOUT)), 1)
+
+if __name__ == '__main__':
+	unittest.main()
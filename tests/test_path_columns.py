@@ -0,0 +1,60 @@
+""" Tests for Path_Columns. """
+import os, time, unittest
+
+import support
+import Path_Columns
+from Path_Object import path
+
+########################################################################
+class ColumnsTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.make('small.txt', 'x')
+		self.make('sub/big.exr', 'x' * 1000)
+		self.make('sub/old.exr', 'x' * 10)
+		old = time.time() - 60 * 86400
+		os.utime(os.path.join(self.tmp, 'sub', 'old.exr'), (old, old))
+		self.mkdir('empty')
+	#----------------------------------------------------------------------
+	def test_collect_matches_walkfiles(self):
+		cols = path(self.tmp).columns()
+		self.assertEqual(len(cols), 3)
+		self.assertEqual(sorted(cols.paths()), sorted(path(self.tmp).walkfiles()))
+		self.assertEqual(cols.total_size(), 1011)
+		self.assertEqual(len(path(self.tmp).columns('*.exr')), 2)
+		self.assertTrue(all(isinstance(p, path) for p in cols.paths()))
+	#----------------------------------------------------------------------
+	def test_where(self):
+		cols = path(self.tmp).columns()
+		names = lambda rows: sorted(p.name for p in cols.paths(rows))
+		self.assertEqual(names(cols.where(min_size=10)), ['big.exr', 'old.exr'])
+		self.assertEqual(names(cols.where(max_size=10)), ['old.exr', 'small.txt'])
+		self.assertEqual(names(cols.where(mtime_before=time.time() - 86400)), ['old.exr'])
+		self.assertEqual(names(cols.where(mtime_after=time.time() - 86400, pattern='*.exr')), ['big.exr'])
+		self.assertEqual(names(cols.where(uid=os.getuid())), ['big.exr', 'old.exr', 'small.txt'])
+		self.assertEqual(cols.total_size(cols.where(min_size=10)), 1010)
+	#----------------------------------------------------------------------
+	def test_where_without_numpy(self):
+		cols = path(self.tmp).columns()
+		numpy = Path_Columns.numpy
+		Path_Columns.numpy = None
+		try:
+			plain = cols.where(min_size=5, mtime_after=0)
+		finally:
+			Path_Columns.numpy = numpy
+		self.assertEqual(list(plain), list(cols.where(min_size=5, mtime_after=0)))
+	#----------------------------------------------------------------------
+	def test_walk_stats_lists_directories(self):
+		dirs = []
+		files = list(Path_Columns.walk_stats(self.tmp, dirs=dirs))
+		self.assertEqual(len(files), 3)
+		self.assertEqual(self.rel(dirs), ['.', 'empty', 'sub'])
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		missing = os.path.join(self.tmp, 'missing')
+		self.assertRaises(OSError, Path_Columns.collect, missing)
+		self.assertEqual(len(Path_Columns.collect(missing, errors='ignore')), 0)
+
+if __name__ == '__main__':
+	unittest.main()
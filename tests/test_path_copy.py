@@ -0,0 +1,121 @@
+""" Tests for Path_Copy. """
+import os, unittest
+
+import support
+import Path_Copy
+from Path_Copy import COPIED, SKIPPED, RESUMED
+from Path_Object import path
+
+########################################################################
+class CopyFileTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.data = os.urandom(300000)
+		self.src = self.make('src.bin', self.data)
+		os.utime(self.src, (1000000000, 1000000000))
+		self.dst = os.path.join(self.tmp, 'dst.bin')
+	#----------------------------------------------------------------------
+	def read(self, p):
+		f = open(p, 'rb')
+		try:
+			return f.read()
+		finally:
+			f.close()
+	#----------------------------------------------------------------------
+	def interrupted(self, length):
+		""" Leave a partial copy of the first 'length' bytes, as an
+		interrupted copy_file() would. """
+		partial = self.dst + Path_Copy.PARTIAL_SUFFIX
+		self.make(partial, self.data[:length])
+		Path_Copy._record_source(os.stat(self.src), partial)
+		return partial
+	#----------------------------------------------------------------------
+	def test_copy(self):
+		progress = []
+		self.assertEqual(path(self.src).fastcopy(self.dst, progress=lambda *args: progress.append(args)), COPIED)
+		self.assertEqual(self.read(self.dst), self.data)
+		self.assertEqual(os.path.getmtime(self.dst), 1000000000)
+		self.assertEqual(sorted(os.listdir(self.tmp)), ['dst.bin', 'src.bin'])
+		self.assertEqual(progress[-1][:2], (len(self.data), len(self.data)))
+	#----------------------------------------------------------------------
+	def test_buffered_copy_into_directory(self):
+		folder = self.mkdir('folder')
+		calls = Path_Copy._kernel_calls
+		Path_Copy._kernel_calls = []
+		try:
+			self.assertEqual(Path_Copy.copy_file(self.src, folder), COPIED)
+		finally:
+			Path_Copy._kernel_calls = calls
+		self.assertEqual(self.read(os.path.join(folder, 'src.bin')), self.data)
+	#----------------------------------------------------------------------
+	def test_skip_same(self):
+		Path_Copy.copy_file(self.src, self.dst)
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst, skip_same=True), SKIPPED)
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst), COPIED)
+		os.utime(self.dst, (2000000000, 2000000000))
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst, skip_same=True), COPIED)
+	#----------------------------------------------------------------------
+	def test_resume(self):
+		self.interrupted(100000)
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst), RESUMED)
+		self.assertEqual(self.read(self.dst), self.data)
+		self.assertFalse(os.path.exists(self.dst + Path_Copy.SOURCE_SUFFIX))
+		self.interrupted(100000)
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst, resume=False), COPIED)
+	#----------------------------------------------------------------------
+	def test_no_resume_from_another_source(self):
+		# The source changed since the partial copy was made.
+		self.interrupted(100000)
+		os.utime(self.src, (1000000100, 1000000100))
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst), COPIED)
+		self.assertEqual(self.read(self.dst), self.data)
+		# No record of the source at all.
+		self.interrupted(100000)
+		os.remove(self.dst + Path_Copy.SOURCE_SUFFIX)
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst), COPIED)
+		# A tail that does not match the source.
+		partial = self.interrupted(100000)
+		self.make(partial, 'x' * 100000)
+		self.assertEqual(Path_Copy.copy_file(self.src, self.dst), COPIED)
+		self.assertEqual(self.read(self.dst), self.data)
+
+########################################################################
+class CopyTreeTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.src = self.mkdir('src')
+		self.make('src/a.txt', 'a')
+		self.make('src/sub/b.exr', 'b' * 1000)
+		self.make('src/sub/deep/c.exr', 'c')
+		self.mkdir('src/empty/inner')
+		self.dst = os.path.join(self.tmp, 'dst')
+	#----------------------------------------------------------------------
+	def tree(self, root):
+		res = []
+		for top, dirs, files in os.walk(root):
+			res.extend(os.path.relpath(os.path.join(top, name), root) for name in dirs + files)
+		return sorted(res)
+	#----------------------------------------------------------------------
+	def test_copy_tree(self):
+		counts = path(self.src).fastcopytree(self.dst, workers=2)
+		self.assertEqual(counts, {COPIED: 3, SKIPPED: 0, RESUMED: 0})
+		self.assertEqual(self.tree(self.dst), self.tree(self.src))
+		self.assertEqual(Path_Copy.copy_tree(self.src, self.dst), {COPIED: 0, SKIPPED: 3, RESUMED: 0})
+	#----------------------------------------------------------------------
+	def test_pattern(self):
+		counts = Path_Copy.copy_tree(self.src, self.dst, pattern='*.exr')
+		self.assertEqual(counts[COPIED], 2)
+		self.assertFalse(os.path.exists(os.path.join(self.dst, 'a.txt')))
+		self.assertTrue(os.path.isdir(os.path.join(self.dst, 'empty', 'inner')))
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		pairs = [(os.path.join(self.src, 'missing'), os.path.join(self.tmp, 'x')),
+		         (os.path.join(self.src, 'a.txt'), os.path.join(self.tmp, 'y'))]
+		self.assertRaises(OSError, list, Path_Copy.copy_files(pairs, workers=1))
+		done = list(Path_Copy.copy_files(pairs, errors='ignore'))
+		self.assertEqual([result for s, d, result in done], [COPIED])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,114 @@
+""" Tests for Path_Cursor. """
+import os, unittest
+
+import support
+import Path_Object
+from Path_Cursor import WalkCursor
+from Path_Object import path, PathMatcher
+
+########################################################################
+class WalkCursorTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		for rel in ('b.txt', 'a.txt', 'd1/x.txt', 'd1/sub/y.exr', 'd1/sub/z.txt', 'd2/w.exr', 'd2/deeper/v/u.txt'):
+			self.make(rel)
+		self.mkdir('empty')
+	#----------------------------------------------------------------------
+	def all_pages(self, cursor):
+		res = []
+		while not cursor.done:
+			res.extend(cursor.next_page())
+		self.assertEqual(cursor.next_page(), [])
+		return res
+	#----------------------------------------------------------------------
+	def relative(self, paths):
+		return [os.path.relpath(p, self.tmp) for p in paths]
+	#----------------------------------------------------------------------
+	def test_same_items_as_walk(self):
+		root = path(self.tmp)
+		for kind, walk in (('all', root.walk), ('dirs', root.walkdirs), ('files', root.walkfiles)):
+			for order in ('dfs', 'bfs'):
+				got = self.all_pages(root.cursor(kind=kind, order=order, page_size=3))
+				self.assertEqual(sorted(got), sorted(walk()))
+				self.assertTrue(all(isinstance(p, path) for p in got))
+	#----------------------------------------------------------------------
+	def test_order(self):
+		dfs = self.relative(path(self.tmp).cursor(order='dfs'))
+		self.assertEqual(dfs[:6], ['a.txt', 'b.txt', 'd1', 'd1/sub', 'd1/sub/y.exr', 'd1/sub/z.txt'])
+		bfs = self.relative(path(self.tmp).cursor(order='bfs'))
+		depths = [p.count(os.sep) for p in bfs]
+		self.assertEqual(depths, sorted(depths))
+		self.assertEqual(bfs[:5], ['a.txt', 'b.txt', 'd1', 'd2', 'empty'])
+	#----------------------------------------------------------------------
+	def test_resume_at_every_page(self):
+		for order in ('dfs', 'bfs'):
+			for kind in ('all', 'files'):
+				for size in (1, 2, 5):
+					expected = list(path(self.tmp).cursor('*.txt', kind=kind, order=order, page_size=size))
+					cursor = path(self.tmp).cursor('*.txt', kind=kind, order=order, page_size=size)
+					got = []
+					while not cursor.done:
+						got.extend(cursor.next_page())
+						token = cursor.checkpoint()
+						self.assertTrue(isinstance(token, str))
+						cursor = WalkCursor.resume(token)
+					self.assertEqual(got, expected, (order, kind, size))
+					self.assertEqual(cursor.count, len(expected))
+	#----------------------------------------------------------------------
+	def test_resume_picks_up_changes(self):
+		cursor = path(self.tmp).cursor(kind='files', page_size=1)
+		self.assertEqual(self.relative(cursor.next_page()), ['a.txt'])
+		token = cursor.checkpoint()
+		# Added after the position: found.  Removed ahead of it: skipped.
+		self.make('c.txt')
+		os.remove(os.path.join(self.tmp, 'b.txt'))
+		rest = self.relative(WalkCursor.resume(token, page_size=100).next_page())
+		self.assertEqual(rest[:2], ['c.txt', 'd1/sub/y.exr'])
+		self.assertFalse('b.txt' in rest)
+	#----------------------------------------------------------------------
+	def test_max_depth(self):
+		self.assertEqual(self.relative(path(self.tmp).cursor(max_depth=1)), ['a.txt', 'b.txt', 'd1', 'd2', 'empty'])
+		self.assertEqual(len(list(path(self.tmp).cursor(max_depth=2, kind='files'))), 4)
+		self.assertEqual(list(path(self.tmp).cursor(max_depth=0)), [])
+	#----------------------------------------------------------------------
+	def test_matcher_is_passed_again(self):
+		m = PathMatcher(exclude='d2')
+		cursor = path(self.tmp).cursor(kind='files', page_size=2, matcher=m)
+		first = cursor.next_page()
+		rest = list(WalkCursor.resume(cursor.checkpoint(), matcher=m))
+		self.assertEqual(self.relative(first + rest), ['a.txt', 'b.txt', 'd1/sub/y.exr', 'd1/sub/z.txt', 'd1/x.txt'])
+	#----------------------------------------------------------------------
+	def test_bad_tokens(self):
+		self.assertRaises(ValueError, WalkCursor.resume, 'not a token')
+		self.assertRaises(ValueError, WalkCursor.resume, '')
+		self.assertRaises(ValueError, WalkCursor, self.tmp, kind='bogus')
+		self.assertRaises(ValueError, WalkCursor, self.tmp, order='bogus')
+		self.assertRaises(ValueError, WalkCursor, self.tmp, page_size=0)
+	#----------------------------------------------------------------------
+	def test_failed_directory_stays_on_the_frontier(self):
+		broken = set([os.path.join(self.tmp, 'd1')])
+		scandir = Path_Object._scandir
+		def flaky(top):
+			if top in broken:
+				raise OSError(5, 'Input/output error', top)
+			return scandir(top)
+		Path_Object._scandir = flaky
+		try:
+			cursor = path(self.tmp).cursor(kind='files', page_size=100)
+			self.assertEqual(self.relative(cursor.next_page()), ['a.txt', 'b.txt'])
+			self.assertRaises(OSError, cursor.next_page)
+			token = cursor.checkpoint()
+			self.assertEqual(len(list(path(self.tmp).cursor(kind='files', errors='ignore'))), 4)
+			broken.clear()
+			rest = self.relative(WalkCursor.resume(token).next_page())
+		finally:
+			Path_Object._scandir = scandir
+		self.assertEqual(rest[:3], ['d1/sub/y.exr', 'd1/sub/z.txt', 'd1/x.txt'])
+	#----------------------------------------------------------------------
+	def test_loops(self):
+		os.symlink(self.tmp, os.path.join(self.tmp, 'd1', 'loop'))
+		self.assertEqual(len(list(path(self.tmp).cursor(kind='files'))), 7)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,75 @@
+""" Tests for Path_Dedupe. """
+import os, unittest
+
+import support
+import Path_Object
+import Path_Dedupe
+from Path_Object import path
+
+########################################################################
+class DuplicatesTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		body = 'x' * 100
+		self.make('a/copy1.bin', 'head' + body + 'tail')
+		self.make('b/copy2.bin', 'head' + body + 'tail')
+		self.make('b/copy3.bin', 'head' + body + 'tail')
+		# Same size and same ends, different middle.
+		self.make('a/near.bin', 'head' + 'x' * 50 + 'y' + 'x' * 49 + 'tail')
+		self.make('a/unique.bin', 'only one of these')
+		self.make('a/small1.txt', 'ab')
+		self.make('b/small2.txt', 'ab')
+		self.make('a/empty1')
+		self.make('b/empty2')
+		self.full = []
+		self._hash_file = Path_Object.hash_file
+		def counted(p, *args, **kwargs):
+			self.full.append(p)
+			return self._hash_file(p, *args, **kwargs)
+		Path_Object.hash_file = counted
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		Path_Object.hash_file = self._hash_file
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def found(self, *args, **kwargs):
+		return sorted((size, self.rel(paths)) for size, paths in path(self.tmp).duplicates(*args, **kwargs))
+	#----------------------------------------------------------------------
+	def test_finds_copies(self):
+		self.assertEqual(self.found(sample_size=8), [
+			(2, ['a/small1.txt', 'b/small2.txt']),
+			(108, ['a/copy1.bin', 'b/copy2.bin', 'b/copy3.bin']),
+		])
+		# Only the files whose samples collide are hashed in full.
+		self.assertEqual(self.rel(self.full), ['a/copy1.bin', 'a/near.bin', 'b/copy2.bin', 'b/copy3.bin'])
+	#----------------------------------------------------------------------
+	def test_small_files_compared_by_sample(self):
+		self.assertEqual(len(self.found(sample_size=1024)), 2)
+		self.assertEqual(self.full, [])
+	#----------------------------------------------------------------------
+	def test_options(self):
+		self.assertEqual(self.found(min_size=0, sample_size=8)[0], (0, ['a/empty1', 'b/empty2']))
+		self.assertEqual(self.found('*.txt', sample_size=8), [(2, ['a/small1.txt', 'b/small2.txt'])])
+		roots = [os.path.join(self.tmp, 'a'), os.path.join(self.tmp, 'b')]
+		self.assertEqual(len(list(Path_Dedupe.find_duplicates(roots, workers=1, max_pending=1))), 2)
+	#----------------------------------------------------------------------
+	def test_hard_links_count_once(self):
+		os.link(os.path.join(self.tmp, 'a', 'unique.bin'), os.path.join(self.tmp, 'b', 'linked.bin'))
+		self.assertEqual(len(self.found()), 2)
+	#----------------------------------------------------------------------
+	def test_unreadable_file(self):
+		sample = Path_Dedupe._sample_digest
+		def failing(p, *args):
+			if p.name == 'copy3.bin':
+				raise IOError(13, 'Permission denied')
+			return sample(p, *args)
+		Path_Dedupe._sample_digest = failing
+		try:
+			self.assertRaises(IOError, self.found)
+			self.assertEqual(self.found(errors='ignore', sample_size=8)[1], (108, ['a/copy1.bin', 'b/copy2.bin']))
+		finally:
+			Path_Dedupe._sample_digest = sample
+
+if __name__ == '__main__':
+	unittest.main()
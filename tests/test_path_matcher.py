@@ -0,0 +1,68 @@
+""" Tests for PathMatcher and subtree pruning in the walkers. """
+import unittest
+
+import support
+import Path_Object
+from Path_Object import path, PathMatcher
+
+########################################################################
+class PathMatcherTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_matches(self):
+		m = PathMatcher(include=['*.py', '*.pyw'], exclude='test_*', exclude_regex=r'.*_cache$')
+		self.assertTrue(m.matches('tool.py'))
+		self.assertTrue(m.matches('tool.pyw'))
+		self.assertFalse(m.matches('tool.txt'))
+		self.assertFalse(m.matches('test_tool.py'))
+		self.assertTrue(m.excluded('disk_cache'))
+		self.assertFalse(m.included('disk_cache'))
+	#----------------------------------------------------------------------
+	def test_no_patterns(self):
+		m = PathMatcher()
+		self.assertTrue(m.matches('anything'))
+		self.assertFalse(m.excluded('anything'))
+	#----------------------------------------------------------------------
+	def test_include_regex(self):
+		m = PathMatcher(include='*.exr', include_regex=[r'v\d+$', r'final'])
+		self.assertEqual([n for n in ('a.exr', 'v12', 'v12a', 'final_v1', 'b.jpg') if m.matches(n)],
+		                 ['a.exr', 'v12', 'final_v1'])
+
+########################################################################
+class PruningTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		for rel in ('a.py', 'b.txt', 'pkg/c.py', 'pkg/__pycache__/c.pyc', '.git/objects/x.py', 'pkg/old_cache/d.py'):
+			self.make(rel)
+		self.listed = []
+		self._scandir = Path_Object._scandir
+		def recorded(top):
+			self.listed.append(top)
+			return self._scandir(top)
+		Path_Object._scandir = recorded
+		self.matcher = PathMatcher(include='*.py', exclude=['.git', '__pycache__', '*_cache'])
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		Path_Object._scandir = self._scandir
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def test_walkfiles_prunes_excluded_directories(self):
+		got = path(self.tmp).walkfiles(matcher=self.matcher)
+		self.assertEqual(self.rel(got), ['a.py', 'pkg/c.py'])
+		self.assertEqual(self.rel(self.listed), ['.', 'pkg'])
+	#----------------------------------------------------------------------
+	def test_walkdirs_and_walk(self):
+		m = PathMatcher(exclude='.git')
+		self.assertEqual(self.rel(path(self.tmp).walkdirs(matcher=m)), ['pkg', 'pkg/__pycache__', 'pkg/old_cache'])
+		self.assertFalse(any('.git' in p for p in path(self.tmp).walk(matcher=m)))
+	#----------------------------------------------------------------------
+	def test_walk_parallel(self):
+		got = path(self.tmp).walk_parallel(kind='files', matcher=self.matcher, workers=2)
+		self.assertEqual(self.rel(got), ['a.py', 'pkg/c.py'])
+	#----------------------------------------------------------------------
+	def test_combined_with_pattern(self):
+		got = path(self.tmp).walkfiles('c*', matcher=self.matcher)
+		self.assertEqual(self.rel(got), ['pkg/c.py'])
+
+if __name__ == '__main__':
+	unittest.main()
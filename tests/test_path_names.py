@@ -0,0 +1,67 @@
+""" Tests for the path name properties, splitall() and relativize_many(). """
+import os, unittest
+
+import support
+import Path_Object
+from Path_Object import path
+
+NAMES = ['/usr/local/lib/libpython.so', '/home/guido/python.tar.gz', '/', '//', '/usr/',
+         'relative/file.txt', 'file', '.hidden', 'dir/.hidden', 'a/b.c/d', 'a//b', '',
+         '..', 'x/..', 'archive.', '/abs//double/']
+
+########################################################################
+class NamePropertiesTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_match_os_path(self):
+		for s in NAMES:
+			p = path(s)
+			self.assertEqual(p.parent, os.path.dirname(s), s)
+			self.assertEqual(p.name, os.path.basename(s), s)
+			self.assertEqual(p.ext, os.path.splitext(s)[1], s)
+			self.assertEqual(p.namebase, os.path.splitext(os.path.basename(s))[0], s)
+			self.assertTrue(isinstance(p.parent, path))
+	#----------------------------------------------------------------------
+	def test_without_posix_fast_path(self):
+		fast = Path_Object._POSIX_NAMES
+		Path_Object._POSIX_NAMES = False
+		try:
+			for s in NAMES:
+				self.assertEqual((path(s).parent, path(s).name, path(s).ext),
+				                 (os.path.dirname(s), os.path.basename(s), os.path.splitext(s)[1]), s)
+		finally:
+			Path_Object._POSIX_NAMES = fast
+	#----------------------------------------------------------------------
+	def test_splitall(self):
+		for s in ['/usr/local/lib', 'relative/file.txt', '/', 'file']:
+			parts = path(s).splitall()
+			self.assertTrue(isinstance(parts[0], path))
+			self.assertEqual(path(parts[0]).joinpath(*parts[1:]), s)
+		self.assertEqual(path('/usr/local').splitall(), ['/', 'usr', 'local'])
+		# The memoized components are not shared with the caller.
+		path('/usr/local').splitall().append('x')
+		self.assertEqual(path('/usr/local').splitall(), ['/', 'usr', 'local'])
+
+########################################################################
+class RelativizeTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_matches_relpathto(self):
+		root = path(self.tmp)
+		j = os.path.join
+		paths = [j(self.tmp, 'a'), j(self.tmp, 'a', 'b.txt'), self.tmp, self.tmp + '/',
+		         j(self.tmp, 'a') + '/', self.tmp + '//a', self.tmp + '/./a', j(self.tmp, 'a', '..', 'b'),
+		         os.path.dirname(self.tmp), '/', j(os.path.dirname(self.tmp), 'sibling', 'x'),
+		         'relative/to/cwd', self.tmp + 'suffix']
+		got = root.relativize_many(paths)
+		self.assertEqual(got, [root.relpathto(p) for p in paths])
+		self.assertEqual(got, [os.path.relpath(p, self.tmp) for p in paths])
+		self.assertTrue(all(isinstance(p, path) for p in got))
+	#----------------------------------------------------------------------
+	def test_walk_output(self):
+		for rel in ('a.txt', 'sub/b.txt', 'sub/deep/c.txt'):
+			self.make(rel)
+		root = path(self.tmp)
+		walked = list(root.walk())
+		self.assertEqual(sorted(root.relativize_many(walked)), self.rel(walked))
+
+if __name__ == '__main__':
+	unittest.main()
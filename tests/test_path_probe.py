@@ -0,0 +1,140 @@
+""" Tests for Path_Probe. """
+import os, time, threading, unittest
+
+import support
+import Path_Probe
+from Path_Probe import ExistenceProbe, UP, SLOW, DOWN
+
+TIMEOUT = 10
+
+########################################################################
+class ExistenceProbeTest(support.TempDirTestCase):
+	""" os.path.exists() is replaced by one that blocks on paths below
+	/hung until self.release is set, and records what it was asked. """
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.release = threading.Event()
+		self.checked = []
+		self.os_exists = os.path.exists
+		def exists(p):
+			self.checked.append(p)
+			if p.startswith('/hung/'):
+				self.release.wait(TIMEOUT)
+				return True
+			if p.startswith('/broken/'):
+				raise OSError(5, 'Input/output error', p)
+			return self.os_exists(p)
+		os.path.exists = exists
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		self.release.set()
+		os.path.exists = self.os_exists
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def wait_for(self, condition):
+		deadline = time.time() + TIMEOUT
+		while not condition() and time.time() < deadline:
+			time.sleep(0.01)
+		self.assertTrue(condition())
+	#----------------------------------------------------------------------
+	def test_exists(self):
+		probe = ExistenceProbe()
+		f = self.make('a.txt')
+		self.assertTrue(probe.exists(f))
+		self.assertFalse(probe.exists(f + '.missing'))
+		self.assertFalse(probe.exists('/broken/volume/x'))
+		self.assertEqual(probe.status(self.tmp), UP)
+		self.assertEqual(probe.status('/never/checked'), None)
+	#----------------------------------------------------------------------
+	def test_results_are_cached(self):
+		probe = ExistenceProbe(negative_ttl=0)
+		f = self.make('a.txt')
+		self.assertTrue(probe.exists(f))
+		os.remove(f)
+		self.assertTrue(probe.exists(f))
+		self.assertEqual(self.checked.count(f), 1)
+		probe.invalidate(f)
+		self.assertFalse(probe.exists(f))
+		# Missing paths expire after negative_ttl.
+		self.make('a.txt')
+		self.assertTrue(probe.exists(f))
+		self.assertEqual(self.checked.count(f), 3)
+		probe.invalidate()
+		self.assertEqual(probe._cache, {})
+	#----------------------------------------------------------------------
+	def test_timeout_marks_the_volume_down(self):
+		probe = ExistenceProbe(timeout=0.05)
+		self.assertFalse(probe.exists('/hung/vol/a'))
+		self.assertEqual(probe.status('/hung/vol'), DOWN)
+		self.assertEqual(probe.volumes()['/hung/vol'][:2], (DOWN, None))
+		# Other paths on the volume are answered at once, without a check.
+		started = time.time()
+		self.assertFalse(probe.exists('/hung/vol/b', timeout=5))
+		self.assertTrue(time.time() - started < 1)
+		self.assertEqual(self.checked, ['/hung/vol/a'])
+		# Other volumes are not affected.
+		self.assertTrue(probe.exists(self.make('a.txt')))
+		# The stuck check brings the volume back when it finishes.
+		self.release.set()
+		self.wait_for(lambda: probe.status('/hung/vol') != DOWN)
+		self.assertTrue(probe.exists('/hung/vol/a'))
+		probe.invalidate('/hung/vol/b')
+		self.assertTrue(probe.exists('/hung/vol/b'))
+	#----------------------------------------------------------------------
+	def test_per_volume_timeout(self):
+		probe = ExistenceProbe(timeout=5)
+		probe.set_timeout('/hung/vol', 0.05)
+		started = time.time()
+		self.assertFalse(probe.exists('/hung/vol/a'))
+		self.assertTrue(time.time() - started < 1)
+		probe.set_timeout('/hung/vol/anything', None)
+		self.assertEqual(probe._timeouts, {})
+	#----------------------------------------------------------------------
+	def test_slow(self):
+		probe = ExistenceProbe(timeout=5, slow_after=0.05)
+		self.release.set()
+		def slow(p):
+			time.sleep(0.1)
+			return True
+		os.path.exists = slow
+		self.assertTrue(probe.exists('/slow/vol/a'))
+		self.assertEqual(probe.status('/slow/vol/b'), SLOW)
+		self.assertTrue(probe.volumes()['/slow/vol'][1] >= 0.05)
+	#----------------------------------------------------------------------
+	def test_callers_share_a_check(self):
+		probe = ExistenceProbe(timeout=5)
+		results = []
+		threads = [threading.Thread(target=lambda: results.append(probe.exists('/hung/vol/a'))) for i in range(3)]
+		for t in threads:
+			t.start()
+		self.wait_for(lambda: '/hung/vol/a' in self.checked)
+		self.release.set()
+		for t in threads:
+			t.join(TIMEOUT)
+		self.assertEqual(results, [True] * 3)
+		self.assertEqual(self.checked, ['/hung/vol/a'])
+	#----------------------------------------------------------------------
+	def test_max_entries(self):
+		probe = ExistenceProbe(max_entries=8, negative_ttl=0)
+		for i in range(9):
+			probe.exists(os.path.join(self.tmp, 'missing%d' % i))
+		# Expired results go first: all of them, once the cache is full.
+		self.assertEqual(list(probe._cache), [os.path.join(self.tmp, 'missing8')])
+		probe.negative_ttl = 100
+		for i in range(20):
+			probe.exists(os.path.join(self.tmp, 'missing%d' % i))
+			self.assertTrue(len(probe._cache) <= 8)
+		# Those closest to expiring go next: the last one added stays.
+		self.assertTrue(os.path.join(self.tmp, 'missing19') in probe._cache)
+
+########################################################################
+class DefaultProbeTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_default_probe(self):
+		self.assertTrue(Path_Probe.default_probe() is Path_Probe.default_probe())
+		self.assertTrue(Path_Probe.exists(support.REPO))
+		self.assertEqual(Path_Probe.status(support.REPO), Path_Probe.default_probe().status(support.REPO))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,82 @@
+""" Tests for Path_Sequence. """
+import os, unittest
+
+import support
+import Path_Sequence
+from Path_Sequence import find_sequences, frame_ranges
+from Path_Object import path
+
+########################################################################
+class FindSequencesTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_padded_sequence_with_gaps(self):
+		frames = [1001, 1002, 1003, 1007, 1009, 1010]
+		names = ['shot.%04d.exr' % f for f in frames] + ['notes.txt']
+		seqs, others = find_sequences(names, '/show')
+		self.assertEqual(others, ['notes.txt'])
+		self.assertEqual(len(seqs), 1)
+		seq = seqs[0]
+		self.assertEqual((seq.pattern, seq.hash_pattern), ('shot.%04d.exr', 'shot.####.exr'))
+		self.assertEqual((seq.start, seq.end, seq.frame_range), (1001, 1010, '1001-1010'))
+		self.assertEqual(seq.missing_ranges(), [(1004, 1007), (1008, 1009)])
+		self.assertEqual(seq.missing, [1004, 1005, 1006, 1008])
+		self.assertEqual(seq.missing_range, '1004-1006,1008')
+		self.assertEqual(list(seq.frames()), frames)
+		self.assertEqual(len(seq), 6)
+		self.assertEqual(seq.frame_path(1007), os.path.join('/show', 'shot.1007.exr'))
+		self.assertEqual(list(seq)[0], os.path.join('/show', 'shot.1001.exr'))
+	#----------------------------------------------------------------------
+	def test_contains(self):
+		seq = find_sequences(['f.%d' % n for n in (1, 2, 5, 9, 10)])[0][0]
+		present = [n for n in range(0, 12) if n in seq]
+		self.assertEqual(present, [1, 2, 5, 9, 10])
+	#----------------------------------------------------------------------
+	def test_padding(self):
+		names = ['a.0099.exr', 'a.0100.exr', 'b.8.exr', 'b.9.exr', 'b.10.exr', 'c.1001.exr', 'c.1002.exr']
+		seqs = find_sequences(names)[0]
+		self.assertEqual([seq.pattern for seq in seqs], ['a.%04d.exr', 'b.%d.exr', 'c.%04d.exr'])
+	#----------------------------------------------------------------------
+	def test_min_frames(self):
+		seqs, others = find_sequences(['x.1.exr', 'x.2.exr', 'y.1.exr'], min_frames=2)
+		self.assertEqual([seq.pattern for seq in seqs], ['x.%d.exr'])
+		self.assertEqual(others, ['y.1.exr'])
+		seqs, others = find_sequences(['x.1.exr', 'x.2.exr'], min_frames=3)
+		self.assertEqual((seqs, sorted(others)), ([], ['x.1.exr', 'x.2.exr']))
+	#----------------------------------------------------------------------
+	def test_max_gap(self):
+		names = ['render_1.log', 'render_2.log', 'render_20240101.log', 'render_20240102.log']
+		seqs = find_sequences(names)[0]
+		self.assertEqual([seq.frame_range for seq in seqs], ['1-2', '20240101-20240102'])
+		self.assertEqual(len(find_sequences(names, max_gap=None)[0]), 1)
+		names = ['f.%d' % n for n in (1, 5, 6)]
+		self.assertEqual(len(find_sequences(names, max_gap=3)[0]), 1)
+		seqs, others = find_sequences(names, max_gap=2)
+		self.assertEqual(([seq.frame_range for seq in seqs], others), (['5-6'], ['f.1']))
+	#----------------------------------------------------------------------
+	def test_large_gap_is_stored_as_a_range(self):
+		seq = find_sequences(['f.1', 'f.1000000'], max_gap=None)[0][0]
+		self.assertEqual(seq.missing_ranges(), [(2, 1000000)])
+		self.assertEqual(len(seq), 2)
+		self.assertTrue(500000 not in seq)
+	#----------------------------------------------------------------------
+	def test_frame_ranges(self):
+		self.assertEqual(frame_ranges([1, 2, 3, 5, 7, 8]), '1-3,5,7-8')
+		self.assertEqual(frame_ranges([]), '')
+
+########################################################################
+class DirectorySequencesTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_path_sequences(self):
+		for f in (1, 2, 3, 5):
+			self.make('shot.%04d.exr' % f)
+		self.make('shot.0001.jpg')
+		self.make('readme.txt')
+		self.mkdir('dir.0004.exr')
+		seqs = path(self.tmp).sequences('*.exr')
+		self.assertEqual(len(seqs), 1)
+		self.assertEqual(seqs[0].missing, [4])
+		seqs, others = Path_Sequence.sequences(self.tmp)
+		self.assertEqual(self.rel(others), ['readme.txt', 'shot.0001.jpg'])
+
+if __name__ == '__main__':
+	unittest.main()
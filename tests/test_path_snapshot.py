@@ -0,0 +1,75 @@
+""" Tests for Path_Snapshot. """
+import os, time, unittest
+
+import support
+import Path_Snapshot
+from Path_Object import path
+
+########################################################################
+class SnapshotTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.root = self.mkdir('root')
+		self.make('root/a.txt', 'aaa')
+		self.make('root/sub/b.exr', 'bb')
+		self.make('root/sub/deep/c.exr', 'c')
+		self.age_dirs()
+		self.store = os.path.join(self.tmp, 'root.snap')
+	#----------------------------------------------------------------------
+	def age_dirs(self):
+		""" Move every directory's mtime out of the mtime race window. """
+		old = time.time() - 100
+		for top, dirs, files in os.walk(self.root):
+			os.utime(top, (old, old))
+	#----------------------------------------------------------------------
+	def test_build_matches_walk(self):
+		snap = path(self.root).snapshot(self.store)
+		self.assertEqual(sorted(snap.walk()), sorted(path(self.root).walk()))
+		self.assertEqual(sorted(snap.walkfiles('*.exr')), sorted(path(self.root).walkfiles('*.exr')))
+		self.assertEqual(len(snap), 5)
+		self.assertTrue(os.path.join(self.root, 'sub', 'b.exr') in snap)
+		self.assertFalse(os.path.join(self.root, 'sub', 'nope') in snap)
+		self.assertEqual(sorted(snap.listdir('sub')), sorted(path(self.root).joinpath('sub').listdir()))
+		self.assertRaises(KeyError, snap.listdir, 'a.txt')
+	#----------------------------------------------------------------------
+	def test_refresh_lists_only_changed_directories(self):
+		path(self.root).snapshot(self.store)
+		snap = Path_Snapshot.Snapshot.load(self.store)
+		snap.refresh()
+		self.assertEqual(snap.relisted, 0)
+		self.make('root/sub/new.exr', 'n')
+		snap.refresh()
+		self.assertEqual(snap.relisted, 1)
+		self.assertTrue(os.path.join(self.root, 'sub', 'new.exr') in snap)
+		os.remove(os.path.join(self.root, 'a.txt'))
+		snap.refresh()
+		self.assertFalse(os.path.join(self.root, 'a.txt') in snap)
+	#----------------------------------------------------------------------
+	def test_restat_picks_up_rewritten_files(self):
+		snap = path(self.root).snapshot(self.store)
+		# Rewriting a file leaves its directory's mtime alone.
+		p = self.make('root/sub/deep/c.exr', 'longer contents')
+		sizes = dict((p, size) for p, kind, size, mtime, ino in snap.refresh().entries())
+		self.assertEqual(sizes[p], 1)
+		sizes = dict((p, size) for p, kind, size, mtime, ino in snap.refresh(restat=True).entries())
+		self.assertEqual(sizes[p], len('longer contents'))
+	#----------------------------------------------------------------------
+	def test_save_and_load(self):
+		snap = path(self.root).snapshot(self.store)
+		self.assertTrue(os.path.exists(self.store))
+		self.assertEqual([f for f in os.listdir(self.tmp) if f.endswith('.tmp')], [])
+		loaded = Path_Snapshot.Snapshot.load(self.store)
+		self.assertEqual(list(loaded.entries()), list(snap.entries()))
+		self.assertEqual(loaded.root, snap.root)
+	#----------------------------------------------------------------------
+	def test_entry_types(self):
+		os.symlink(os.path.join(self.root, 'a.txt'), os.path.join(self.root, 'link'))
+		snap = Path_Snapshot.Snapshot(self.root).refresh()
+		kinds = dict((p.name, kind) for p, kind, size, mtime, ino in snap.entries())
+		self.assertEqual(kinds['a.txt'], Path_Snapshot.FILE)
+		self.assertEqual(kinds['sub'], Path_Snapshot.DIR)
+		self.assertEqual(kinds['link'], Path_Snapshot.LINK)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,84 @@
+""" Tests for Path_Table. """
+import os, unittest
+
+import support
+from Path_Table import PathTable
+from Path_Object import path
+
+join = os.path.join
+ROOT = join(os.sep, 'show')
+
+########################################################################
+class PathTableTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		# Names added out of order, so the sorted children are exercised.
+		self.paths = [join(ROOT, 'shot_020', 'z.exr'), join(ROOT, 'shot_010', 'b.exr'),
+		              join(ROOT, 'shot_010', 'a.exr'), join(ROOT, 'shot_020', 'a.exr'),
+		              join(ROOT, 'notes.txt')]
+		self.table = PathTable(self.paths)
+	#----------------------------------------------------------------------
+	def test_membership(self):
+		self.assertEqual(len(self.table), 5)
+		for p in self.paths:
+			self.assertTrue(p in self.table)
+			self.assertTrue(path(p) in self.table)
+		self.assertFalse(join(ROOT, 'shot_010') in self.table)
+		self.assertFalse(join(ROOT, 'shot_030', 'a.exr') in self.table)
+		self.assertFalse(join(ROOT, 'unknown_name') in self.table)
+	#----------------------------------------------------------------------
+	def test_paths_come_back_as_added(self):
+		self.assertEqual(list(self.table), self.paths)
+		self.assertTrue(all(isinstance(p, path) for p in self.table))
+		self.table.add(join(ROOT, 'trailing') + os.sep)
+		self.assertTrue(join(ROOT, 'trailing') in self.table)
+		table = PathTable(['relative/a', os.sep])
+		self.assertEqual(list(table), ['relative/a'.replace('/', os.sep), os.sep])
+	#----------------------------------------------------------------------
+	def test_add_and_discard(self):
+		self.table.add(self.paths[0])
+		self.assertEqual(len(self.table), 5)
+		self.table.discard(self.paths[0])
+		self.table.discard(self.paths[0])
+		self.table.discard(join(ROOT, 'never_added'))
+		self.assertEqual(len(self.table), 4)
+		self.assertFalse(self.paths[0] in self.table)
+		self.table.add(self.paths[0])
+		self.assertTrue(self.paths[0] in self.table)
+		self.assertRaises(ValueError, self.table.add, '')
+	#----------------------------------------------------------------------
+	def test_prefix_queries(self):
+		shot = join(ROOT, 'shot_010')
+		self.assertTrue(self.table.has_prefix(shot))
+		self.assertFalse(self.table.has_prefix(join(ROOT, 'shot_030')))
+		self.assertEqual(self.table.count_below(shot), 2)
+		self.assertEqual(self.table.count_below(ROOT), 5)
+		self.assertEqual(list(self.table.subtree(shot)), [join(shot, 'b.exr'), join(shot, 'a.exr')])
+		self.assertEqual(list(self.table.subtree(join(ROOT, 'missing'))), [])
+		self.assertEqual(self.table.children(ROOT),
+		                 [join(ROOT, 'shot_020'), join(ROOT, 'shot_010'), join(ROOT, 'notes.txt')])
+		self.table.discard(join(shot, 'a.exr'))
+		self.table.discard(join(shot, 'b.exr'))
+		self.assertFalse(self.table.has_prefix(shot))
+		self.assertEqual(self.table.count_below(shot), 0)
+	#----------------------------------------------------------------------
+	def test_many_siblings(self):
+		names = ['f%05d' % i for i in range(2000)]
+		names.reverse()
+		table = PathTable(join(ROOT, name) for name in names)
+		self.assertEqual(len(table), 2000)
+		self.assertTrue(join(ROOT, 'f01234') in table)
+		self.assertEqual(table.children(ROOT)[:2], [join(ROOT, 'f01999'), join(ROOT, 'f01998')])
+
+########################################################################
+class FromWalkTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_from_walk(self):
+		for rel in ('a.exr', 'sub/b.exr', 'sub/c.txt'):
+			self.make(rel)
+		table = path(self.tmp).table('*.exr')
+		self.assertEqual(sorted(table), sorted(path(self.tmp).walkfiles('*.exr')))
+		self.assertEqual(table.count_below(join(self.tmp, 'sub')), 1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,108 @@
+""" Tests for Path_Usage. """
+import os, time, unittest
+
+import support
+import Path_Object
+from Path_Usage import UsageCache, disk_usage
+from Path_Object import path
+
+########################################################################
+class DiskUsageTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.make('a.bin', 'x' * 10)
+		self.make('one/b.bin', 'x' * 100)
+		self.make('one/deep/c.bin', 'x' * 1000)
+		self.make('two/d.bin', 'x' * 5)
+		os.link(os.path.join(self.tmp, 'one', 'b.bin'), os.path.join(self.tmp, 'two', 'b_link.bin'))
+		os.symlink(os.path.join(self.tmp, 'one'), os.path.join(self.tmp, 'link_to_one'))
+		self.mkdir('empty')
+		self.age_dirs()
+		self.cache = UsageCache()
+	#----------------------------------------------------------------------
+	def age_dirs(self):
+		""" Move every directory's mtime out of the mtime race window. """
+		old = time.time() - 100
+		for top, dirs, files in os.walk(self.tmp):
+			os.utime(top, (old, old))
+	#----------------------------------------------------------------------
+	def usage(self, **kwargs):
+		kwargs.setdefault('cache', self.cache)
+		res = disk_usage(self.tmp, workers=2, **kwargs)
+		return dict((os.path.relpath(p, self.tmp), totals) for p, totals in res.items())
+	#----------------------------------------------------------------------
+	def test_totals(self):
+		self.assertEqual(self.usage(), {
+			'.': (1115, 4),
+			'one': (1100, 2),
+			'one/deep': (1000, 1),
+			'two': (5, 1),
+			'empty': (0, 0),
+		})
+		# The hard link counts in 'one', which comes first in sorted order.
+		self.assertEqual(self.usage(depth=0), {'.': (1115, 4)})
+		self.assertEqual(sorted(self.usage(depth=1)), ['.', 'empty', 'one', 'two'])
+		self.assertEqual(path(self.tmp).disk_usage(depth=0, cache=False)[self.tmp], (1115, 4))
+	#----------------------------------------------------------------------
+	def test_unchanged_directories_come_from_the_cache(self):
+		self.usage()
+		listed = []
+		scandir = Path_Object._scandir
+		def recorded(top):
+			listed.append(top)
+			return scandir(top)
+		Path_Object._scandir = recorded
+		try:
+			self.assertEqual(self.usage()['.'], (1115, 4))
+			self.assertEqual(listed, [])
+			self.make('two/e.bin', 'x' * 7)
+			self.assertEqual(self.usage()['.'], (1122, 5))
+			self.assertEqual(self.rel(listed), ['two'])
+			del listed[:]
+			self.usage(restat=True)
+			self.assertEqual(len(listed), 5)
+		finally:
+			Path_Object._scandir = scandir
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		missing = os.path.join(self.tmp, 'missing')
+		self.assertRaises(OSError, disk_usage, missing, cache=False)
+		self.assertEqual(disk_usage(missing, cache=False, errors='ignore'), {})
+		self.assertRaises(ValueError, disk_usage, self.tmp, errors='bogus')
+
+########################################################################
+class UsageCacheTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_lru(self):
+		cache = UsageCache(max_entries=2)
+		old = time.time() - 100
+		record = (1, 1, (), ())
+		cache.put('/a', old, old + 10, record)
+		cache.put('/b', old, old + 10, record)
+		self.assertEqual(cache.get('/a', old), record)
+		cache.put('/c', old, old + 10, record)
+		self.assertEqual(len(cache), 2)
+		# '/b' was the least recently used.
+		self.assertEqual(cache.get('/b', old), None)
+		self.assertEqual(cache.get('/a', old), record)
+		self.assertEqual(cache.get('/a', old + 1), None)
+	#----------------------------------------------------------------------
+	def test_race_window(self):
+		cache = UsageCache()
+		now = time.time()
+		cache.put('/a', now, now, (1, 1, (), ()))
+		self.assertEqual(cache.get('/a', now), None)
+	#----------------------------------------------------------------------
+	def test_save_and_load(self):
+		store = os.path.join(self.tmp, 'usage.cache')
+		self.assertRaises(ValueError, UsageCache().save)
+		cache = UsageCache(store)
+		cache.put('/a', 1.0, 100.0, (1, 1, ('sub',), ()))
+		cache.save()
+		loaded = UsageCache(store)
+		self.assertEqual(loaded.get('/a', 1.0), (1, 1, ('sub',), ()))
+		self.assertEqual(len(UsageCache(store, max_entries=0)), 0)
+
+if __name__ == '__main__':
+	unittest.main()
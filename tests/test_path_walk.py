@@ -0,0 +1,72 @@
+""" Tests for the scandir based walk(), walkdirs() and walkfiles(). """
+import os, unittest, warnings
+
+import support
+import Path_Object
+from Path_Object import path, PathWalkWarning
+
+########################################################################
+class WalkTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		for rel in ('a.txt', 'b.exr', 'sub/c.txt', 'sub/deep/d.exr', 'other/e.txt'):
+			self.make(rel)
+		self.mkdir('empty')
+	#----------------------------------------------------------------------
+	def reference(self, kind, pattern='*'):
+		""" What os.walk() finds, sorted. """
+		import fnmatch
+		res = []
+		for top, dirs, files in os.walk(self.tmp):
+			if kind in ('all', 'dirs'):
+				res.extend(os.path.join(top, d) for d in dirs if fnmatch.fnmatch(d, pattern))
+			if kind in ('all', 'files'):
+				res.extend(os.path.join(top, f) for f in files if fnmatch.fnmatch(f, pattern))
+		return self.rel(res)
+	#----------------------------------------------------------------------
+	def test_walk_kinds_match_os_walk(self):
+		root = path(self.tmp)
+		self.assertEqual(self.rel(root.walk()), self.reference('all'))
+		self.assertEqual(self.rel(root.walkdirs()), self.reference('dirs'))
+		self.assertEqual(self.rel(root.walkfiles()), self.reference('files'))
+	#----------------------------------------------------------------------
+	def test_pattern(self):
+		root = path(self.tmp)
+		self.assertEqual(self.rel(root.walkfiles('*.exr')), ['b.exr', 'sub/deep/d.exr'])
+		# walk() only descends into directories that match the pattern.
+		self.assertEqual(self.rel(root.walk('*.txt')), ['a.txt'])
+		self.assertEqual(self.rel(root.walk('s*')), ['sub'])
+	#----------------------------------------------------------------------
+	def test_depth_first_order(self):
+		items = [os.path.relpath(p, self.tmp) for p in path(self.tmp).walk()]
+		# Every directory comes before its contents.
+		for i, p in enumerate(items):
+			parent = os.path.dirname(p)
+			if parent:
+				self.assertTrue(items.index(parent) < i)
+	#----------------------------------------------------------------------
+	def test_yields_path_objects(self):
+		for p in path(self.tmp).walk():
+			self.assertTrue(isinstance(p, path))
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		missing = path(os.path.join(self.tmp, 'missing'))
+		self.assertRaises(OSError, list, missing.walk())
+		self.assertEqual(list(missing.walk(errors='ignore')), [])
+		with warnings.catch_warnings(record=True) as caught:
+			warnings.simplefilter('always')
+			self.assertEqual(list(missing.walkfiles(errors='warn')), [])
+		self.assertEqual(len([w for w in caught if w.category is PathWalkWarning]), 1)
+		self.assertRaises(ValueError, list, path(self.tmp).walk(errors='bogus'))
+	#----------------------------------------------------------------------
+	def test_listdir_fallback(self):
+		impl = Path_Object._scandir_impl
+		Path_Object._scandir_impl = None
+		try:
+			self.assertEqual(self.rel(path(self.tmp).walk()), self.reference('all'))
+		finally:
+			Path_Object._scandir_impl = impl
+
+if __name__ == '__main__':
+	unittest.main()
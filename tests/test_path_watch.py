@@ -0,0 +1,128 @@
+""" Tests for Path_Watch. """
+import os, time, unittest
+
+import support
+import Path_Watch
+from Path_Watch import Watcher, ChangeEvent, CREATED, MODIFIED, DELETED
+
+TIMEOUT = 10
+
+########################################################################
+class MergeTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_merge(self):
+		merge = Path_Watch._merge
+		self.assertEqual(merge(CREATED, MODIFIED), CREATED)
+		self.assertEqual(merge(CREATED, DELETED), None)
+		self.assertEqual(merge(DELETED, CREATED), MODIFIED)
+		self.assertEqual(merge(MODIFIED, DELETED), DELETED)
+		self.assertEqual(merge(MODIFIED, MODIFIED), MODIFIED)
+
+########################################################################
+class PollingBackendTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_compare_snapshots(self):
+		self.make('keep.txt', 'a')
+		self.make('change.txt', 'a')
+		self.make('gone.txt', 'a')
+		self.make('sub/inner.txt', 'a')
+		events = []
+		backend = Path_Watch._PollingBackend(events.append, 'strict')
+		backend.add_root(self.tmp)
+		self.make('change.txt', 'longer')
+		os.remove(os.path.join(self.tmp, 'gone.txt'))
+		self.make('sub/new.txt')
+		self.mkdir('newdir')
+		backend.poll()
+		join = os.path.join
+		self.assertEqual(sorted(events, key=lambda e: e.path), [
+			ChangeEvent(MODIFIED, join(self.tmp, 'change.txt')),
+			ChangeEvent(DELETED, join(self.tmp, 'gone.txt')),
+			ChangeEvent(CREATED, join(self.tmp, 'newdir'), True),
+			ChangeEvent(CREATED, join(self.tmp, 'sub', 'new.txt')),
+		])
+		del events[:]
+		backend.poll()
+		self.assertEqual(events, [])
+
+########################################################################
+@unittest.skipUnless(Path_Watch.inotify_available(), "inotify is not available")
+class InotifyBackendTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_add_tree(self):
+		tree = self.mkdir('tree')
+		self.make('tree/a/b/f.txt')
+		outside = self.mkdir('outside/deep')
+		os.symlink(os.path.dirname(outside), os.path.join(tree, 'link'))
+		events = []
+		backend = Path_Watch._InotifyBackend(events.append, 'strict')
+		try:
+			backend.add_tree(tree, report=True)
+			watched = sorted(backend.dirs.values())
+		finally:
+			backend.close()
+		# Links are reported, but not followed out of the tree.
+		self.assertEqual(self.rel(watched), ['tree', 'tree/a', 'tree/a/b'])
+		self.assertEqual(sorted((e.is_dir, os.path.relpath(e.path, tree)) for e in events),
+		                 [(False, 'a/b/f.txt'), (False, 'link'), (True, 'a'), (True, 'a/b')])
+
+########################################################################
+class WatcherTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def watch(self, backend):
+		self.make('existing.txt', 'a')
+		watcher = Watcher(self.tmp, backend=backend, debounce=0.1, poll_interval=0.1, errors='strict')
+		watcher.start()
+		try:
+			# Created, modified and deleted again: cancels out.
+			self.make('temp.txt', 'a')
+			self.make('temp.txt', 'ab')
+			os.remove(os.path.join(self.tmp, 'temp.txt'))
+			# Created, then modified: reported as created.
+			self.make('new.txt', 'a')
+			self.make('new.txt', 'abc')
+			os.remove(os.path.join(self.tmp, 'existing.txt'))
+			events = []
+			deadline = time.time() + TIMEOUT
+			while len(events) < 2 and time.time() < deadline:
+				events.extend(watcher.get_batch(timeout=0.5))
+		finally:
+			watcher.stop()
+		return sorted((e.kind, os.path.basename(e.path)) for e in events)
+	#----------------------------------------------------------------------
+	def test_polling(self):
+		self.assertEqual(self.watch('poll'), [(CREATED, 'new.txt'), (DELETED, 'existing.txt')])
+	#----------------------------------------------------------------------
+	@unittest.skipUnless(Path_Watch.inotify_available(), "inotify is not available")
+	def test_inotify(self):
+		self.assertEqual(self.watch('inotify'), [(CREATED, 'new.txt'), (DELETED, 'existing.txt')])
+	#----------------------------------------------------------------------
+	def test_callback(self):
+		batches = []
+		with Watcher(self.tmp, callback=batches.append, backend='poll', debounce=0.05, poll_interval=0.05):
+			self.make('file.txt')
+			deadline = time.time() + TIMEOUT
+			while not batches and time.time() < deadline:
+				time.sleep(0.05)
+		self.assertEqual(batches, [[ChangeEvent(CREATED, os.path.join(self.tmp, 'file.txt'))]])
+	#----------------------------------------------------------------------
+	def test_max_delay(self):
+		# The raw events are all queued before the dispatcher starts, so
+		# it never waits for one and only max_delay can end a batch.
+		watcher = Watcher(self.tmp, backend='poll', debounce=10.0, max_delay=0.05)
+		count = 100000
+		for i in xrange(count):
+			watcher._raw.put(ChangeEvent(CREATED, 'f%d' % i))
+		watcher._spawn(watcher._dispatch, 'path-watch-dispatch')
+		try:
+			first = watcher.get_batch(timeout=TIMEOUT)
+		finally:
+			watcher.stop()
+		self.assertTrue(0 < len(first) < count, len(first))
+	#----------------------------------------------------------------------
+	def test_arguments(self):
+		self.assertRaises(ValueError, Watcher, self.tmp, backend='bogus')
+		self.assertRaises(ValueError, Watcher, self.tmp, errors='bogus')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,96 @@
+""" Tests for the StatCache behind path.stat() and friends. """
+import os, unittest
+
+import support
+import Path_Object
+from Path_Object import path, StatCache
+
+########################################################################
+class StatCacheTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.file = self.make('a.txt', 'abc')
+		self.calls = []
+		self._stat = os.stat
+		def counted(p):
+			self.calls.append(p)
+			return self._stat(p)
+		os.stat = counted
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		os.stat = self._stat
+		Path_Object.disable_stat_cache()
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def test_off_by_default(self):
+		self.assertEqual(Path_Object.get_stat_cache(), None)
+		p = path(self.file)
+		p.size, p.mtime
+		self.assertEqual(len(self.calls), 2)
+	#----------------------------------------------------------------------
+	def test_metadata_shares_one_stat(self):
+		cache = Path_Object.enable_stat_cache(ttl=None)
+		self.assertTrue(Path_Object.get_stat_cache() is cache)
+		p = path(self.file)
+		self.assertEqual(p.size, 3)
+		p.mtime, p.atime, p.ctime
+		Path_Object.date_time_object(p).date_last_mod
+		self.assertEqual(len(self.calls), 1)
+	#----------------------------------------------------------------------
+	def test_writes_invalidate(self):
+		Path_Object.enable_stat_cache(ttl=None)
+		p = path(self.file)
+		self.assertEqual(p.size, 3)
+		p.write_bytes('abcdef')
+		self.assertEqual(p.size, 6)
+		# A change made behind the cache's back needs invalidate_stat().
+		self.make('a.txt', 'a')
+		self.assertEqual(p.size, 6)
+		p.invalidate_stat()
+		self.assertEqual(p.size, 1)
+	#----------------------------------------------------------------------
+	def test_ttl(self):
+		cache = StatCache(ttl=0)
+		cache.stat(self.file)
+		cache.stat(self.file)
+		self.assertEqual(len(self.calls), 2)
+	#----------------------------------------------------------------------
+	def test_max_entries(self):
+		files = [self.make('f%d.txt' % i) for i in range(5)]
+		cache = StatCache(ttl=None, max_entries=3)
+		for f in files[:3]:
+			cache.stat(f)
+		# A hit makes files[0] the most recently used.
+		cache.stat(files[0])
+		cache.stat(files[3])
+		cache.stat(files[4])
+		self.assertEqual(len(cache), 3)
+		del self.calls[:]
+		for f in (files[0], files[3], files[4]):
+			cache.stat(f)
+		self.assertEqual(self.calls, [])
+		cache.stat(files[1])
+		self.assertEqual(len(self.calls), 1)
+		self.assertEqual(len(cache), 3)
+	#----------------------------------------------------------------------
+	def test_failures_are_not_cached(self):
+		cache = StatCache(ttl=None)
+		missing = os.path.join(self.tmp, 'missing')
+		self.assertRaises(OSError, cache.stat, missing)
+		self.assertEqual(len(cache), 0)
+	#----------------------------------------------------------------------
+	def test_stat_many(self):
+		other = self.make('b.txt', 'hello')
+		missing = os.path.join(self.tmp, 'missing')
+		cache = Path_Object.enable_stat_cache(ttl=None)
+		res = Path_Object.stat_many([self.file, missing, other])
+		self.assertEqual([st and st.st_size for st in res], [3, None, 5])
+		del self.calls[:]
+		self.assertEqual(path(other).size, 5)
+		self.assertEqual(self.calls, [])
+		cache.invalidate()
+		self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+	unittest.main()
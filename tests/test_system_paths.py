@@ -0,0 +1,119 @@
+""" Tests for the lazily resolved System_Paths constants. """
+import unittest
+
+import support
+
+BASE = '/Volumes/aw_config/Git_Live_Code'
+
+# Imports System_Paths in the child, recording its warnings, with
+# Path_Probe.exists answering True where the child set EXISTS.
+IMPORT = '''
+import json, os, sys, warnings
+from Environment_Access import Path_Probe
+if 'EXISTS' in globals():
+	Path_Probe.exists = lambda path, *args, **kwargs: True
+warnings.simplefilter('always')
+with warnings.catch_warnings(record=True) as caught:
+	from Environment_Access import System_Paths
+warned = [w.category.__name__ for w in caught]
+'''
+
+# No snapshot, and none of the keys the module writes set beforehand.
+ENVIRON = dict(AW_SYSTEM_SNAPSHOT='', AW_BASE=None, AW_GLOBAL_SYSTEMS=None, AW_SOFTWARE_SYSTEMS=None,
+               AW_ENVIRONMENT_ACCESS=None, AW_SITE_PACKAGES=None, AW_USER_TOOLS=None,
+               NUKE_USER_TOOLS_DIR=None, MAYA_USER_TOOLS_DIR=None, AW_COMMON_UTILITIES=None, AW_SITE=None)
+
+########################################################################
+class SystemPathsTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def run_child(self, code, exists=False):
+		if support.package_parent() is None:
+			self.skipTest("needs symbolic links")
+		prelude = exists and 'EXISTS = True\n' or ''
+		return support.run_python(prelude + IMPORT + code, **ENVIRON)
+	#----------------------------------------------------------------------
+	def test_constants_are_lazy(self):
+		res = self.run_child('''
+before = sorted(System_Paths.resolved())
+maya = System_Paths._CODE_MAYA
+print json.dumps(dict(before=before, in_dict='_CODE_MAYA' in System_Paths.__dict__, maya=maya,
+                      after=sorted(System_Paths.resolved()), software=System_Paths.resolved()['_CODE_SOFTWARE']))
+''')
+		# Only what the import itself needs, for AW_GLOBAL_SYSTEMS.
+		self.assertEqual(res['before'], ['AW_GLOBAL_SYSTEMS', '_CODE_BASE', '_CODE_GLOBAL_SYSTEMS'])
+		self.assertEqual(res['maya'], BASE + '/Software/Maya')
+		self.assertTrue(res['in_dict'])
+		# Reading one resolves the constants it is built on, and no others.
+		self.assertEqual(res['after'], ['AW_GLOBAL_SYSTEMS', '_CODE_BASE', '_CODE_GLOBAL_SYSTEMS', '_CODE_MAYA', '_CODE_SOFTWARE'])
+		self.assertEqual(res['software'], BASE + '/Software')
+	#----------------------------------------------------------------------
+	def test_settings_are_lazy(self):
+		res = self.run_child('''
+from Environment_Access import System_Settings
+before = sorted(System_Paths.resolved())
+lut = System_Settings.LUT_FILES
+print json.dumps(dict(before=before, lut=lut, stored=System_Settings.__dict__.get('LUT_FILES'),
+                      after=sorted(System_Paths.resolved()), declared=sorted(System_Paths._DERIVED)))
+''')
+		# Importing System_Settings resolves none of the roots, such as _LIBRARY_BASE.
+		self.assertEqual(res['before'], ['AW_GLOBAL_SYSTEMS', '_CODE_BASE', '_CODE_GLOBAL_SYSTEMS'])
+		self.assertEqual(res['lut'], BASE + '/Software/Nuke/LUTs')
+		self.assertEqual(res['stored'], res['lut'])
+		self.assertEqual(res['after'], ['AW_GLOBAL_SYSTEMS', '_CODE_BASE', '_CODE_GLOBAL_SYSTEMS', '_CODE_NUKE', '_CODE_SOFTWARE'])
+		# Every path is declared for the snapshot all the same.
+		self.assertTrue('OCIO_CONFIG_FILE' in res['declared'])
+		self.assertEqual(len(res['declared']), 13)
+	#----------------------------------------------------------------------
+	def test_environ_constants_write_os_environ(self):
+		res = self.run_child('''
+before = os.environ.get('AW_SOFTWARE_SYSTEMS')
+value = System_Paths.AW_SOFTWARE_SYSTEMS
+print json.dumps(dict(before=before, value=value, after=os.environ.get('AW_SOFTWARE_SYSTEMS'),
+                      global_systems=os.environ.get('AW_GLOBAL_SYSTEMS'), base=os.environ.get('AW_BASE')))
+''')
+		self.assertEqual(res['before'], None)
+		self.assertEqual(res['value'], BASE + '/Software')
+		self.assertEqual(res['after'], res['value'])
+		# Set on import; AW_BASE is only written once it is read.
+		self.assertEqual(res['global_systems'], BASE + '/Global_Systems')
+		self.assertEqual(res['base'], None)
+	#----------------------------------------------------------------------
+	def test_resolve(self):
+		res = self.run_child('''
+got = System_Paths.resolve('_CODE_NUKE', 'AW_USER_TOOLS')
+everything = System_Paths.compute_all()
+print json.dumps(dict(got=got, resolved=sorted(System_Paths.resolved()), everything=everything,
+                      hash=System_Paths.definitions_hash()))
+''')
+		self.assertEqual(sorted(res['got']), ['AW_USER_TOOLS', '_CODE_NUKE'])
+		self.assertEqual(res['got']['_CODE_NUKE'], BASE + '/Software/Nuke')
+		self.assertTrue('_CODE_SOFTWARE' in res['resolved'])
+		self.assertFalse('_CODE_MAYA' in res['resolved'])
+		# compute_all() works everything out without storing it.
+		self.assertTrue('_CODE_MAYA' in res['everything'])
+		for name, value in res['got'].items():
+			self.assertEqual(res['everything'][name], value)
+		self.assertTrue(res['hash'])
+	#----------------------------------------------------------------------
+	def test_missing_systems_path_warns(self):
+		res = self.run_child('''
+print json.dumps(dict(warned=warned, in_path=os.environ['AW_GLOBAL_SYSTEMS'] in sys.path))
+''')
+		self.assertEqual(res['warned'], ['RuntimeWarning'])
+		self.assertFalse(res['in_path'])
+	#----------------------------------------------------------------------
+	def test_systems_path_added(self):
+		res = self.run_child('''
+System_Paths.populate_environ()
+print json.dumps(dict(warned=warned, count=sys.path.count(os.environ['AW_GLOBAL_SYSTEMS']),
+                      environ=dict((key, os.environ.get(key)) for key in System_Paths.ENVIRON_KEYS)))
+''', exists=True)
+		self.assertEqual(res['warned'], [])
+		# Added on import, and not again by populate_environ().
+		self.assertEqual(res['count'], 1)
+		self.assertEqual(res['environ']['AW_BASE'], BASE)
+		self.assertEqual(res['environ']['MAYA_USER_TOOLS_DIR'], BASE + '/Global_Systems/User_Tools/Maya_User_Tools')
+		self.assertFalse(None in res['environ'].values())
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,169 @@
+""" Tests for System_Registry. """
+import os, unittest
+
+import support
+
+support.package_parent()
+try:
+	from Environment_Access import System_Registry
+	from Environment_Access.System_Registry import Registry, root, below, environ
+except ImportError:
+	System_Registry = None
+
+########################################################################
+@unittest.skipIf(System_Registry is None, "needs symbolic links")
+class RegistryTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		self.registry = Registry('posix', site='')
+		add = self.registry.add
+		add('BASE', root(nt='C:/Code', posix=('/code', False)))
+		add('SOFTWARE', below('BASE', 'Software'))
+		add('MAYA', below('SOFTWARE', 'Maya'))
+		add('NUKE', below('SOFTWARE', 'Nuke'))
+		add('TOOLS', below('BASE', 'Tools', 'User'))
+		add('AW_SOFTWARE', environ('AW_SOFTWARE', 'SOFTWARE'))
+		add('WINDOWS', root(nt='W:'))
+		add('WINDOWS_TOOLS', below('WINDOWS', 'Tools'))
+	#----------------------------------------------------------------------
+	def test_plan(self):
+		plan = self.registry.plan
+		self.assertEqual(plan(['MAYA']), ['BASE', 'SOFTWARE', 'MAYA'])
+		self.assertEqual(plan(['MAYA', 'NUKE']), ['BASE', 'SOFTWARE', 'MAYA', 'NUKE'])
+		# Nothing the caller already knows is planned again.
+		self.assertEqual(plan(['MAYA', 'AW_SOFTWARE'], known=['BASE', 'SOFTWARE']), ['MAYA', 'AW_SOFTWARE'])
+		self.assertEqual(plan(['MAYA'], known=['MAYA']), [])
+		# Everything that can be resolved on the platform, parents first.
+		everything = plan()
+		self.assertEqual(sorted(everything), ['AW_SOFTWARE', 'BASE', 'MAYA', 'NUKE', 'SOFTWARE', 'TOOLS'])
+		for name in everything:
+			for parent in System_Registry._parents(self.registry.definition(name)):
+				self.assertTrue(everything.index(parent) < everything.index(name))
+	#----------------------------------------------------------------------
+	def test_resolve(self):
+		self.assertEqual(self.registry.resolve(['MAYA', 'AW_SOFTWARE']), {
+			'BASE': '/code', 'SOFTWARE': '/code/Software', 'MAYA': '/code/Software/Maya', 'AW_SOFTWARE': '/code/Software'})
+		self.assertEqual(self.registry.resolve(['TOOLS'], known={'BASE': '/elsewhere'}), {'TOOLS': '/elsewhere/Tools/User'})
+		self.assertEqual(len(self.registry.resolve()), 6)
+		self.assertEqual(Registry('nt', site='').resolve(), {})
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		registry = self.registry
+		self.assertRaises(ValueError, registry.add, 'BASE', root(posix='/other'))
+		registry.add('LOOP_A', below('LOOP_B', 'a'))
+		registry.add('LOOP_B', below('LOOP_A', 'b'))
+		registry.add('DANGLING', below('MISSING', 'x'))
+		for names, message in ((['LOOP_A'], 'Depend On Each Other'), (['MISSING'], 'Is Not Defined'),
+		                       (['DANGLING'], "Depends On 'MISSING'"), (['WINDOWS'], 'Not Defined On posix'),
+		                       (['WINDOWS_TOOLS'], "Depends On 'WINDOWS' Which Is Not Defined On posix")):
+			try:
+				registry.plan(names)
+			except ValueError, exc:
+				self.assertTrue(message in str(exc), (names, str(exc)))
+			else:
+				self.fail("no ValueError for %r" % names)
+		# Planning everything leaves out what can not be resolved.
+		self.assertEqual(len(registry.plan()), 6)
+	#----------------------------------------------------------------------
+	def test_validate(self):
+		# The roots made for other platforms only are not problems.
+		self.assertEqual(self.registry.validate(), [])
+		self.registry.add('DANGLING', below('MISSING', 'x'))
+		self.registry.add('NUKE_ONLY', root(nt='N:'))
+		self.registry.add('CROSS', below('NUKE_ONLY', 'y'))
+		problems = self.registry.validate()
+		self.assertEqual(sorted(p.split(':')[0] for p in problems), ['nt', 'posix'])
+		self.assertTrue(all("'MISSING'" in p for p in problems))
+	#----------------------------------------------------------------------
+	def test_site_overrides(self):
+		self.registry.override('Amsterdam', 'MAYA', below('BASE', 'Maya_Amsterdam'))
+		self.registry.override('Amsterdam', 'LOCAL', below('MAYA', 'Local'))
+		self.assertEqual(self.registry.resolve(['MAYA'])['MAYA'], '/code/Software/Maya')
+		self.assertFalse('LOCAL' in self.registry)
+		site = Registry('posix', site='Amsterdam')
+		site._entries = self.registry._entries
+		site._overrides = self.registry._overrides
+		self.assertTrue('LOCAL' in site)
+		self.assertEqual(len(site), len(self.registry) + 1)
+		self.assertEqual(site.plan(['LOCAL']), ['BASE', 'MAYA', 'LOCAL'])
+		self.assertEqual(site.resolve(['LOCAL'])['LOCAL'], '/code/Maya_Amsterdam/Local')
+		self.assertNotEqual(site.hash(), self.registry.hash())
+	#----------------------------------------------------------------------
+	def test_site_from_environ(self):
+		saved = os.environ.get('AW_SITE')
+		try:
+			os.environ['AW_SITE'] = 'Amsterdam'
+			self.assertEqual(Registry().site, 'Amsterdam')
+			os.environ['AW_SITE'] = ''
+			self.assertEqual(Registry().site, None)
+		finally:
+			if saved is None:
+				os.environ.pop('AW_SITE', None)
+			else:
+				os.environ['AW_SITE'] = saved
+	#----------------------------------------------------------------------
+	def test_hash(self):
+		other = Registry('posix', site='')
+		for name in self.registry:
+			other.add(name, self.registry.entry(name))
+		self.assertEqual(other.hash(), self.registry.hash())
+		self.assertNotEqual(Registry('nt', site='').hash(), Registry('posix', site='').hash())
+		other.add('EXTRA', below('BASE', 'x'))
+		self.assertNotEqual(other.hash(), self.registry.hash())
+
+########################################################################
+@unittest.skipIf(System_Registry is None, "needs symbolic links")
+class RealpathTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def test_realpath(self):
+		os.symlink(self.mkdir('real'), os.path.join(self.tmp, 'link'))
+		registry = Registry('posix', site='')
+		registry.add('LINKED', root(posix=os.path.join(self.tmp, 'link')))
+		registry.add('KEPT', root(realpath=False, posix=os.path.join(self.tmp, 'link')))
+		registry.add('KEPT_HERE', root(posix=(os.path.join(self.tmp, 'link'), False)))
+		self.assertEqual(registry.resolve(), {'LINKED': os.path.join(self.tmp, 'real'),
+		                                      'KEPT': os.path.join(self.tmp, 'link'),
+		                                      'KEPT_HERE': os.path.join(self.tmp, 'link')})
+
+########################################################################
+@unittest.skipIf(System_Registry is None, "needs symbolic links")
+class SystemPathsRegistryTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def report(self, site):
+		return support.run_python('''
+import json, warnings
+warnings.simplefilter('ignore')
+from Environment_Access import System_Paths
+from Environment_Access.System_Registry import Registry, below
+# The Windows view of the same definitions, with no site set.
+nt = Registry('nt', site='')
+nt._entries = System_Paths.REGISTRY._entries
+nt._overrides = System_Paths.REGISTRY._overrides
+System_Paths._CODE_MAYA
+before = sorted(System_Paths.resolved())
+System_Paths.REGISTRY.override('Amsterdam', '_CODE_MAYA', below('_CODE_BASE', 'Maya_Amsterdam'))
+print json.dumps(dict(site=System_Paths.REGISTRY.site, problems=System_Paths.REGISTRY.validate(), before=before,
+                      nt_plan=nt.plan(['_CODE_AMSTERDAM_MAYA']),
+                      after=sorted(System_Paths.resolved()), maya=System_Paths._CODE_MAYA,
+                      hash=System_Paths.definitions_hash()))
+''', AW_SYSTEM_SNAPSHOT='', AW_SITE=site)
+	#----------------------------------------------------------------------
+	def test_sites(self):
+		plain = self.report(None)
+		amsterdam = self.report('Amsterdam')
+		self.assertEqual(plain['site'], None)
+		self.assertEqual(plain['problems'], [])
+		self.assertEqual(amsterdam['problems'], [])
+		# Site locations are defined without AW_SITE too.
+		self.assertEqual(plain['nt_plan'], ['_CODE_AMSTERDAM', '_CODE_AMSTERDAM_MAYA'])
+		self.assertNotEqual(plain['hash'], amsterdam['hash'])
+		# An override for another site changes nothing.
+		self.assertTrue('_CODE_MAYA' in plain['after'])
+		self.assertEqual(plain['maya'], '/Volumes/aw_config/Git_Live_Code/Software/Maya')
+		# One for the site in use drops what was resolved.
+		self.assertTrue('_CODE_MAYA' in amsterdam['before'])
+		self.assertEqual(amsterdam['after'], [])
+		self.assertEqual(amsterdam['maya'], '/Volumes/aw_config/Git_Live_Code/Maya_Amsterdam')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,161 @@
+""" Tests for System_Snapshot. """
+import os, zlib, marshal, unittest
+
+import support
+
+support.package_parent()
+try:
+	from Environment_Access import System_Snapshot
+except ImportError:
+	System_Snapshot = None
+
+# Compiles the snapshot named by AW_SYSTEM_SNAPSHOT in the child.
+COMPILE = '''
+import json
+from Environment_Access import System_Snapshot
+try:
+	data = System_Snapshot.compile_snapshot()
+except ValueError, exc:
+	print json.dumps(dict(error=str(exc)))
+else:
+	print json.dumps(dict((key, data[key]) for key in ('hash', 'platform', 'paths', 'derived', 'environ')))
+'''
+
+# Imports System_Paths in the child and reports what it took from the snapshot.
+IMPORT = '''
+import json, warnings
+warnings.simplefilter('ignore')
+from Environment_Access import System_Paths
+print json.dumps(dict(resolved=System_Paths.resolved(), hash=System_Paths.definitions_hash()))
+'''
+
+########################################################################
+@unittest.skipIf(System_Snapshot is None, "needs symbolic links")
+class EnvironmentScriptsTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_quoting(self):
+		scripts = System_Snapshot.environment_scripts({'B_KEY': "it's 100%", 'A_KEY': '/plain/path'})
+		self.assertEqual(sorted(scripts), ['.bat', '.env', '.sh'])
+		sh = scripts['.sh'].splitlines()
+		self.assertEqual(sh[1:], ["export A_KEY='/plain/path'", "export B_KEY='it'\\''s 100%'"])
+		bat = scripts['.bat']
+		self.assertTrue(bat.endswith('\r\n'))
+		self.assertFalse('\n' in bat.replace('\r\n', ''))
+		self.assertEqual(bat.split('\r\n')[2:4], ['set "A_KEY=/plain/path"', 'set "B_KEY=it\'s 100%%"'])
+		self.assertEqual(scripts['.env'].splitlines()[1:], ['A_KEY=/plain/path', "B_KEY=it's 100%"])
+	#----------------------------------------------------------------------
+	def test_empty(self):
+		scripts = System_Snapshot.environment_scripts({})
+		self.assertEqual(len(scripts['.sh'].splitlines()), 1)
+
+########################################################################
+@unittest.skipIf(System_Snapshot is None, "needs symbolic links")
+class StoreTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.saved = dict((key, os.environ.get(key)) for key in ('AW_SYSTEM_SNAPSHOT', 'AW_SITE'))
+		self.store = os.path.join(self.tmp, 'snap', 'test.snapshot')
+	#----------------------------------------------------------------------
+	def tearDown(self):
+		for key, value in self.saved.items():
+			if value is None:
+				os.environ.pop(key, None)
+			else:
+				os.environ[key] = value
+		support.TempDirTestCase.tearDown(self)
+	#----------------------------------------------------------------------
+	def write(self, data):
+		if not os.path.isdir(os.path.dirname(self.store)):
+			os.makedirs(os.path.dirname(self.store))
+		f = open(self.store, 'wb')
+		f.write(data)
+		f.close()
+	#----------------------------------------------------------------------
+	def test_store_path(self):
+		os.environ.pop('AW_SYSTEM_SNAPSHOT', None)
+		os.environ.pop('AW_SITE', None)
+		default = System_Snapshot.store_path()
+		self.assertEqual(os.path.basename(default), '%s.snapshot' % os.name)
+		self.assertEqual(os.path.basename(os.path.dirname(default)), 'snapshots')
+		os.environ['AW_SITE'] = 'Amsterdam'
+		self.assertEqual(os.path.basename(System_Snapshot.store_path()), '%s-Amsterdam.snapshot' % os.name)
+		os.environ['AW_SYSTEM_SNAPSHOT'] = self.store
+		self.assertEqual(System_Snapshot.store_path(), self.store)
+		os.environ['AW_SYSTEM_SNAPSHOT'] = ''
+		self.assertEqual(System_Snapshot.store_path(), None)
+		self.assertEqual(System_Snapshot.load('digest'), None)
+	#----------------------------------------------------------------------
+	def test_load(self):
+		data = {'version': System_Snapshot._FORMAT_VERSION, 'hash': 'digest', 'platform': os.name, 'paths': {}}
+		self.write(zlib.compress(marshal.dumps(data)))
+		self.assertEqual(System_Snapshot.load('digest', self.store), data)
+		self.assertEqual(System_Snapshot.load('other', self.store), None)
+		self.assertEqual(System_Snapshot.load('digest', self.store + '.missing'), None)
+	#----------------------------------------------------------------------
+	def test_load_rejects(self):
+		data = {'version': System_Snapshot._FORMAT_VERSION, 'hash': 'digest', 'platform': 'other'}
+		for content in (zlib.compress(marshal.dumps(data)), 'not a snapshot', zlib.compress('garbage'),
+		                zlib.compress(marshal.dumps(['a', 'list'])),
+		                zlib.compress(marshal.dumps(dict(data, platform=os.name, version=-1)))):
+			self.write(content)
+			self.assertEqual(System_Snapshot.load('digest', self.store), None, repr(content))
+
+########################################################################
+@unittest.skipIf(System_Snapshot is None, "needs symbolic links")
+class CompileTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.store = os.path.join(self.tmp, 'snap', 'test.snapshot')
+	#----------------------------------------------------------------------
+	def run_child(self, code, store):
+		return support.run_python(code, AW_SYSTEM_SNAPSHOT=store, AW_SITE=None)
+	#----------------------------------------------------------------------
+	def rewrite(self, **changes):
+		""" Rewrites the snapshot with 'changes' made to its data. """
+		f = open(self.store, 'rb')
+		data = marshal.loads(zlib.decompress(f.read()))
+		f.close()
+		for key, value in changes.items():
+			if isinstance(value, dict):
+				data[key].update(value)
+			else:
+				data[key] = value
+		f = open(self.store, 'wb')
+		f.write(zlib.compress(marshal.dumps(data)))
+		f.close()
+	#----------------------------------------------------------------------
+	def test_compile(self):
+		data = self.run_child(COMPILE, self.store)
+		self.assertEqual(data['platform'], os.name)
+		self.assertEqual(data['paths']['_CODE_MAYA'], '/Volumes/aw_config/Git_Live_Code/Software/Maya')
+		self.assertEqual(data['environ']['AW_BASE'], '/Volumes/aw_config/Git_Live_Code')
+		self.assertTrue(data['derived'])
+		self.assertEqual(sorted(os.listdir(os.path.join(self.tmp, 'snap'))),
+		                 ['test.bat', 'test.env', 'test.sh', 'test.snapshot'])
+		sh = open(os.path.join(self.tmp, 'snap', 'test.sh')).read()
+		self.assertTrue("export AW_BASE='/Volumes/aw_config/Git_Live_Code'\n" in sh)
+		# Importing System_Paths takes the constants from the snapshot.
+		res = self.run_child(IMPORT, self.store)
+		self.assertEqual(res['hash'], data['hash'])
+		self.assertEqual(res['resolved']['_CODE_MAYA'], data['paths']['_CODE_MAYA'])
+		# The environ constants are still written to os.environ when read.
+		self.assertFalse('AW_BASE' in res['resolved'])
+	#----------------------------------------------------------------------
+	def test_values_come_from_the_snapshot(self):
+		self.run_child(COMPILE, self.store)
+		self.rewrite(paths={'_CODE_MAYA': '/from/the/snapshot'})
+		self.assertEqual(self.run_child(IMPORT, self.store)['resolved']['_CODE_MAYA'], '/from/the/snapshot')
+		# Compiled for other definitions: ignored.
+		self.rewrite(hash='other')
+		self.assertFalse('_CODE_MAYA' in self.run_child(IMPORT, self.store)['resolved'])
+	#----------------------------------------------------------------------
+	def test_turned_off(self):
+		res = self.run_child(COMPILE, '')
+		self.assertTrue('Turned Off' in res['error'])
+		self.assertFalse('_CODE_MAYA' in self.run_child(IMPORT, '')['resolved'])
+		self.assertEqual(os.listdir(self.tmp), [])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,74 @@
+""" Tests for symbolic link handling in the walkers. """
+import os, unittest
+
+import support
+import Path_Object
+import Path_Columns
+from Path_Object import path
+
+########################################################################
+class WalkLinksTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.make('shared/s.txt')
+		self.make('a/f.txt')
+		# A loop back up the tree and a second way into 'shared'.
+		os.symlink(self.tmp, os.path.join(self.tmp, 'a', 'loop'))
+		os.symlink(os.path.join(self.tmp, 'shared'), os.path.join(self.tmp, 'a', 'shared_link'))
+	#----------------------------------------------------------------------
+	def test_loops_and_repeats_are_walked_once(self):
+		root = path(self.tmp)
+		self.assertEqual(self.rel(root.walkfiles()), ['a/f.txt', 'shared/s.txt'])
+		self.assertEqual(self.rel(root.walkdirs()), ['a', 'shared'])
+		self.assertEqual(self.rel(root.walk_parallel(kind='files', workers=2)), ['a/f.txt', 'shared/s.txt'])
+		self.assertEqual(self.rel(top for top, name, st in Path_Columns.walk_stats(self.tmp)), ['a', 'shared'])
+	#----------------------------------------------------------------------
+	def test_linked_directories_are_entered(self):
+		# From 'a', 'shared' is only reached through links: through
+		# whichever is listed first, and only through that one.
+		got = self.rel(path(os.path.join(self.tmp, 'a')).walkfiles())
+		self.assertEqual(len(got), 2)
+		self.assertEqual(got[0], 'a/f.txt')
+		self.assertTrue(got[1] in ('a/loop/shared/s.txt', 'a/shared_link/s.txt'))
+	#----------------------------------------------------------------------
+	def test_follow_symlinks_false(self):
+		got = path(os.path.join(self.tmp, 'a')).walkfiles(follow_symlinks=False)
+		self.assertEqual(self.rel(got), ['a/f.txt'])
+	#----------------------------------------------------------------------
+	def test_without_mount_table(self):
+		# Where mount points can not be told apart every directory is stat'ed.
+		names = Path_Object._mount_names
+		Path_Object._mount_names = lambda: None
+		try:
+			self.assertEqual(self.rel(path(self.tmp).walkfiles()), ['a/f.txt', 'shared/s.txt'])
+		finally:
+			Path_Object._mount_names = names
+	#----------------------------------------------------------------------
+	def test_plain_directories_are_not_stated(self):
+		if Path_Object._scandir_impl is None or Path_Object._mount_names() is None:
+			self.skipTest("needs scandir and a readable mount table")
+		for i in range(5):
+			self.make('plain/d%d/f.txt' % i)
+		stated = []
+		guard_enter = Path_Object._WalkGuard.enter
+		class Entry(object):
+			def __init__(self, entry):
+				self._entry = entry
+			def __getattr__(self, name):
+				return getattr(self._entry, name)
+			def stat(self, *args, **kwargs):
+				stated.append(self._entry.path)
+				return self._entry.stat(*args, **kwargs)
+		def enter(guard, entry):
+			return guard_enter(guard, Entry(entry))
+		Path_Object._WalkGuard.enter = enter
+		try:
+			got = list(path(os.path.join(self.tmp, 'plain')).walkdirs())
+		finally:
+			Path_Object._WalkGuard.enter = guard_enter
+		self.assertEqual(len(got), 5)
+		self.assertEqual(stated, [])
+
+if __name__ == '__main__':
+	unittest.main()
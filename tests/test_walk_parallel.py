@@ -0,0 +1,88 @@
+""" Tests for path.walk_parallel() and the worker pool behind it. """
+import os, unittest
+
+import support
+import Path_Object
+from Path_Object import path
+
+########################################################################
+class WalkParallelTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		for i in range(12):
+			self.make('d%02d/f.txt' % i)
+			self.make('d%02d/s/g.exr' % i)
+		self.make('top.txt')
+	#----------------------------------------------------------------------
+	def test_same_items_as_serial_walk(self):
+		root = path(self.tmp)
+		for kind, serial in (('all', root.walk), ('dirs', root.walkdirs), ('files', root.walkfiles)):
+			expected = list(serial())
+			got = list(root.walk_parallel(kind=kind, workers=3, max_pending=2))
+			self.assertEqual(sorted(got), sorted(expected))
+			ordered = list(root.walk_parallel(kind=kind, workers=3, max_pending=2, ordered=True))
+			self.assertEqual(ordered, expected)
+	#----------------------------------------------------------------------
+	def test_pattern(self):
+		got = path(self.tmp).walk_parallel('*.exr', kind='files')
+		self.assertEqual(len(list(got)), 12)
+	#----------------------------------------------------------------------
+	def test_errors(self):
+		missing = path(os.path.join(self.tmp, 'missing'))
+		self.assertRaises(OSError, list, missing.walk_parallel())
+		self.assertEqual(list(missing.walk_parallel(errors='ignore')), [])
+		self.assertRaises(ValueError, list, path(self.tmp).walk_parallel(kind='bogus'))
+	#----------------------------------------------------------------------
+	def test_types_resolved_on_workers(self):
+		# With the listdir() fallback every stat goes through os.lstat and
+		# os.stat, so the calls made on this thread can be counted.
+		import threading
+		this = threading.current_thread()
+		calls = []
+		os.symlink(os.path.join(self.tmp, 'top.txt'), os.path.join(self.tmp, 'link'))
+		impl, lstat, stat = Path_Object._scandir_impl, os.lstat, os.stat
+		def counted(func):
+			def call(p):
+				if threading.current_thread() is this:
+					calls.append(p)
+				return func(p)
+			return call
+		Path_Object._scandir_impl = None
+		try:
+			os.lstat, os.stat = counted(lstat), counted(stat)
+			items = list(path(self.tmp).walk_parallel(workers=2))
+		finally:
+			os.lstat, os.stat = lstat, stat
+			Path_Object._scandir_impl = impl
+		self.assertEqual(len(items), 12 * 4 + 2)
+		# Only the walk root is stat'ed by the consumer.
+		self.assertEqual(calls, [self.tmp])
+
+########################################################################
+class WorkerPoolTest(unittest.TestCase):
+	#----------------------------------------------------------------------
+	def test_bounded(self):
+		pool = Path_Object._WorkerPool(lambda x: x * 2, 2, 3)
+		try:
+			for i in range(3):
+				pool.submit(i)
+			self.assertRaises(RuntimeError, pool.submit, 3)
+			results = sorted(pool.next_result() for i in range(3))
+			self.assertEqual(results, [(0, 0, None), (1, 2, None), (2, 4, None)])
+			pool.submit(3)
+			self.assertEqual(pool.next_result(), (3, 6, None))
+		finally:
+			pool.close()
+	#----------------------------------------------------------------------
+	def test_exceptions_are_returned(self):
+		pool = Path_Object._WorkerPool(lambda x: 1 / x, 1, 1)
+		try:
+			pool.submit(0)
+			arg, result, exc = pool.next_result()
+			self.assertTrue(isinstance(exc, ZeroDivisionError))
+		finally:
+			pool.close()
+
+if __name__ == '__main__':
+	unittest.main()
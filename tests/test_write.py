@@ -0,0 +1,70 @@
+""" Tests for write_bytes(), write_text() and write_lines(), atomic writes included. """
+import os, stat, codecs, unittest
+
+import support
+import Path_Object
+from Path_Object import path
+
+########################################################################
+class WriteTest(support.TempDirTestCase):
+	#----------------------------------------------------------------------
+	def setUp(self):
+		support.TempDirTestCase.setUp(self)
+		self.p = path(os.path.join(self.tmp, 'out.txt'))
+	#----------------------------------------------------------------------
+	def leftovers(self):
+		return [name for name in os.listdir(self.tmp) if name.endswith('.tmp')]
+	#----------------------------------------------------------------------
+	def test_write_lines_in_blocks(self):
+		lines = ('line %d\r\n' % i for i in range(1000))
+		self.p.write_lines(lines, linesep='\n', buffer_size=64)
+		self.assertEqual(self.p.bytes(), ''.join('line %d\n' % i for i in range(1000)))
+		self.p.write_lines(['a\r', 'b\n', 'c'], linesep=None)
+		self.assertEqual(self.p.bytes(), 'a\rb\nc')
+		self.p.write_lines(['d'], linesep='\n', append=True)
+		self.assertEqual(self.p.bytes(), 'a\rb\ncd\n')
+	#----------------------------------------------------------------------
+	def test_write_lines_unicode(self):
+		lines = [u'\xe9t\xe9\u2028', u'plain\n', u'caf\xe9'] * 50
+		self.p.write_lines(lines, encoding='utf-16', linesep='\n', buffer_size=16)
+		data = self.p.bytes()
+		# One byte order mark, however many blocks were encoded.
+		self.assertEqual(data.count(codecs.BOM_UTF16), 1)
+		self.assertEqual(self.p.text('utf-16').count(u'caf\xe9\n'), 50)
+		self.assertEqual(self.p.text('utf-16').count(u'\xe9t\xe9\n'), 50)
+	#----------------------------------------------------------------------
+	def test_write_bytes_unicode(self):
+		self.p.write_bytes(u'ascii text')
+		self.assertEqual(self.p.bytes(), 'ascii text')
+		self.assertRaises(UnicodeEncodeError, self.p.write_bytes, u'caf\xe9')
+	#----------------------------------------------------------------------
+	def test_atomic(self):
+		self.p.write_bytes('old')
+		os.chmod(self.p, 0640)
+		self.p.write_bytes('new', atomic=True)
+		self.assertEqual(self.p.bytes(), 'new')
+		self.assertEqual(stat.S_IMODE(os.stat(self.p).st_mode), 0640)
+		self.p.write_bytes(' more', append=True, atomic=True)
+		self.assertEqual(self.p.bytes(), 'new more')
+		self.p.write_text(u'text\n', encoding='utf-8', linesep='\r\n', atomic=True)
+		self.assertEqual(self.p.bytes(), 'text\r\n')
+		self.assertEqual(self.leftovers(), [])
+	#----------------------------------------------------------------------
+	def test_failed_atomic_write_keeps_target(self):
+		self.p.write_bytes('old')
+		def lines():
+			yield 'first'
+			raise RuntimeError('interrupted')
+		self.assertRaises(RuntimeError, self.p.write_lines, lines(), atomic=True)
+		self.assertEqual(self.p.bytes(), 'old')
+		self.assertEqual(self.leftovers(), [])
+	#----------------------------------------------------------------------
+	def test_replace(self):
+		src = self.make('src', 'new')
+		dst = self.make('dst', 'old')
+		Path_Object._replace(src, dst)
+		self.assertEqual(path(dst).bytes(), 'new')
+		self.assertFalse(os.path.exists(src))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,5 +1,6 @@
 import os
 from Path_Object import Path
+import Path_Probe
 #----------------------------------------------------------------------
 def make_Path_Object(path):
 	""""""
@@ -48,11 +49,14 @@ def add_To_System_Path(path):
 	if isinstance(path, (str, unicode)):
 		# Format The Path To Match The Operating System
 		path = path_fixer(path)
-		# Check If The Path Exists On The OS
-		if os.path.exists(path):
+		# Check If The Path Exists On The OS, Without Waiting On A Hung Mount
+		if Path_Probe.exists(path):
 			# Check If The Path Is Not Allready In The List Of System Paths
 			if not path in os.sys.path:
 				os.sys.path.append(path)
+		elif Path_Probe.status(path) == Path_Probe.DOWN:
+			# Raise An Error Telling The That The Volume Of The Input Path Is Not Responding
+			raise ValueError("Can Not Add The Path %r Because Its Volume Is Not Responding" % path)
 		else:
 			# Raise An Error Telling The That The Input Path Does Not Exist
 			raise ValueError("Can Not Add The Path %r Because It Does Not Exist" % path)
@@ -84,8 +88,8 @@ def get_and_set_system_path_environ_key(key, default_path=None, force_default=Fa
 
 	# Check If The Default Input Path Value Has Been Set
 	if default_path is not None:
-		# If So Check If The Default Path Exists
-		if os.path.exists(default_path):
+		# If So Check If The Default Path Exists, Without Waiting On A Hung Mount
+		if Path_Probe.exists(default_path):
 			# If So Changed The Default Value Check
 			default_path_exists = True
 
@@ -94,8 +98,8 @@ def get_and_set_system_path_environ_key(key, default_path=None, force_default=Fa
 
 	# Check If The Input Environment Key Had A Value
 	if not environment_path is None:
-		# If So Check If The Environment Path Exists
-		if os.path.exists(environment_path):
+		# If So Check If The Environment Path Exists, Without Waiting On A Hung Mount
+		if Path_Probe.exists(environment_path):
 			# If So Changed The Environment Path Value Check
 			environment_path_exists = True
 
@@ -118,45 +122,144 @@ def get_and_set_system_path_environ_key(key, default_path=None, force_default=Fa
 	os.environ[key] = res
 	# Return The Value That was Set To The Key
 	return res
+########################################################################
+class Multi_Path_Environment_Editor(object):
+	"""Batches Edits To Multi Path Environment Variables Such As PYTHONPATH Or MAYA_SCRIPT_PATH
+	   And Applies Them All To The Environment In One commit()
+
+	   Each Variable Is Kept As Its Items Split On os.pathsep, Indexed By Path, So Every
+	   append(), prepend() And remove() Costs The Same However Long The Variable Is.
+	   The Items Already In A Variable Are Kept As They Are, Duplicates And Empty Items
+	   Included; Only The Paths Being Added Are Checked Against What Is There.
+	   On Windows Variable Names And Paths Are Compared Without Regard To Case.
+
+	   environ - The Mapping To Edit, os.environ By Default, Or A Copy Being Built For A Child Process
+	"""
+	#----------------------------------------------------------------------
+	def __init__(self, environ=None):
+		if environ is None:
+			environ = os.environ
+		self.environ = environ
+		# Variable -> ({Position -> Item}, {Normalised Path -> [Positions Holding It]})
+		self._paths = {}
+		# Positions Handed To Prepended And Appended Paths
+		self._first = 0
+		self._last = 0
+		# Upper Cased Name -> Name As The Environment Spells It, On Windows
+		self._names = {}
+	#----------------------------------------------------------------------
+	def _key(self, key):
+		"""Returns The Variable Name As The Environment Stores It
+		   On Windows That Is The Spelling Of The Existing Variable With The Same Name In Any Case
+		"""
+		if os.name != "nt":
+			return key
+		upper = key.upper()
+		name = self._names.get(upper)
+		if name is None:
+			name = key
+			for existing in self.environ.keys():
+				if existing.upper() == upper:
+					name = existing
+					break
+			self._names[upper] = name
+		return name
+	#----------------------------------------------------------------------
+	def _entries(self, key):
+		"""Returns The Items And Path Index Of Variable 'key', Reading It From The Environment On First Use"""
+		key = self._key(key)
+		entries = self._paths.get(key)
+		if entries is None:
+			items, where = entries = self._paths[key] = ({}, {})
+			value = self.environ.get(key, "")
+			for item in (value.split(os.pathsep) if value else ()):
+				self._last += 1
+				items[self._last] = item
+				if item:
+					where.setdefault(os.path.normcase(item), []).append(self._last)
+		return entries
+	#----------------------------------------------------------------------
+	def _items(self, paths):
+		"""Returns The Input Path Or Paths As A List Of Paths Formatted For This OS"""
+		# Check If The Input Was A Single Path
+		if isinstance(paths, (str, unicode)):
+			paths = [paths]
+		# Check To Make Sure We Are Working With A List Of Paths
+		if not isinstance(paths, (list, tuple)):
+			raise ValueError("The Input Expected A Type String Or List And A %r Was Found" % type(paths))
+		res = []
+		for i, item in enumerate(paths):
+			# Check To Make Sure The Item Is A String
+			if not isinstance(item, (str, unicode)):
+				raise ValueError("All Items From The Input Need To Of Type String And A %r Was Found At Index %i" % (type(item), i) )
+			res.append(path_fixer(item))
+		return res
+	#----------------------------------------------------------------------
+	def append(self, key, paths):
+		"""Adds The Paths To The End Of Variable 'key', Leaving Any That Are Already Present Where They Are"""
+		items, where = self._entries(key)
+		for item in self._items(paths):
+			norm = os.path.normcase(item)
+			if norm not in where:
+				self._last += 1
+				items[self._last] = item
+				where[norm] = [self._last]
+	#----------------------------------------------------------------------
+	def prepend(self, key, paths):
+		"""Puts The Paths, In The Order Given, At The Front Of Variable 'key', Moving Any That Are Already Present"""
+		items, where = self._entries(key)
+		for item in reversed(self._items(paths)):
+			norm = os.path.normcase(item)
+			for position in where.get(norm, ()):
+				del items[position]
+			self._first -= 1
+			items[self._first] = item
+			where[norm] = [self._first]
+	#----------------------------------------------------------------------
+	def remove(self, key, paths):
+		"""Removes Every Occurrence Of The Paths From Variable 'key'"""
+		items, where = self._entries(key)
+		for item in self._items(paths):
+			for position in where.pop(os.path.normcase(item), ()):
+				del items[position]
+	#----------------------------------------------------------------------
+	def get(self, key):
+		"""Returns The Items Of Variable 'key' As They Will Be Committed"""
+		items = self._entries(key)[0]
+		return [items[position] for position in sorted(items)]
+	#----------------------------------------------------------------------
+	def commit(self):
+		"""Writes Every Edited Variable To The Environment At Once And Returns A Dict Of Their New Values
+		   A Variable Left Without Items Is Set Empty, Or Left Unset If It Did Not Exist
+		"""
+		values = {}
+		for key in self._paths:
+			values[key] = os.pathsep.join(self.get(key))
+		for key, value in values.items():
+			if self.environ.get(key) != value and (value or key in self.environ):
+				self.environ[key] = value
+		self._paths.clear()
+		self._names.clear()
+		return values
+	#----------------------------------------------------------------------
+	def __enter__(self):
+		return self
+	#----------------------------------------------------------------------
+	def __exit__(self, exc_type, exc_value, traceback):
+		# Only Apply The Edits If The Block Finished Without An Error
+		if exc_type is None:
+			self.commit()
+		else:
+			self._paths.clear()
+			self._names.clear()
 #----------------------------------------------------------------------
 def add_To_Multi_Path_Environment_Key(key, paths):
 	"""Adds File Or Folder Paths To An Existing Multi Path Environment Variable
-	   in the From Of 'path_A;path_B;path_C'
-	   and If it does Not allready Contain it adds the input path to end 'path_A;path_B;path_C:input_path'
+	   in the From Of 'path_A;path_B;path_C' (Seperated By os.pathsep, So ':' Outside Of Windows)
+	   and If it does Not allready Contain it adds the input path to end 'path_A;path_B;path_C;input_path'
 	   If No Key Exists Makes A New One With The Given Paths
+	   To Make Many Edits At Once Use A Multi_Path_Environment_Editor
 	"""
-	# Check If The Input Key Exists In The Environment
-	if os.environ.has_key(key):
-		# Get The Environment key Value And Split It Up
-		current_Value = os.environ.get(key).split(";")
-	else:
-		# Make An Empty List As A Default Value
-		current_Value = []
-
-	# Check If The Input Was A Single Path
-	if isinstance(paths, (str, unicode)):
-		# If So Convert It Into A List With A Single Item
-		paths = [paths]
-
-	# Check To Make Sure We Are Working With A List Of Paths
-	if not isinstance(paths, list):
-		raise ValueError("The Input Expected A Type String Or List And A %r Was Found" % type(paths))
-
-	# Scan Though Each Item In Input Paths
-	for i, item in enumerate(paths):
-		# Check To Make Sure The Item Is A String
-		if not isinstance(item, (str, unicode)):
-			raise ValueError("All Items From The Input Need To Of Type String And A %r Was Found At Index %i" % (type(item), i) )
-		# Conform The Path To The Proper OS format
-		item = path_fixer(item)
-		# Check If The Item Is Not Allready Present
-		if not item in current_Value:
-			# Add It To The List Of Current Values
-			current_Value.append(item)
-
-	# Take The Current List Of Paths And Condence Them Back Into A Single String Seperated By ;
-	current_Value = ";".join(current_Value)
-
-	# Reapply To The Environment Key
-	os.environ[key] = current_Value
-
+	editor = Multi_Path_Environment_Editor()
+	editor.append(key, paths)
+	editor.commit()